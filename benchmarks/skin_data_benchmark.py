@@ -0,0 +1,433 @@
+# Imports
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import types
+
+import numpy as np
+
+# Headless runs register the package without its Maya start-up, inside Maya it is already imported
+if 'hiddenStrings' not in sys.modules:
+    hidden_strings_package = types.ModuleType('hiddenStrings')
+    hidden_strings_package.__path__ = [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))]
+    sys.modules['hiddenStrings'] = hidden_strings_package
+
+# Project imports
+from hiddenStrings.tests import maya_standin
+
+# The stand-in has to be installed before the libs import maya
+maya_standin.install()
+
+from hiddenStrings.libs import import_export_lib, skin_weights_lib, spatial_lib, storage_lib  # noqa: E402
+
+logging = logging.getLogger(__name__)
+
+benchmark_version = 1
+
+# Skin file formats, {name: (extension, write function, read function)}
+file_format_dict = {
+    'json': ('json',
+             lambda skin_weights, file_path: skin_weights.save_deformer_weights(file_path),
+             skin_weights_lib.SkinWeights.from_deformer_weights_file),
+    'npz': (skin_weights_lib.npz_extension,
+            lambda skin_weights, file_path: skin_weights.save(file_path),
+            skin_weights_lib.SkinWeights.load),
+    'npz_quantized': (skin_weights_lib.npz_extension,
+                      lambda skin_weights, file_path: skin_weights.save(file_path, quantize=True),
+                      skin_weights_lib.SkinWeights.load),
+    'chunk_zlib': (storage_lib.chunk_extension,
+                   lambda skin_weights, file_path: skin_weights.save_chunks(file_path, compression='zlib'),
+                   skin_weights_lib.SkinWeights.load_chunks),
+    'chunk_lzma': (storage_lib.chunk_extension,
+                   lambda skin_weights, file_path: skin_weights.save_chunks(file_path, compression='lzma'),
+                   skin_weights_lib.SkinWeights.load_chunks),
+    'chunk_none': (storage_lib.chunk_extension,
+                   lambda skin_weights, file_path: skin_weights.save_chunks(file_path, compression='none'),
+                   skin_weights_lib.SkinWeights.load_chunks)}
+
+transfer_methods = ['nearest', 'inverse_distance', 'barycentric']
+
+
+def create_synthetic_mesh(point_count=10000, seed=0):
+    """
+    Create a wavy grid, the closest square grid to the point count is used
+
+    Args:
+        point_count (int, optional): approximate number of points. Defaults to 10000.
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        tuple: (points (n, 3) float64, triangles (t, 3) int32)
+    """
+    side = max(int(round(np.sqrt(point_count))), 2)
+    grid_x, grid_y = np.meshgrid(np.linspace(-10, 10, side), np.linspace(-10, 10, side))
+    random_generator = np.random.default_rng(seed)
+    grid_z = np.sin(grid_x) * np.cos(grid_y) + random_generator.normal(0, 0.01, grid_x.shape)
+    points = np.stack([grid_x.ravel(), grid_y.ravel(), grid_z.ravel()], axis=1)
+
+    # Two triangles per quad
+    corners = (np.arange(side - 1)[:, None] * side + np.arange(side - 1)[None, :]).ravel()
+    triangles = np.concatenate([np.stack([corners, corners + 1, corners + side + 1], axis=1),
+                                np.stack([corners, corners + side + 1, corners + side], axis=1)])
+
+    return points, triangles.astype(np.int32)
+
+
+def create_synthetic_weights(points, triangles=None, influence_count=50, max_influences=8, seed=0):
+    """
+    Create smooth sparse weights, each point is weighted to its closest influences placed randomly on the mesh.
+    Half of the influences are left and half right, so the names can be remapped
+
+    Args:
+        points (np.ndarray): (point_count, 3) positions
+        triangles (np.ndarray, optional): (triangle_count, 3) point indices. Defaults to None.
+        influence_count (int, optional): number of influences. Defaults to 50.
+        max_influences (int, optional): influences per point. Defaults to 8.
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        skin_weights_lib.SkinWeights: normalized weights
+    """
+    random_generator = np.random.default_rng(seed)
+    influence_points = points[random_generator.choice(len(points), influence_count, replace=False)]
+    influences = [f'benchmark{i}_{"l" if i % 2 else "r"}_skn' for i in range(influence_count)]
+
+    neighbour_count = min(max_influences, influence_count)
+    distances, indices = spatial_lib.SpatialIndex(influence_points).query(points, k=neighbour_count)
+    values = 1.0 / (distances + 1e-3) ** 2
+
+    skin_weights = skin_weights_lib.SkinWeights.from_coo(
+        rows=np.repeat(np.arange(len(points)), neighbour_count),
+        columns=indices.ravel(),
+        values=values.ravel(),
+        point_count=len(points),
+        influences=influences,
+        shape='benchmark_c_geoShape',
+        deformer='benchmark_c_skinCluster',
+        points=points,
+        triangles=triangles)
+
+    return skin_weights.normalize()
+
+
+def measure(function, *args, trace_memory=True, **kwargs):
+    """
+    Run a function measuring the wall time and the peak of the memory allocated by Python and numpy
+
+    Args:
+        function (function): function to run
+        trace_memory (bool, optional): trace the allocations, it slows down pure Python code. Defaults to True.
+
+    Returns:
+        tuple: (function result, {'time': seconds, 'peak_memory': bytes or None})
+    """
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        start_time = time.perf_counter()
+        result = function(*args, **kwargs)
+        wall_time = time.perf_counter() - start_time
+        peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    return result, {'time': wall_time, 'peak_memory': peak_memory}
+
+
+def get_max_error(skin_weights, other_skin_weights):
+    """
+    Get the largest weight difference without dense matrices, both weights must have the same influences
+
+    Args:
+        skin_weights (skin_weights_lib.SkinWeights): weights
+        other_skin_weights (skin_weights_lib.SkinWeights): weights
+
+    Returns:
+        float: max absolute difference
+    """
+    difference = skin_weights_lib.SkinWeights.from_coo(
+        rows=np.concatenate([skin_weights.get_rows(), other_skin_weights.get_rows()]),
+        columns=np.concatenate([skin_weights.indices, other_skin_weights.indices]),
+        values=np.concatenate([skin_weights.values, -other_skin_weights.values]),
+        point_count=skin_weights.get_point_count(),
+        influences=skin_weights.influences)
+
+    return float(np.abs(difference.values).max(initial=0.0))
+
+
+def benchmark_file_formats(skin_weights, path, format_list=None, trace_memory=True):
+    """
+    Write and read the weights in each file format
+
+    Args:
+        skin_weights (skin_weights_lib.SkinWeights): weights
+        path (str): folder of the files
+        format_list (list, optional): keys of file_format_dict, None == all of them. Defaults to None.
+        trace_memory (bool, optional): trace the peak memory. Defaults to True.
+
+    Returns:
+        dict: {format: {'write_time', 'write_peak_memory', 'read_time', 'read_peak_memory', 'size', 'max_error'}}
+    """
+    format_list = format_list if format_list else list(file_format_dict)
+
+    result_dict = dict()
+    for file_format in format_list:
+        extension, write_function, read_function = file_format_dict[file_format]
+        file_path = f'{path}/{file_format}.{extension}'
+
+        _, write_data = measure(write_function, skin_weights, file_path, trace_memory=trace_memory)
+        read_weights, read_data = measure(read_function, file_path, trace_memory=trace_memory)
+
+        result_dict[file_format] = {'write_time': write_data['time'],
+                                    'write_peak_memory': write_data['peak_memory'],
+                                    'read_time': read_data['time'],
+                                    'read_peak_memory': read_data['peak_memory'],
+                                    'size': os.path.getsize(file_path),
+                                    'max_error': get_max_error(skin_weights, read_weights)}
+        os.remove(file_path)
+
+    return result_dict
+
+
+def benchmark_delta(skin_weights, path, changed_ratio=0.01, seed=0, trace_memory=True):
+    """
+    Write a base npz file and a delta patch with a region of the points changed
+
+    Args:
+        skin_weights (skin_weights_lib.SkinWeights): weights
+        path (str): folder of the files
+        changed_ratio (float, optional): fraction of points changed before the patch. Defaults to 0.01.
+        seed (int, optional): random seed. Defaults to 0.
+        trace_memory (bool, optional): trace the peak memory. Defaults to True.
+
+    Returns:
+        dict: {'base_time', 'patch_time', 'patch_peak_memory', 'patch_size', 'changed_blocks', 'block_count',
+               'read_time'}
+    """
+    file_path = f'{path}/delta.{skin_weights_lib.npz_extension}'
+    base_data, base_measure = measure(skin_weights_lib.write_skin_weights_delta, skin_weights, file_path,
+                                      trace_memory=False)
+
+    # Artists paint regions, the changed points are a contiguous range
+    random_generator = np.random.default_rng(seed)
+    changed_count = max(int(skin_weights.get_point_count() * changed_ratio), 1)
+    changed_start = int(random_generator.integers(0, skin_weights.get_point_count() - changed_count + 1))
+    changed_points = np.arange(changed_start, changed_start + changed_count)
+    changed_weights = skin_weights.copy()
+    # Not normalized, normalizing would also round the weights of the other points
+    changed_weights.values[np.isin(changed_weights.get_rows(), changed_points)] *= 0.5
+
+    patch_data, patch_measure = measure(skin_weights_lib.write_skin_weights_delta, changed_weights, file_path,
+                                        trace_memory=trace_memory)
+    _, read_measure = measure(skin_weights_lib.load_skin_weights_delta, file_path, trace_memory=False)
+
+    return {'base_time': base_measure['time'],
+            'patch_time': patch_measure['time'],
+            'patch_peak_memory': patch_measure['peak_memory'],
+            'patch_size': patch_data['size'],
+            'changed_blocks': patch_data['changed_blocks'],
+            'block_count': patch_data['block_count'],
+            'read_time': read_measure['time']}
+
+
+def benchmark_processing(skin_weights, trace_memory=True):
+    """
+    Run the in-memory steps of the imports: influence remapping, joint existence checks against the stand-in
+    scene, pruning and normalizing
+
+    Args:
+        skin_weights (skin_weights_lib.SkinWeights): weights
+        trace_memory (bool, optional): trace the peak memory. Defaults to True.
+
+    Returns:
+        dict: {step: {'time', 'peak_memory'}}
+    """
+    from maya import cmds
+
+    name_remapper = import_export_lib.NameRemapper(search_for='_l_,_r_', replace_with='_r_,_l_')
+    remapped_influences, remap_measure = measure(name_remapper.remap_list, skin_weights.influences,
+                                                 trace_memory=trace_memory)
+
+    # Joints of the import checked with objExists, the stand-in scene has them
+    standin_cmds = maya_standin.get_cmds()
+    if standin_cmds:
+        for influence in remapped_influences:
+            standin_cmds.createNode('joint', name=influence)
+    _, exists_measure = measure(lambda: [x for x in remapped_influences if not cmds.objExists(x)],
+                                trace_memory=trace_memory)
+    if standin_cmds:
+        standin_cmds.delete(remapped_influences)
+
+    _, prune_measure = measure(skin_weights.prune, max_influences=4, tolerance=1e-3, trace_memory=trace_memory)
+    _, normalize_measure = measure(skin_weights.copy().normalize, trace_memory=trace_memory)
+
+    return {'remap': remap_measure,
+            'exists': exists_measure,
+            'prune': prune_measure,
+            'normalize': normalize_measure}
+
+
+def benchmark_transfer(skin_weights, target_ratio=0.5, seed=0, trace_memory=True):
+    """
+    Transfer the weights by proximity to a denser or sparser copy of the mesh, the data side of the skin transfer
+
+    Args:
+        skin_weights (skin_weights_lib.SkinWeights): weights with points and triangles
+        target_ratio (float, optional): target point count relative to the source. Defaults to 0.5.
+        seed (int, optional): random seed. Defaults to 0.
+        trace_memory (bool, optional): trace the peak memory. Defaults to True.
+
+    Returns:
+        dict: {'index': {'time', 'peak_memory'}, method: {'time', 'peak_memory'}}
+    """
+    target_points, _ = create_synthetic_mesh(point_count=int(skin_weights.get_point_count() * target_ratio),
+                                             seed=seed + 1)
+
+    spatial_index, index_measure = measure(spatial_lib.SpatialIndex, skin_weights.points,
+                                           triangles=skin_weights.triangles, trace_memory=trace_memory)
+    result_dict = {'index': index_measure, 'target_point_count': len(target_points)}
+
+    def transfer(method):
+        if method == 'barycentric':
+            point_indices, coefficients = spatial_index.get_barycentric_weights(target_points)
+        elif method == 'inverse_distance':
+            point_indices, coefficients = spatial_index.get_inverse_distance_weights(target_points)
+        else:
+            point_indices, coefficients = spatial_index.get_nearest_weights(target_points)
+        return skin_weights.interpolate(point_indices=point_indices, coefficients=coefficients,
+                                        points=target_points)
+
+    for method in transfer_methods:
+        _, result_dict[method] = measure(transfer, method, trace_memory=trace_memory)
+
+    return result_dict
+
+
+def run_case(point_count=10000, influence_count=50, max_influences=8, format_list=None, path=None, seed=0,
+             trace_memory=True):
+    """
+    Run the benchmarks on one synthetic mesh
+
+    Args:
+        point_count (int, optional): approximate number of points. Defaults to 10000.
+        influence_count (int, optional): number of influences. Defaults to 50.
+        max_influences (int, optional): influences per point. Defaults to 8.
+        format_list (list, optional): keys of file_format_dict, None == all of them. Defaults to None.
+        path (str, optional): folder of the files, None == temporary folder. Defaults to None.
+        seed (int, optional): random seed. Defaults to 0.
+        trace_memory (bool, optional): trace the peak memory. Defaults to True.
+
+    Returns:
+        dict: case results
+    """
+    temporary_path = None if path else tempfile.mkdtemp(prefix='skinDataBenchmark')
+    path = path if path else temporary_path
+    try:
+        points, triangles = create_synthetic_mesh(point_count=point_count, seed=seed)
+        skin_weights, create_measure = measure(create_synthetic_weights, points, triangles=triangles,
+                                               influence_count=influence_count, max_influences=max_influences,
+                                               seed=seed, trace_memory=False)
+
+        result_dict = {'point_count': skin_weights.get_point_count(),
+                       'influence_count': influence_count,
+                       'max_influences': max_influences,
+                       'weight_count': len(skin_weights.values),
+                       'create_time': create_measure['time'],
+                       'formats': benchmark_file_formats(skin_weights, path, format_list=format_list,
+                                                         trace_memory=trace_memory),
+                       'delta': benchmark_delta(skin_weights, path, seed=seed, trace_memory=trace_memory),
+                       'processing': benchmark_processing(skin_weights, trace_memory=trace_memory),
+                       'transfer': benchmark_transfer(skin_weights, seed=seed, trace_memory=trace_memory)}
+    finally:
+        if temporary_path:
+            shutil.rmtree(temporary_path, ignore_errors=True)
+
+    logging.info('{point_count} points, {influence_count} influences done.'.format(**result_dict))
+
+    return result_dict
+
+
+def run_suite(point_counts=(10000, 100000, 1000000), influence_counts=(10, 100, 500), max_influences=8,
+              format_list=None, label=None, output_path=None, seed=0, trace_memory=True):
+    """
+    Run the benchmarks on every point count and influence count combination
+
+    Args:
+        point_counts (list, optional): point counts. Defaults to (10000, 100000, 1000000).
+        influence_counts (list, optional): influence counts. Defaults to (10, 100, 500).
+        max_influences (int, optional): influences per point. Defaults to 8.
+        format_list (list, optional): keys of file_format_dict, None == all of them. Defaults to None.
+        label (str, optional): version or branch name stored with the results. Defaults to None.
+        output_path (str, optional): json file of the results, None == not written. Defaults to None.
+        seed (int, optional): random seed. Defaults to 0.
+        trace_memory (bool, optional): trace the peak memory. Defaults to True.
+
+    Returns:
+        dict: {'benchmark_version', 'label', 'timestamp', 'python', 'numpy', 'platform', 'maya', 'cases'}
+    """
+    from maya import cmds
+
+    results = {'benchmark_version': benchmark_version,
+               'label': label,
+               'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'python': platform.python_version(),
+               'numpy': np.__version__,
+               'platform': platform.platform(),
+               'maya': None if maya_standin.get_cmds() else cmds.about(version=True),
+               'cases': list()}
+
+    for point_count in point_counts:
+        for influence_count in influence_counts:
+            results['cases'].append(run_case(point_count=point_count, influence_count=influence_count,
+                                             max_influences=max_influences, format_list=format_list, seed=seed,
+                                             trace_memory=trace_memory))
+
+    if output_path:
+        if os.path.dirname(output_path) and not os.path.exists(os.path.dirname(output_path)):
+            os.makedirs(os.path.dirname(output_path))
+        with open(output_path, 'w') as write_file:
+            json.dump(results, write_file, indent=4)
+        logging.info(f'{output_path} has been written.')
+
+    return results
+
+
+def main(argument_list=None):
+    """
+    Command line entry point, E.G. python benchmarks/skin_data_benchmark.py -p 10000 -i 10 100 -o results.json
+
+    Args:
+        argument_list (list, optional): arguments, None == sys.argv. Defaults to None.
+
+    Returns:
+        dict: suite results
+    """
+    parser = argparse.ArgumentParser(description='Skin data side benchmarks on synthetic meshes')
+    parser.add_argument('-p', '--points', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('-i', '--influences', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('-m', '--max-influences', type=int, default=8)
+    parser.add_argument('-f', '--formats', nargs='+', choices=list(file_format_dict), default=None)
+    parser.add_argument('-l', '--label', default=None)
+    parser.add_argument('-o', '--output', default=None)
+    parser.add_argument('--no-memory', action='store_true', help='do not trace the peak memory')
+    arguments = parser.parse_args(argument_list)
+
+    results = run_suite(point_counts=arguments.points, influence_counts=arguments.influences,
+                        max_influences=arguments.max_influences, format_list=arguments.formats,
+                        label=arguments.label, output_path=arguments.output, trace_memory=not arguments.no_memory)
+    if not arguments.output:
+        json.dump(results, sys.stdout, indent=4)
+
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# Imports
+import os
+import time
+import logging
+import tempfile
+
+import numpy as np
+
+# Maya imports
+from maya import cmds
+
+# Project imports
+from hiddenStrings.libs import skin_lib, skin_weights_lib, import_export_lib
+
+logging = logging.getLogger(__name__)
+
+
+def create_synthetic_skin(resolution=300, joint_count=50, max_influences=4, seed=0):
+    """
+    Create a plane skinned to a row of joints with random sparse weights
+
+    Args:
+        resolution (int, optional): subdivisions in X and Y, (resolution + 1)^2 vertices. Defaults to 300.
+        joint_count (int, optional): number of joints. Defaults to 50.
+        max_influences (int, optional): influences per vertex. Defaults to 4.
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        tuple: (node, skin_cluster, joint_list)
+    """
+    node = cmds.polyPlane(name='skinBenchmark_c_geo', width=10, height=10,
+                          subdivisionsX=resolution, subdivisionsY=resolution, constructionHistory=False)[0]
+
+    joint_list = list()
+    for index, position_x in enumerate(np.linspace(-5, 5, joint_count)):
+        cmds.select(clear=True)
+        joint_list.append(cmds.joint(name=f'skinBenchmark{index}_c_skn', position=(float(position_x), 0, 0)))
+
+    skin_cluster = skin_lib.create_skin_cluster(node=node, joints=joint_list)
+
+    # Random sparse weights, max_influences per vertex
+    random_generator = np.random.default_rng(seed)
+    point_count = cmds.polyEvaluate(node, vertex=True)
+    columns = random_generator.integers(0, joint_count, (point_count, max_influences))
+    values = random_generator.random((point_count, max_influences))
+
+    skin_weights = skin_weights_lib.SkinWeights.from_coo(rows=np.repeat(np.arange(point_count), max_influences),
+                                                         columns=columns.ravel(),
+                                                         values=values.ravel(),
+                                                         point_count=point_count,
+                                                         influences=joint_list)
+    skin_lib.set_skin_weights(skin_cluster=skin_cluster, skin_weights=skin_weights, normalize=True)
+
+    return node, skin_cluster, joint_list
+
+
+def run_benchmark(resolution=300, joint_count=50, max_influences=4, repeats=3, path=None):
+    """
+    Compare the deformerWeights import against the bulk MFnSkinCluster.setWeights import on a synthetic mesh.
+    The nodes created are deleted at the end
+
+    Args:
+        resolution (int, optional): subdivisions in X and Y of the plane. Defaults to 300.
+        joint_count (int, optional): number of joints. Defaults to 50.
+        max_influences (int, optional): influences per vertex. Defaults to 4.
+        repeats (int, optional): imports per mode, the best time is kept. Defaults to 3.
+        path (str, optional): folder for the exported file, None == temporary folder. Defaults to None.
+
+    Returns:
+        dict: benchmark results
+    """
+    path = path if path else tempfile.mkdtemp(prefix='skinBenchmark')
+
+    node, skin_cluster, joint_list = create_synthetic_skin(resolution=resolution,
+                                                           joint_count=joint_count,
+                                                           max_influences=max_influences)
+    try:
+        import_export_lib.export_skin_cluster(node=node, path=path)
+        skin_cluster = skin_lib.get_skin_cluster_index(node)
+        skin_path = r'{}/{}.json'.format(path, skin_cluster)
+        reference_weights = skin_lib.get_skin_weights(skin_cluster).to_dense()
+
+        results = {'point_count': reference_weights.shape[0],
+                   'influence_count': reference_weights.shape[1],
+                   'file_size': os.path.getsize(skin_path)}
+
+        for mode, bulk in (('deformerWeights', False), ('bulk', True)):
+            time_list = list()
+            for _ in range(repeats):
+                start_time = time.perf_counter()
+                import_export_lib.import_skin_cluster(node=node, path=skin_path, bulk=bulk)
+                time_list.append(time.perf_counter() - start_time)
+
+            imported_weights = skin_lib.get_skin_weights(skin_cluster).to_dense()
+            results[mode] = min(time_list)
+            results[f'{mode}_max_error'] = float(np.abs(imported_weights - reference_weights).max())
+
+        results['speedup'] = results['deformerWeights'] / results['bulk'] if results['bulk'] else None
+
+    finally:
+        cmds.delete(node, joint_list)
+
+    logging.info('{point_count} points, {influence_count} influences: deformerWeights {deformerWeights:.3f}s, '
+                 'bulk {bulk:.3f}s ({speedup:.1f}x)'.format(**results))
+
+    return results
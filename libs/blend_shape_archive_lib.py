@@ -0,0 +1,246 @@
+# Imports
+import re
+import json
+import logging
+
+import numpy as np
+
+# Project imports
+from hiddenStrings.libs import storage_lib
+
+logging = logging.getLogger(__name__)
+
+# File format, a binary archive with the deltas and a json sidecar with the names and envelopes
+archive_extension = 'deltas'
+sidecar_extension = 'json'
+archive_version = 1
+
+# Single index components, vtx[0], vtx[0:10], cv[3]...
+component_pattern = re.compile(r'^(\w+)\[(\d+)(?::(\d+))?\]$')
+
+
+def get_sidecar_path(file_path):
+    """
+    Get the sidecar path of an archive
+
+    Args:
+        file_path (str): full path of the archive, with the .deltas extension
+
+    Returns:
+        str: full path of the sidecar, {file_path}.json
+    """
+    return f'{file_path}.{sidecar_extension}'
+
+
+def parse_components(component_list):
+    """
+    Get the point indices of a component list
+
+    Args:
+        component_list (list): components, like ['vtx[0:10]', 'vtx[12]']
+
+    Returns:
+        tuple: (component type, np.ndarray indices), (None, None) if the components are not single index components
+    """
+    component_type = None
+    index_list = list()
+    for component in component_list:
+        match = component_pattern.match(component)
+        if not match or (component_type and match.group(1) != component_type):
+            return None, None
+        component_type = match.group(1)
+        start = int(match.group(2))
+        end = int(match.group(3)) if match.group(3) else start
+        index_list.append(np.arange(start, end + 1, dtype=np.int64))
+
+    indices = np.concatenate(index_list) if index_list else np.zeros(0, dtype=np.int64)
+
+    return component_type, indices
+
+
+def get_ranges(indices):
+    """
+    Compress point indices to inclusive ranges, the indices order is kept
+
+    Args:
+        indices (np.ndarray): point indices
+
+    Returns:
+        np.ndarray: (range_count, 2) int32 [start, end]
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    if not len(indices):
+        return np.zeros((0, 2), dtype=np.int32)
+
+    breaks = np.flatnonzero(np.diff(indices) != 1) + 1
+    starts = np.concatenate([[0], breaks])
+    ends = np.concatenate([breaks, [len(indices)]]) - 1
+
+    return np.stack([indices[starts], indices[ends]], axis=1).astype(np.int32)
+
+
+def expand_ranges(ranges):
+    """
+    Expand inclusive ranges to point indices
+
+    Args:
+        ranges (np.ndarray): (range_count, 2) [start, end]
+
+    Returns:
+        np.ndarray: point indices
+    """
+    ranges = np.asarray(ranges, dtype=np.int64).reshape(-1, 2)
+    counts = ranges[:, 1] - ranges[:, 0] + 1
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    return np.repeat(ranges[:, 0], counts) + offsets
+
+
+def format_components(component_type, ranges):
+    """
+    Format inclusive ranges as a component list
+
+    Args:
+        component_type (str): component type, like vtx
+        ranges (np.ndarray): (range_count, 2) [start, end]
+
+    Returns:
+        list: components, like ['vtx[0:10]', 'vtx[12]']
+    """
+    return [f'{component_type}[{start}]' if start == end else f'{component_type}[{start}:{end}]'
+            for start, end in np.asarray(ranges).reshape(-1, 2).tolist()]
+
+
+def write_archive(file_path, blend_shape_data, compression='zlib'):
+    """
+    Write a blendshape archive. Each target and in-between is a ranges chunk, the point indices compressed to
+    inclusive ranges, and a float32 (n, 3) deltas chunk. The names and envelopes are written to a json sidecar,
+    so the targets can be listed without opening the archive and read one at a time
+
+    Args:
+        file_path (str): full path of the archive, with the .deltas extension
+        blend_shape_data (dict): blendshape data from blend_shape_lib.get_blend_shape_data
+        compression (str, optional): 'zlib', 'lzma' or 'none' (mappable). Defaults to 'zlib'.
+
+    Returns:
+        tuple: (archive path, sidecar path)
+    """
+    chunk_dict = dict()
+    sidecar_dict = {'version': archive_version,
+                    'node': blend_shape_data['node'],
+                    'blendShape': blend_shape_data['blendShape'],
+                    'targets': dict()}
+
+    for target, target_data in blend_shape_data['targets'].items():
+        target_dict = {'envelope': target_data['envelope'], 'target_values': dict()}
+        for target_value, value_data in target_data['target_values'].items():
+            points_target = value_data['inputPointsTarget']
+            deltas = np.asarray(points_target if points_target is not None else list(), dtype=np.float32)
+            deltas = deltas.reshape(len(deltas), -1)[:, :3] if len(deltas) else np.zeros((0, 3), dtype=np.float32)
+            component_list = value_data['inputComponentsTarget'] or list()
+            component_type, indices = parse_components(component_list)
+
+            value_dict = {'point_count': len(deltas)}
+            if value_data.get('name'):
+                value_dict['name'] = value_data['name']
+            if component_type and len(indices) == len(deltas):
+                value_dict['component_type'] = component_type
+                chunk_dict[f'{target}/{target_value}/ranges'] = get_ranges(indices)
+            else:
+                # Multi index components, surface cvs or lattice points, are kept as they are
+                value_dict['components'] = list(component_list)
+            chunk_dict[f'{target}/{target_value}/deltas'] = np.ascontiguousarray(deltas)
+
+            target_dict['target_values'][target_value] = value_dict
+        sidecar_dict['targets'][target] = target_dict
+
+    storage_lib.write_chunk_file(file_path, chunk_dict, metadata={'version': archive_version,
+                                                                  'blendShape': blend_shape_data['blendShape']},
+                                 compression=compression)
+
+    sidecar_path = get_sidecar_path(file_path)
+    with open(sidecar_path, 'w') as write_file:
+        json.dump(sidecar_dict, write_file, indent=4)
+
+    return file_path, sidecar_path
+
+
+def read_sidecar(file_path):
+    """
+    Read the sidecar of an archive
+
+    Args:
+        file_path (str): full path of the archive, with the .deltas extension
+
+    Returns:
+        dict: sidecar data, node, blendShape and the targets without deltas
+    """
+    with open(get_sidecar_path(file_path), 'r') as read_file:
+        return json.load(read_file)
+
+
+def read_target(file_path, target, mmap_mode=None, sidecar_dict=None, chunk_reader=None):
+    """
+    Read one target of an archive, only the chunks of the target are read
+
+    Args:
+        file_path (str): full path of the archive, with the .deltas extension
+        target (str): name of the target
+        mmap_mode (str, optional): np.memmap mode of uncompressed archives, None == read the arrays.
+                                   Defaults to None.
+        sidecar_dict (dict, optional): sidecar data, None == read it. Defaults to None.
+        chunk_reader (storage_lib.ChunkFileReader, optional): reader of the archive, None == open it.
+                                                              Defaults to None.
+
+    Returns:
+        dict: target data like blend_shape_lib.get_target_data, inputPointsTarget as float32 (n, 4) arrays
+    """
+    sidecar_dict = sidecar_dict if sidecar_dict else read_sidecar(file_path)
+    chunk_reader = chunk_reader if chunk_reader else storage_lib.ChunkFileReader(file_path, mmap_mode=mmap_mode)
+    if target not in sidecar_dict['targets']:
+        raise KeyError(f'{target} is not a target of {file_path}')
+
+    target_dict = sidecar_dict['targets'][target]
+    target_data = {'envelope': target_dict['envelope'], 'target_values': dict()}
+    for target_value, value_dict in target_dict['target_values'].items():
+        deltas = chunk_reader.read_chunk(f'{target}/{target_value}/deltas')
+        if 'components' in value_dict:
+            component_list = value_dict['components']
+        else:
+            component_list = format_components(value_dict['component_type'],
+                                               chunk_reader.read_chunk(f'{target}/{target_value}/ranges'))
+
+        points_target = np.ones((len(deltas), 4), dtype=np.float32)
+        points_target[:, :3] = deltas
+
+        value_data = {'inputPointsTarget': points_target, 'inputComponentsTarget': component_list}
+        if value_dict.get('name'):
+            value_data['name'] = value_dict['name']
+        target_data['target_values'][target_value] = value_data
+
+    return target_data
+
+
+def read_archive(file_path, target_list=None, mmap_mode=None):
+    """
+    Read an archive
+
+    Args:
+        file_path (str): full path of the archive, with the .deltas extension
+        target_list (list, optional): targets to read, None == all of them. Defaults to None.
+        mmap_mode (str, optional): np.memmap mode of uncompressed archives, None == read the arrays.
+                                   Defaults to None.
+
+    Returns:
+        dict: blendshape data like blend_shape_lib.get_blend_shape_data, with the targets of target_list only
+    """
+    sidecar_dict = read_sidecar(file_path)
+    chunk_reader = storage_lib.ChunkFileReader(file_path, mmap_mode=mmap_mode)
+    target_list = list(sidecar_dict['targets']) if target_list is None else target_list
+
+    blend_shape_data = {'node': sidecar_dict['node'], 'blendShape': sidecar_dict['blendShape'], 'targets': dict()}
+    for target in target_list:
+        blend_shape_data['targets'][target] = read_target(file_path, target, sidecar_dict=sidecar_dict,
+                                                          chunk_reader=chunk_reader)
+
+    return blend_shape_data
@@ -1,15 +1,501 @@
 # Imports
+import re
 import logging
 from collections import OrderedDict
 
+import numpy as np
+
 # Maya imports
 from maya import cmds, mel
+from maya.api import OpenMaya
 
 # Project imports
-from hiddenStrings.libs import side_lib, usage_lib, skin_lib, nurbs_lib
+from hiddenStrings.libs import (side_lib, usage_lib, deformer_lib, skin_lib, nurbs_lib, mesh_lib, modifier_lib,
+                                spatial_lib, symmetry_lib)
 
 logging = logging.getLogger(__name__)
 
+# Target components, vtx[0:10], cv[0][1], pt[0][0][1]...
+component_pattern = re.compile(r'^(\w+)((?:\[\d+(?::\d+)?\])+)$')
+component_range_pattern = re.compile(r'\[(\d+)(?::(\d+))?\]')
+# {(component type, index count): (function set, component type id)}
+component_type_dict = {('vtx', 1): (OpenMaya.MFnSingleIndexedComponent, OpenMaya.MFn.kMeshVertComponent),
+                       ('cv', 1): (OpenMaya.MFnSingleIndexedComponent, OpenMaya.MFn.kCurveCVComponent),
+                       ('cv', 2): (OpenMaya.MFnDoubleIndexedComponent, OpenMaya.MFn.kSurfaceCVComponent),
+                       ('pt', 3): (OpenMaya.MFnTripleIndexedComponent, OpenMaya.MFn.kLatticeComponent)}
+
+# Delta transfer correspondences, see get_transfer_correspondence
+transfer_methods = ['barycentric', 'rbf']
+
+
+class BlendShapeDescriptor(object):
+    """
+    Lookup tables of a blendShape: target aliases, target directory order, in-between items and names, and weights.
+    Each table is read once with the API the first time it is needed, so the functions of this lib can share one
+    descriptor instead of querying the aliases and the in-betweens per call.
+    The functions that add, remove or rename targets invalidate the descriptor given to them
+
+    Example:
+        descriptor = blend_shape_lib.BlendShapeDescriptor(blend_shape)
+        for target in descriptor.get_target_list():
+            target_data = blend_shape_lib.get_target_data(blend_shape, target, descriptor=descriptor)
+
+    Args:
+        blend_shape (str): name of the blendshape
+    """
+    def __init__(self, blend_shape):
+        """
+        Initializes an instance of BlendShapeDescriptor
+
+        Args:
+            blend_shape (str): name of the blendshape
+        """
+        check_blendshape(blend_shape=blend_shape)
+
+        self.blend_shape = blend_shape
+        self.invalidate()
+
+
+    def invalidate(self):
+        """
+        Clear the tables, they are read again when needed
+        """
+        self.target_index_dict = None
+        self.target_name_dict = None
+        self.target_order_list = None
+        self.item_dict = None
+        self.in_between_name_dict = None
+        self.weight_dict = None
+
+
+    def invalidate_values(self):
+        """
+        Clear the in-between names and the weights, the targets and in-betweens are kept
+        """
+        self.in_between_name_dict = None
+        self.weight_dict = None
+
+
+    def get_plug(self, attribute):
+        """
+        Get a plug of the blendShape
+
+        Args:
+            attribute (str): attribute path, like inputTarget[0].inputTargetGroup
+
+        Returns:
+            OpenMaya.MPlug: plug
+        """
+        selection_list = OpenMaya.MSelectionList()
+        selection_list.add(f'{self.blend_shape}.{attribute}')
+
+        return selection_list.getPlug(0)
+
+
+    def get_item_plugs(self, target, item_index):
+        """
+        Get the delta plugs of a target or in-between
+
+        Args:
+            target (str): name of the target
+            item_index (int): item index, 5000 + value * 1000
+
+        Returns:
+            tuple: (inputPointsTarget OpenMaya.MPlug, inputComponentsTarget OpenMaya.MPlug)
+        """
+        target_group_plug = self.get_plug('inputTarget[0].inputTargetGroup')
+        depend_node_fn = OpenMaya.MFnDependencyNode(target_group_plug.node())
+
+        item_plug = target_group_plug.elementByLogicalIndex(self.get_target_index(target)).child(
+            depend_node_fn.attribute('inputTargetItem')).elementByLogicalIndex(int(item_index))
+
+        return (item_plug.child(depend_node_fn.attribute('inputPointsTarget')),
+                item_plug.child(depend_node_fn.attribute('inputComponentsTarget')))
+
+
+    # ---------- Read methods ----------
+    def read_aliases(self):
+        """
+        Read the target aliases in one aliasAttr query
+        """
+        alias_list = cmds.aliasAttr(self.blend_shape, query=True) or list()
+
+        self.target_index_dict = OrderedDict()
+        for target, weight_plug in zip(alias_list[0::2], alias_list[1::2]):
+            self.target_index_dict[target] = int(weight_plug.split('[')[-1].split(']')[0])
+        self.target_name_dict = {index: target for target, index in self.target_index_dict.items()}
+
+
+    def read_items(self):
+        """
+        Read the inputTargetItem indices of every target group
+        """
+        target_group_plug = self.get_plug('inputTarget[0].inputTargetGroup')
+        item_attribute = OpenMaya.MFnDependencyNode(target_group_plug.node()).attribute('inputTargetItem')
+
+        self.item_dict = dict()
+        for target_index in target_group_plug.getExistingArrayAttributeIndices():
+            item_plug = target_group_plug.elementByLogicalIndex(target_index).child(item_attribute)
+            self.item_dict[target_index] = sorted(item_plug.getExistingArrayAttributeIndices())
+
+
+    def read_in_between_names(self):
+        """
+        Read the in-between names of every target
+        """
+        info_group_plug = self.get_plug('inbetweenInfoGroup')
+        depend_node_fn = OpenMaya.MFnDependencyNode(info_group_plug.node())
+        info_attribute = depend_node_fn.attribute('inbetweenInfo')
+        name_attribute = depend_node_fn.attribute('inbetweenTargetName')
+
+        self.in_between_name_dict = dict()
+        for target_index in info_group_plug.getExistingArrayAttributeIndices():
+            info_plug = info_group_plug.elementByLogicalIndex(target_index).child(info_attribute)
+            for item_index in info_plug.getExistingArrayAttributeIndices():
+                self.in_between_name_dict[(target_index, item_index)] = \
+                    info_plug.elementByLogicalIndex(item_index).child(name_attribute).asString()
+
+
+    def read_weights(self):
+        """
+        Read the target weights
+        """
+        weight_plug = self.get_plug('weight')
+
+        self.weight_dict = {index: weight_plug.elementByLogicalIndex(index).asFloat()
+                            for index in weight_plug.getExistingArrayAttributeIndices()}
+
+
+    # ---------- Target methods ----------
+    def get_target_list(self):
+        """
+        Get the target names, in alias order
+
+        Returns:
+            list: target names
+        """
+        if self.target_index_dict is None:
+            self.read_aliases()
+
+        return list(self.target_index_dict)
+
+
+    def get_target_index(self, target):
+        """
+        Get the index of a target
+
+        Args:
+            target (str): name of the target
+
+        Returns:
+            int: index of the target, None if the target does not exist
+        """
+        if self.target_index_dict is None:
+            self.read_aliases()
+
+        return self.target_index_dict.get(target)
+
+
+    def get_target_name(self, target_index):
+        """
+        Get the name of a target
+
+        Args:
+            target_index (int): index of the target
+
+        Returns:
+            str: name of the target
+        """
+        if self.target_name_dict is None:
+            self.read_aliases()
+
+        return self.target_name_dict[int(target_index)]
+
+
+    def get_next_target_index(self):
+        """
+        Get the next target index
+
+        Returns:
+            int: next available target index
+        """
+        if self.target_name_dict is None:
+            self.read_aliases()
+
+        return max(self.target_name_dict) + 1 if self.target_name_dict else 0
+
+
+    def get_target_order(self):
+        """
+        Get the target indices in the shape editor order, the directories are skipped
+
+        Returns:
+            list: target indices
+        """
+        if self.target_order_list is None:
+            self.target_order_list = [x for x in cmds.getAttr(f'{self.blend_shape}.targetDirectory[0].childIndices')
+                                      or list() if x >= 0]
+
+        return self.target_order_list
+
+
+    def get_weight(self, target):
+        """
+        Get the weight of a target
+
+        Args:
+            target (str): name of the target
+
+        Returns:
+            float: weight
+        """
+        if self.weight_dict is None:
+            self.read_weights()
+
+        return self.weight_dict.get(self.get_target_index(target), 0.0)
+
+
+    # ---------- In-between methods ----------
+    def get_item_indices(self, target):
+        """
+        Get the inputTargetItem indices of a target, 5000 + value * 1000
+
+        Args:
+            target (str): name of the target
+
+        Returns:
+            list: item indices, the target is 6000
+        """
+        if self.item_dict is None:
+            self.read_items()
+
+        return self.item_dict.get(self.get_target_index(target), list())
+
+
+    def get_target_values(self, target):
+        """
+        Get the values of the in-betweens of a target, including the 1.0
+
+        Args:
+            target (str): name of the target
+
+        Returns:
+            list: values
+        """
+        return [(x - 5000) * 0.001 for x in self.get_item_indices(target)]
+
+
+    def has_in_between(self, target, value):
+        """
+        Check if the target has an in-between at the value
+
+        Args:
+            target (str): name of the target
+            value (float): value of the in-between
+
+        Returns:
+            bool: True == in-between exists
+        """
+        return get_item_index(value) in self.get_item_indices(target)
+
+
+    def get_in_between_name(self, target, item_index):
+        """
+        Get the name of an in-between
+
+        Args:
+            target (str): name of the target
+            item_index (int): item index of the in-between
+
+        Returns:
+            str: in-between name, None if it has none
+        """
+        if self.in_between_name_dict is None:
+            self.read_in_between_names()
+
+        return self.in_between_name_dict.get((self.get_target_index(target), int(item_index)))
+
+
+    def get_in_between_value(self, target, in_between):
+        """
+        Get the value of an in-between from its name
+
+        Args:
+            target (str): name of the target
+            in_between (str): name of the in-between
+
+        Returns:
+            float: in-between value, None if the target has no in-between with that name
+        """
+        for item_index in self.get_item_indices(target):
+            if self.get_in_between_name(target, item_index) == in_between:
+                return (item_index - 5000) * 0.001
+
+
+def get_item_index(value):
+    """
+    Get the inputTargetItem index of an in-between value
+
+    Args:
+        value (float): in-between value, 1.0 == target
+
+    Returns:
+        int: item index, 5000 + value * 1000
+    """
+    return int(round(float(value) * 1000 + 5000))
+
+
+def get_blend_shape_descriptor(blend_shape, descriptor=None):
+    """
+    Get the descriptor given, or build one for the blendshape
+
+    Args:
+        blend_shape (str): name of the blendshape
+        descriptor (BlendShapeDescriptor, optional): descriptor to reuse. Defaults to None.
+
+    Returns:
+        BlendShapeDescriptor: descriptor
+    """
+    return descriptor if descriptor is not None else BlendShapeDescriptor(blend_shape)
+
+
+def get_point_array_data(points):
+    """
+    Build a pointArray data object from the deltas
+
+    Args:
+        points (np.ndarray): (n, 3) or (n, 4) deltas, or the list of tuples of inputPointsTarget
+
+    Returns:
+        OpenMaya.MObject: MFnPointArrayData object
+    """
+    points = np.asarray(points, dtype=np.float64)
+    points = points.reshape(len(points), -1)[:, :3] if len(points) else np.zeros((0, 3))
+
+    return OpenMaya.MFnPointArrayData().create(OpenMaya.MPointArray(points.tolist()))
+
+
+def get_component_elements(component_list):
+    """
+    Get the indices of each point of a target component list, the index ranges are expanded with numpy
+
+    Args:
+        component_list (list): components, like ['vtx[0:10]', 'vtx[12]'], ['cv[0][1]'] or ['pt[0][0][1]']
+
+    Returns:
+        tuple: (component type, np.ndarray (point_count, index count) indices)
+    """
+    component_type = None
+    element_list = list()
+    for component in component_list:
+        match = component_pattern.match(component)
+        if not match or (component_type and match.group(1) != component_type):
+            cmds.error(f'{component} is not a valid target component')
+        component_type = match.group(1)
+        ranges = [(int(start), int(end) if end else int(start))
+                  for start, end in component_range_pattern.findall(match.group(2))]
+        grids = np.meshgrid(*[np.arange(start, end + 1) for start, end in ranges], indexing='ij')
+        element_list.append(np.stack([x.ravel() for x in grids], axis=1))
+
+    if not element_list:
+        return None, np.zeros((0, 1), dtype=np.int64)
+
+    return component_type, np.concatenate(element_list).astype(np.int64)
+
+
+def format_component_elements(component_type, elements):
+    """
+    Format point indices as a target component list, consecutive single indices are grouped in ranges
+
+    Args:
+        component_type (str): component type, like vtx
+        elements (np.ndarray): (point_count, index count) indices
+
+    Returns:
+        list: components, like ['vtx[0:10]', 'vtx[12]'] or ['cv[0][1]', 'cv[0][2]']
+    """
+    elements = np.asarray(elements, dtype=np.int64)
+    if not len(elements):
+        return list()
+    if elements.shape[1] > 1:
+        return ['{}{}'.format(component_type, ''.join(f'[{x}]' for x in element)) for element in elements.tolist()]
+
+    indices = elements[:, 0]
+    breaks = np.flatnonzero(np.diff(indices) != 1) + 1
+    starts = np.concatenate([[0], breaks]).astype(np.int64)
+    ends = np.concatenate([breaks, [len(indices)]]).astype(np.int64) - 1
+
+    return [f'{component_type}[{indices[start]}]' if start == end else
+            f'{component_type}[{indices[start]}:{indices[end]}]' for start, end in zip(starts, ends)]
+
+
+def get_component_list_data(component_list):
+    """
+    Build a componentList data object from the components
+
+    Args:
+        component_list (list): components, like ['vtx[0:10]', 'vtx[12]'], ['cv[0][1]'] or ['pt[0][0][1]']
+
+    Returns:
+        OpenMaya.MObject: MFnComponentListData object
+    """
+    component_list_fn = OpenMaya.MFnComponentListData()
+    component_list_data = component_list_fn.create()
+
+    component_type, elements = get_component_elements(component_list)
+    if component_type is None:
+        return component_list_data
+
+    dimension = elements.shape[1]
+    if (component_type, dimension) not in component_type_dict:
+        cmds.error(f'{component_type} components with {dimension} indices are not supported')
+    component_fn_type, component_type_id = component_type_dict[(component_type, dimension)]
+    component_fn = component_fn_type()
+    component = component_fn.create(component_type_id)
+    component_fn.addElements(elements[:, 0].tolist() if dimension == 1 else elements.tolist())
+    component_list_fn.add(component)
+
+    return component_list_data
+
+
+def set_target_deltas(blend_shape, target, target_data, descriptor=None, modifier=None):
+    """
+    Set the deltas of a target and its in-betweens through their plugs. The pointArray and componentList data
+    objects are built from numpy buffers, without expanding the deltas to setAttr arguments.
+    The target and in-betweens must exist, see set_target_data
+
+    Args:
+        blend_shape (str): name of the blendshape
+        target (str): name of the target
+        target_data (dict): blendshape target data dict from the get_target_data, the inputPointsTarget can be
+                            np.ndarray
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one.
+                                                     Defaults to None.
+        modifier (OpenMaya.MDGModifier, optional): modifier where the values are queued, None == set them in a new
+                                                   modifier. Defaults to None.
+
+    Returns:
+        OpenMaya.MDGModifier: modifier
+    """
+    descriptor = get_blend_shape_descriptor(blend_shape, descriptor)
+    apply = modifier is None
+    modifier = OpenMaya.MDGModifier() if apply else modifier
+
+    for target_value, value_data in target_data['target_values'].items():
+        points_target = value_data['inputPointsTarget']
+        components_target = value_data['inputComponentsTarget']
+        if points_target is None or not len(points_target) or not components_target:
+            continue
+
+        points_plug, components_plug = descriptor.get_item_plugs(target, get_item_index(target_value))
+        modifier.newPlugValue(points_plug, get_point_array_data(points_target))
+        modifier.newPlugValue(components_plug, get_component_list_data(components_target))
+
+    if apply:
+        modifier_lib.apply_modifier(modifier)
+
+    return modifier
+
 
 def check_blendshape(blend_shape):
     """
@@ -24,27 +510,25 @@ def check_blendshape(blend_shape):
         cmds.error(f'{blend_shape} is not a blendShape')
 
 
-def check_target(blend_shape, target):
+def check_target(blend_shape, target, descriptor=None):
     """
     Check if the blendshape target already exists
 
     Args:
         blend_shape (str): name of the blendshape
         target (str): name of the target
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one.
+                                                     Defaults to None.
 
     Returns:
         bool: True == target exists
     """
-    check_blendshape(blend_shape=blend_shape)
+    descriptor = get_blend_shape_descriptor(blend_shape, descriptor)
 
-    targets_list = get_blendshape_target_list(blend_shape=blend_shape)
-    if targets_list and target in targets_list:
-        return True
-    else:
-        return False
+    return descriptor.get_target_index(target) is not None
 
 
-def check_in_between(blend_shape, target, value):
+def check_in_between(blend_shape, target, value, descriptor=None):
     """
     Check if the blendshape target in-between already exists
 
@@ -52,25 +536,15 @@ def check_in_between(blend_shape, target, value):
         blend_shape (str): name of the blendshape
         target (str): name of the target
         value (float): value of the in-between
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one.
+                                                     Defaults to None.
 
     Returns:
         bool: True == in-between exists
     """
-    target_index = get_target_index(blend_shape=blend_shape, target=target)
-    target_data = cmds.listAttr(f'{blend_shape}.inputTarget[0].inputTargetGroup[{target_index}]', multi=True)
+    descriptor = get_blend_shape_descriptor(blend_shape, descriptor)
 
-    target_values_list = list()
-    for target in target_data:
-        if target.find("inputGeomTarget") != -1:
-            target_value = target.split('.')[-2].split('[')[-1].split(']')[0]
-
-            target_value = (int(target_value) - 5000) * 0.001
-            target_values_list.append(target_value)
-
-    if value in target_values_list:
-        return True
-    else:
-        return False
+    return descriptor.has_in_between(target, value)
 
 
 def get_blend_shape_name(node):
@@ -95,7 +569,7 @@ def get_blend_shape_name(node):
 
 def get_blend_shape(node):
     """
-    Get blendShape attached to the node
+    Get blendShape attached to the node, cached inside a deformer_lib.deformer_history_cache scope
 
     Args:
         node (str): name of the node
@@ -103,13 +577,9 @@ def get_blend_shape(node):
     Returns:
         str: blendshape node name
     """
-    blend_shape = None
-    inputs_list = cmds.listHistory(node, interestLevel=1, pruneDagObjects=True)
-    if inputs_list:
-        for item in inputs_list:
-            if cmds.objectType(item) == 'blendShape':
-                blend_shape = item
-    return blend_shape
+    blend_shape_list = deformer_lib.get_deformer_list(node, 'blendShape')
+
+    return blend_shape_list[-1] if blend_shape_list else None
 
 
 def get_blend_shape_node(blend_shape):
@@ -127,6 +597,30 @@ def get_blend_shape_node(blend_shape):
     return node
 
 
+def get_blend_shape_base(blend_shape):
+    """
+    Get the base geometry of the blendShape, the data of its originalGeometry[0] plug, or of input[0].inputGeometry
+    when the original geometry is not connected. The shapes under the deformed node are not used, they can be
+    posed, leftover Orig shapes or the geometry before other deformers
+
+    Args:
+        blend_shape (str): name of the blendshape
+
+    Returns:
+        OpenMaya.MObject: geometry data, mesh data for meshes
+    """
+    selection_list = OpenMaya.MSelectionList()
+    selection_list.add(blend_shape)
+    node_fn = OpenMaya.MFnDependencyNode(selection_list.getDependNode(0))
+
+    plug = node_fn.findPlug('originalGeometry', False).elementByLogicalIndex(0)
+    if not plug.isDestination:
+        plug = node_fn.findPlug('input', False).elementByLogicalIndex(0).child(
+            node_fn.attribute('inputGeometry'))
+
+    return plug.asMObject()
+
+
 def get_blend_shape_index(blend_shape):
     """
     Get the blendShape index
@@ -140,122 +634,89 @@ def get_blend_shape_index(blend_shape):
     return cmds.listConnections(f'{blend_shape}.midLayerParent', plugs=True)[0].split('[')[-1].split(']')[0]
 
 
-def get_blendshape_target_list(blend_shape):
+def get_blendshape_target_list(blend_shape, descriptor=None):
     """
     Get the blendshape targets names
 
     Args:
         blend_shape (str): name of the blendshape
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one.
+                                                     Defaults to None.
 
     Returns:
         list: get the blendshape target list
     """
-    target_list = cmds.aliasAttr(blend_shape, query=True)
+    target_list = get_blend_shape_descriptor(blend_shape, descriptor).get_target_list()
     if target_list:
-        return target_list[0::2]
+        return target_list
     else:
         return None
 
 
-def get_target_name(blend_shape, target_index):
+def get_target_name(blend_shape, target_index, descriptor=None):
     """
     Get the target's name
 
     Args:
         blend_shape (str): name of the blendshape
         target_index (float): number of the target
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one.
+                                                     Defaults to None.
 
     Returns:
         str: target's name
     """
-    target_list = cmds.aliasAttr(blend_shape, query=True)
-    target_dict = dict()
-    for target_name in target_list[1::2]:
-        index = target_list.index(target_name)
-        target_dict[target_name.split('[')[-1].split(']')[0]] = target_list[index - 1]
+    return get_blend_shape_descriptor(blend_shape, descriptor).get_target_name(target_index)
 
-    return target_dict[str(target_index)]
 
-
-def get_target_values(blend_shape, target):
+def get_target_values(blend_shape, target, descriptor=None):
     """
     Get the values of the in-betweens of a target (include the 1.0 value)
 
     Args:
         blend_shape (str): name of the blendshape
         target (str): target name
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one.
+                                                     Defaults to None.
 
     Returns:
         list: values of the in-betweens, including the 1.0
     """
-    check_blendshape(blend_shape=blend_shape)
-
-    target_index = get_target_index(blend_shape=blend_shape, target=target)
-    target_data = cmds.listAttr(f'{blend_shape}.inputTarget[0].inputTargetGroup[{target_index}]', multi=True)
-
-    target_values_list = list()
-    for target in target_data:
-        if target.find("inputGeomTarget") != -1:
-            target_value = target.split('.')[-2].split('[')[-1].split(']')[0]
-
-            target_value = (int(target_value) - 5000) * 0.001
-            target_values_list.append(target_value)
-
-    return target_values_list
+    return get_blend_shape_descriptor(blend_shape, descriptor).get_target_values(target)
 
 
-def get_target_index(blend_shape, target):
+def get_target_index(blend_shape, target, descriptor=None):
     """
     Get the index of a blendshape target
 
     Args:
         blend_shape (str): name of the blendshape
         target (str): name of the target
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one.
+                                                     Defaults to None.
 
     Returns:
         int: index of the target
     """
-    check_blendshape(blend_shape=blend_shape)
-   
-    target_list = cmds.aliasAttr(blend_shape, query=True)
-
-    if target_list and target in target_list:
-        target_dict = dict()
-        for target_name in target_list[0::2]:
-            index = target_list.index(target)
-            target_dict[target_name] = target_list[index + 1].split('[')[-1].split(']')[0]
-        return int(target_dict[target])
-    else:
-        return None
+    return get_blend_shape_descriptor(blend_shape, descriptor).get_target_index(target)
 
 
-def get_next_target_index(blend_shape):
+def get_next_target_index(blend_shape, descriptor=None):
     """
     Get the next target index of a blendshape
 
     Args:
         blend_shape (str): name of the blendshape
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one.
+                                                     Defaults to None.
 
     Returns:
         int: next available target index of a blendshape
     """
-    check_blendshape(blend_shape=blend_shape)
-
-    target_list = cmds.aliasAttr(blend_shape, query=True)
-    if target_list:
-        target_index_list = list()
-        for target_name in target_list[1::2]:
-            target_index = target_name.split('[')[-1].split(']')[0]
-            target_index_list.append(int(target_index))
-        index = max(target_index_list) + 1
-
-    else:
-        index = 0
-
-    return index
+    return get_blend_shape_descriptor(blend_shape, descriptor).get_next_target_index()
 
 
-def get_in_between_value(blend_shape, target, in_between):
+def get_in_between_value(blend_shape, target, in_between, descriptor=None):
     """
     Get the in between value
 
@@ -263,17 +724,13 @@ def get_in_between_value(blend_shape, target, in_between):
         blend_shape (str): name of the blendshape
         target (str): name of the target
         in_between (str): in_between name
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one.
+                                                     Defaults to None.
 
     Returns:
         float: in-between value
     """
-    for value in get_target_values(blend_shape=blend_shape, target=target):
-        in_between_name = cmds.getAttr('{}.inbetweenInfoGroup[{}].inbetweenInfo[5{}].inbetweenTargetName'.format(
-                                                                            blend_shape,
-                                                                            get_target_index(blend_shape, target),
-                                                                            str(value).split('.')[-1]))
-        if in_between_name == in_between:
-            return value
+    return get_blend_shape_descriptor(blend_shape, descriptor).get_in_between_value(target, in_between)
 
 
 def get_blend_shapes_from_shape_editor():
@@ -298,9 +755,12 @@ def get_targets_from_shape_editor(as_index=True):
     """
     selection_list = mel.eval('getShapeEditorTreeviewSelection(4)')
     if not as_index:
+        descriptor_dict = dict()
+        for blend_shape in {x.split('.')[0] for x in selection_list}:
+            descriptor_dict[blend_shape] = BlendShapeDescriptor(blend_shape)
         selection_list = ['{}.{}'.format(x.split('.')[0],
-                                         get_target_name(blend_shape=x.split('.')[0],
-                                                         target_index=x.split('.')[1])) for x in selection_list]
+                                         descriptor_dict[x.split('.')[0]].get_target_name(x.split('.')[1]))
+                          for x in selection_list]
 
     return selection_list
 
@@ -317,30 +777,35 @@ def get_in_betweens_from_shape_editor(as_index=True):
     """
     selection_list = mel.eval("getShapeEditorTreeviewSelection(16)")
     if not as_index:
-        selection_list = ['{}.{}.{}'.format(
-                                x.split('.')[0], 
-                                get_target_name(blend_shape=x.split('.')[0],
-                                                target_index=x.split('.')[1]),
-                                cmds.getAttr('{}.inbetweenInfoGroup[{}].inbetweenInfo[{}].inbetweenTargetName'.format(
-                                                                                                    x.split('.')[0],
-                                                                                                    x.split('.')[1],
-                                                                                                    x.split('.')[2])))
-                          for x in selection_list]
+        descriptor_dict = dict()
+        for blend_shape in {x.split('.')[0] for x in selection_list}:
+            descriptor_dict[blend_shape] = BlendShapeDescriptor(blend_shape)
+        in_between_list = list()
+        for x in selection_list:
+            blend_shape, target_index, item_index = x.split('.')
+            target = descriptor_dict[blend_shape].get_target_name(target_index)
+            in_between_list.append('{}.{}.{}'.format(blend_shape,
+                                                     target,
+                                                     descriptor_dict[blend_shape].get_in_between_name(target,
+                                                                                                      item_index)))
+        selection_list = in_between_list
 
     return selection_list
 
 
-def get_blend_shape_data(blend_shape):
+def get_blend_shape_data(blend_shape, descriptor=None):
     """
     Get blendshape data, including target in-between values and deltas
 
     Args:
         blend_shape (str): name of the blendshape
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one.
+                                                     Defaults to None.
 
     Returns:
         dict: blendshape data
     """
-    check_blendshape(blend_shape=blend_shape)
+    descriptor = get_blend_shape_descriptor(blend_shape, descriptor)
 
     blend_shape_data = OrderedDict()
 
@@ -348,122 +813,125 @@ def get_blend_shape_data(blend_shape):
     blend_shape_data['blendShape'] = blend_shape
     blend_shape_data['targets'] = dict()
 
-    targets_order_list = cmds.getAttr(f'{blend_shape}.targetDirectory[0].childIndices')
-    for target_order in targets_order_list:
-        target = get_target_name(blend_shape=blend_shape, target_index=target_order)
+    for target_order in descriptor.get_target_order():
+        target = descriptor.get_target_name(target_order)
 
-        blend_shape_data['targets'][target] = get_target_data(blend_shape=blend_shape, target=target)
+        blend_shape_data['targets'][target] = get_target_data(blend_shape=blend_shape, target=target,
+                                                              descriptor=descriptor)
 
     return blend_shape_data
 
 
-def get_target_data(blend_shape, target):
+def get_target_data(blend_shape, target, descriptor=None):
     """
-    Get target data, including in-betweens values and deltas
+    Get target data, including in-betweens values, names and deltas
 
     Args:
         blend_shape (str): name of the blendshape
         target (str): name of the target
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one.
+                                                     Defaults to None.
 
     Returns:
         dict: target data
     """
+    descriptor = get_blend_shape_descriptor(blend_shape, descriptor)
+    target_index = descriptor.get_target_index(target)
+
     target_dict = dict()
 
-    target_dict['envelope'] = round(cmds.getAttr(f'{blend_shape}.{target}'), 3)
+    target_dict['envelope'] = round(descriptor.get_weight(target), 3)
 
     target_dict['target_values'] = dict()
-    target_value_list = get_target_values(blend_shape=blend_shape, target=target)
-    for target_value in target_value_list:
-        target_value = round(target_value, 3)
-        target_value_int = int(target_value * 1000 + 5000)
-        target_value = str(round(target_value, 3))
-        points_target = cmds.getAttr(
-            '{}.inputTarget[0].inputTargetGroup[{}].inputTargetItem[{}].inputPointsTarget'.format(
-                blend_shape,
-                get_target_index(blend_shape=blend_shape, target=target),
-                target_value_int))
-
-        component_target = cmds.getAttr(
-            '{}.inputTarget[0].inputTargetGroup[{}].inputTargetItem[{}].inputComponentsTarget'.format(
-                blend_shape,
-                get_target_index(blend_shape=blend_shape, target=target),
-                target_value_int))
+    for target_value_int in descriptor.get_item_indices(target):
+        target_value = str(round((target_value_int - 5000) * 0.001, 3))
+        item_attribute = '{}.inputTarget[0].inputTargetGroup[{}].inputTargetItem[{}]'.format(blend_shape,
+                                                                                           target_index,
+                                                                                           target_value_int)
+        points_target = cmds.getAttr(f'{item_attribute}.inputPointsTarget')
+        component_target = cmds.getAttr(f'{item_attribute}.inputComponentsTarget')
 
         target_data = dict()
         target_data['inputPointsTarget'] = points_target
         target_data['inputComponentsTarget'] = component_target
+        if target_value_int != 6000 and descriptor.get_in_between_name(target, target_value_int):
+            target_data['name'] = descriptor.get_in_between_name(target, target_value_int)
 
         target_dict['target_values'][target_value] = target_data
 
     return target_dict
 
 
-def set_blendshape_data(blend_shape, blend_shape_data):
+def set_blendshape_data(blend_shape, blend_shape_data, descriptor=None, target_list=None):
     """
-    Set blendShape data including targets, in-betweens values and deltas
+    Set blendShape data including targets, in-betweens values and deltas. The deltas of every target are set in
+    one pass, with one modifier
 
     Args:
         blend_shape (str): name of the blendshape
         blend_shape_data (dict): blendshape data dict from get_blend_shape_data
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one.
+                                                     Defaults to None.
+        target_list (list, optional): targets to set, None == all of them. Defaults to None.
     """
-    for target in blend_shape_data['targets']:
-        set_target_data(blend_shape=blend_shape, target=target, target_data=blend_shape_data['targets'][target])
+    descriptor = get_blend_shape_descriptor(blend_shape, descriptor)
+    modifier = OpenMaya.MDGModifier()
+    with modifier_lib.undo_chunk('setBlendShapeData'):
+        for target in blend_shape_data['targets']:
+            if target_list is not None and target not in target_list:
+                continue
+            set_target_data(blend_shape=blend_shape, target=target, target_data=blend_shape_data['targets'][target],
+                            descriptor=descriptor, modifier=modifier)
+        modifier_lib.apply_modifier(modifier)
 
 
-def set_target_data(blend_shape, target, target_data):
+def set_target_data(blend_shape, target, target_data, descriptor=None, modifier=None):
     """
-    Set target data including in-betweens values and deltas
+    Set target data including in-betweens values and deltas, the deltas are set with set_target_deltas
 
     Args:
         blend_shape (str): name of the blendshape
         target (str): name of the target
         target_data (dict): blendshape target data dict from the get_target_data
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one.
+                                                     Defaults to None.
+        modifier (OpenMaya.MDGModifier, optional): modifier where the deltas are queued, None == set them in a new
+                                                   modifier. Defaults to None.
     """
-    if not check_target(blend_shape=blend_shape, target=target):
-        add_target(blend_shape=blend_shape, target=target)
+    descriptor = get_blend_shape_descriptor(blend_shape, descriptor)
+    if not check_target(blend_shape=blend_shape, target=target, descriptor=descriptor):
+        add_target(blend_shape=blend_shape, target=target, descriptor=descriptor)
 
-    target_index = get_target_index(blend_shape=blend_shape, target=target)
+    target_index = descriptor.get_target_index(target)
     for target_value in target_data['target_values']:
-        points_target = target_data['target_values'][target_value]['inputPointsTarget']
-        components_target = target_data['target_values'][target_value]['inputComponentsTarget']
         pretty_target_value = target_value
-        target_value = int(float(target_value) * 1000 + 5000)
+        in_between_name = target_data['target_values'][target_value].get('name', f'{target}_{pretty_target_value}')
+        target_value = get_item_index(target_value)
 
         if target_value != 6000 and not check_in_between(blend_shape=blend_shape,
                                                          target=target,
-                                                         value=target_value):
+                                                         value=pretty_target_value,
+                                                         descriptor=descriptor):
             add_in_between(blend_shape=blend_shape,
                            existing_target=target,
-                           in_between_target=f'{target}_{pretty_target_value}',
-                           value=pretty_target_value)
-
-        if points_target and components_target:
-            cmds.setAttr('{}.inputTarget[0].inputTargetGroup[{}].inputTargetItem[{}].inputPointsTarget'.format(
-                blend_shape,
-                target_index,
-                target_value),
-                len(points_target),
-                *points_target,
-                type='pointArray')
-            cmds.setAttr('{}.inputTarget[0].inputTargetGroup[{}].inputTargetItem[{}].inputComponentsTarget'.format(
-                blend_shape,
-                target_index,
-                target_value),
-                len(components_target),
-                *components_target,
-                type='componentList')
+                           in_between_target=in_between_name,
+                           value=pretty_target_value,
+                           descriptor=descriptor)
 
         if target_value != 6000:
             cmds.setAttr('{}.inbetweenInfoGroup[{}].inbetweenInfo[{}].inbetweenTargetName'.format(blend_shape,
                                                                                                   target_index,
                                                                                                   target_value),
-                         f'{target}_{pretty_target_value}',
+                         in_between_name,
                          type='string')
 
         if cmds.getAttr(f'{blend_shape}.{target}', settable=True):
             cmds.setAttr(f'{blend_shape}.{target}', target_data['envelope'])
 
+    descriptor.invalidate_values()
+    set_target_deltas(blend_shape=blend_shape, target=target, target_data=target_data, descriptor=descriptor,
+                      modifier=modifier)
+
 
 def rename_blend_shape(blend_shape):
     """
@@ -478,7 +946,10 @@ def rename_blend_shape(blend_shape):
     node_shape = cmds.blendShape(blend_shape, query=True, geometry=True)[0]
     node = cmds.listRelatives(node_shape, parent=True)[0]
 
-    return cmds.rename(blend_shape, get_blend_shape_name(node))
+    blend_shape = cmds.rename(blend_shape, get_blend_shape_name(node))
+    deformer_lib.invalidate_deformer_history()
+
+    return blend_shape
 
 
 def rename_all_blend_shapes():
@@ -490,7 +961,7 @@ def rename_all_blend_shapes():
         rename_blend_shape(blend_shape)
 
 
-def rename_target(blend_shape, target, new_name):
+def rename_target(blend_shape, target, new_name, descriptor=None):
     """
     Rename a blendshape target
 
@@ -498,17 +969,21 @@ def rename_target(blend_shape, target, new_name):
         blend_shape (str): name of the blendshape
         target (str): name of the target
         new_name (str): new name for the target
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, invalidated when the target is
+                                                     renamed. Defaults to None.
 
     Returns:
         str: new target name
     """
     if new_name != target:
         cmds.aliasAttr(new_name, f'{blend_shape}.{target}')
+        if descriptor is not None:
+            descriptor.invalidate()
 
     return new_name
 
 
-def rename_in_between(blend_shape, target, in_between, new_name):
+def rename_in_between(blend_shape, target, in_between, new_name, descriptor=None):
     """
     Rename an in-between target
 
@@ -517,18 +992,22 @@ def rename_in_between(blend_shape, target, in_between, new_name):
         target (str): name of the target
         in_between (str): name of the in-between
         new_name (str): new name for the in-betwee ntarget
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one.
+                                                     Defaults to None.
 
     Returns:
         str: new in-between target
     """
-    target_index = get_target_index(blend_shape, target)
-    in_between_value = str(get_in_between_value(blend_shape=blend_shape, target=target, in_between=in_between))
-    cmds.setAttr('{}.inbetweenInfoGroup[{}].inbetweenInfo[5{}].inbetweenTargetName'.format(
+    descriptor = get_blend_shape_descriptor(blend_shape, descriptor)
+    target_index = descriptor.get_target_index(target)
+    in_between_value = descriptor.get_in_between_value(target, in_between)
+    cmds.setAttr('{}.inbetweenInfoGroup[{}].inbetweenInfo[{}].inbetweenTargetName'.format(
                                                                                 blend_shape,
                                                                                 target_index,
-                                                                                in_between_value.split('.')[-1]), 
+                                                                                get_item_index(in_between_value)),
                 new_name,
                 type='string')
+    descriptor.invalidate_values()
 
     return new_name
 
@@ -545,27 +1024,31 @@ def create_blend_shape(node, target_list=None):
         str: name of the blendshape
     """
     blend_shape = cmds.blendShape(node, topologyCheck=False, name=get_blend_shape_name(node))[0]
+    deformer_lib.invalidate_deformer_history()
     if target_list:
+        descriptor = BlendShapeDescriptor(blend_shape)
         for target in target_list:
-            add_target(blend_shape=blend_shape, target=target)
+            add_target(blend_shape=blend_shape, target=target, descriptor=descriptor)
 
     return blend_shape
 
 
-def add_target(blend_shape, target):
+def add_target(blend_shape, target, descriptor=None):
     """
     Add target to an existing blendShape
 
     Args:
         blend_shape (str): name of the blendshape
         target (str): name of the new target
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one. It is
+                                                     invalidated when the target is added. Defaults to None.
 
     Returns:
         str: target name
     """
-    check_blendshape(blend_shape=blend_shape)
+    descriptor = get_blend_shape_descriptor(blend_shape, descriptor)
     node = get_blend_shape_node(blend_shape=blend_shape)
-    index = get_next_target_index(blend_shape=blend_shape)
+    index = descriptor.get_next_target_index()
 
     if cmds.objExists(target):
         cmds.blendShape(blend_shape, edit=True, topologyCheck=False, target=(node, index, target, 1.0))
@@ -576,11 +1059,12 @@ def add_target(blend_shape, target):
         cmds.delete(target)
 
         cmds.blendShape(blend_shape, edit=True, resetTargetDelta=(0, index))
+    descriptor.invalidate()
 
-    return get_target_name(blend_shape=blend_shape, target_index=index)
+    return descriptor.get_target_name(index)
 
 
-def add_in_between(blend_shape, existing_target, in_between_target, value):
+def add_in_between(blend_shape, existing_target, in_between_target, value, descriptor=None):
     """
     Add an in-between to a target
 
@@ -589,15 +1073,17 @@ def add_in_between(blend_shape, existing_target, in_between_target, value):
         existing_target (str): name of the target
         in_between_target (str): name of the in-between target
         value (float): from 0 to 1
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one. It is
+                                                     invalidated when the in-between is added. Defaults to None.
     """
-    check_blendshape(blend_shape=blend_shape)
+    descriptor = get_blend_shape_descriptor(blend_shape, descriptor)
     value = float(value)
     if not 0.0 < value < 1.0:
         cmds.error('The in-between must have a value greater than 0 but lower than 1')
 
     node_shape = cmds.blendShape(blend_shape, query=True, geometry=True)[0]
     node = cmds.listRelatives(node_shape, parent=True)[0]
-    index = get_target_index(blend_shape=blend_shape, target=existing_target)
+    index = descriptor.get_target_index(existing_target)
 
     if cmds.objExists(in_between_target):
         cmds.blendShape(blend_shape, edit=True, topologyCheck=False, target=(node, index, in_between_target, value))
@@ -605,23 +1091,27 @@ def add_in_between(blend_shape, existing_target, in_between_target, value):
         in_between_target = cmds.duplicate(node, name=existing_target)[0]
         cmds.blendShape(blend_shape, edit=True, topologyCheck=False, target=(node, index, in_between_target, value))
         cmds.delete(in_between_target)
+    descriptor.invalidate()
 
 
-def remove_target(blend_shape, target):
+def remove_target(blend_shape, target, descriptor=None):
     """
     Remove a target from its blendshape
 
     Args:
         blend_shape (str): name of the blendshape
         target (str): name of the target
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one. It is
+                                                     invalidated when the target is removed. Defaults to None.
     """
-    check_blendshape(blend_shape=blend_shape)
+    descriptor = get_blend_shape_descriptor(blend_shape, descriptor)
 
-    target_index = get_target_index(blend_shape=blend_shape, target=target)
+    target_index = descriptor.get_target_index(target)
     mel.eval(f'blendShapeDeleteTargetGroup {blend_shape} {target_index}')
+    descriptor.invalidate()
 
 
-def remove_in_between(blend_shape, target, value):
+def remove_in_between(blend_shape, target, value, descriptor=None):
     """
     Remove an in-between from its target
 
@@ -629,16 +1119,16 @@ def remove_in_between(blend_shape, target, value):
         blend_shape (str): name of the blendshape
         target (str): name of the target
         value (float): from 0 to 1. Value of the in-between
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one. It is
+                                                     invalidated when the in-between is removed. Defaults to None.
     """
-    check_blendshape(blend_shape=blend_shape)
-
-    index = get_target_index(blend_shape=blend_shape, target=target)
+    descriptor = get_blend_shape_descriptor(blend_shape, descriptor)
 
-    if check_in_between(blend_shape=blend_shape, target=target, value=value):
-        value = float(value)
-        value = value * 1000 + 5000
+    index = descriptor.get_target_index(target)
 
-        mel.eval(f'blendShapeDeleteInBetweenTarget {blend_shape} {index} {value}')
+    if descriptor.has_in_between(target, value):
+        mel.eval(f'blendShapeDeleteInBetweenTarget {blend_shape} {index} {get_item_index(value)}')
+        descriptor.invalidate()
     else:
         cmds.error(f'the in-between at {value} does not exists in {blend_shape}.{target}')
 
@@ -662,169 +1152,216 @@ def edit_target_or_in_between(*args):
             cmds.sculptTarget(blendshape_node, edit=True, target=int(target_index))
 
 
-def mirror_target(blend_shape, target):
+def get_mirror_grid(node_shape):
     """
-    Mirror blendShape target 
+    Get the point grid of a curve, surface or lattice and the grid dimension that goes along the X axis
+
+    Args:
+        node_shape (str): name of the nurbsCurve, nurbsSurface or lattice shape
+
+    Returns:
+        tuple: (dimensions, mirror dimension)
+    """
+    node_type = cmds.nodeType(node_shape)
+    selection_list = OpenMaya.MSelectionList()
+    selection_list.add(node_shape)
+
+    if node_type == 'nurbsCurve':
+        return (OpenMaya.MFnNurbsCurve(selection_list.getDagPath(0)).numCVs,), 0
+
+    if node_type == 'nurbsSurface':
+        surface_fn = OpenMaya.MFnNurbsSurface(selection_list.getDagPath(0))
+        mirror_dimension = 0 if nurbs_lib.get_param_along_x(nurbs=node_shape) == 'U' else 1
+        return (surface_fn.numCVsInU, surface_fn.numCVsInV), mirror_dimension
+
+    if node_type == 'lattice':
+        dimensions = tuple(cmds.getAttr(f'{node_shape}.{x}Divisions') for x in 'stu')
+        # The S, T or U direction with the biggest change on X
+        origin = cmds.xform(f'{node_shape}.pt[0][0][0]', query=True, worldSpace=True, translation=True)
+        x_change_list = list()
+        for dimension in range(3):
+            index = [0, 0, 0]
+            index[dimension] = 1 if dimensions[dimension] > 1 else 0
+            point = cmds.xform('{}.pt[{}][{}][{}]'.format(node_shape, *index),
+                               query=True, worldSpace=True, translation=True)
+            x_change_list.append(abs(point[0] - origin[0]))
+        return dimensions, x_change_list.index(max(x_change_list))
+
+    cmds.error(f'{node_shape} is not a nurbsCurve, nurbsSurface or lattice')
+
+
+def get_target_symmetry_map(blend_shape, method=symmetry_lib.positional, seed_edge=None, cache_path=None):
+    """
+    Get the symmetry map of the geometry deformed by the blendShape. Meshes use the symmetry map of the blendShape
+    base mesh (see get_blend_shape_base), cached on disk by topology hash, curves, surfaces and lattices the opposite
+    points of their grid
 
     Args:
         blend_shape (str): name of the blendshape
+        method (str, optional): mesh only, 'positional' or 'topological'. Defaults to 'positional'.
+        seed_edge (int, optional): mesh only, edge on the symmetry plane of the topological method.
+                                   Defaults to None.
+        cache_path (str, optional): mesh only, cache folder, None == mesh_lib.get_symmetry_cache_path.
+                                    Defaults to None.
+
+    Returns:
+        tuple: (symmetry map, dimensions), the opposite point of each point as flat indices of the point grid
+    """
+    node_shape = cmds.listRelatives(get_blend_shape_node(blend_shape=blend_shape), shapes=True,
+                                    noIntermediate=True)[0]
+
+    if cmds.nodeType(node_shape) == 'mesh':
+        symmetry_map = mesh_lib.get_mesh_symmetry_map(get_blend_shape_base(blend_shape), method=method, axis='x',
+                                                      seed_edge=seed_edge, cache_path=cache_path)
+        return symmetry_map, (len(symmetry_map),)
+
+    dimensions, mirror_dimension = get_mirror_grid(node_shape)
+
+    return symmetry_lib.get_grid_symmetry_map(dimensions, mirror_dimension), dimensions
+
+
+def get_mirror_target_name(target):
+    """
+    Get the name of the mirrored target, targets without side are left correctives
+
+    Args:
         target (str): name of the target
+
+    Returns:
+        str: name of the mirrored target
     """
-    # Get mirror target name
     if len(target.split('_')) == 3:
         descriptor, side, usage = target.split('_')
     else:
         descriptor = target
         side = side_lib.left
         usage = usage_lib.corrective
-    target_mirror_name = f'{descriptor}_{side_lib.get_opposite_side(side)}_{usage}'
 
-    # Get target data
-    target_data = get_target_data(blend_shape=blend_shape, target=target)
+    return f'{descriptor}_{side_lib.get_opposite_side(side)}_{usage}'
 
-    # Set target data in the mirror target
-    set_target_data(blend_shape=blend_shape, target=target_mirror_name, target_data=target_data)
 
-    # Mirror target
-    get_symmetry = cmds.symmetricModelling(query=True, symmetry=True)
+def mirror_target_data(target_data, symmetry_map, dimensions, target=None, mirror_target_name=None):
+    """
+    Mirror the deltas of a target. Each delta is moved to the opposite point and its X is flipped, the base is
+    expected to be symmetric. The points without an opposite point are dropped, and when several points have the
+    same opposite point the first one is kept
 
-    target_index = get_target_index(blend_shape, target_mirror_name)
+    Args:
+        target_data (dict): blendshape target data dict from the get_target_data
+        symmetry_map (np.ndarray): opposite point of each point, -1 == no opposite point,
+                                   see get_target_symmetry_map
+        dimensions (tuple): point count along each dimension of the point grid, (vertex_count,) for meshes
+        target (str, optional): name of the target, renamed in the in-between names. Defaults to None.
+        mirror_target_name (str, optional): name of the mirrored target. Defaults to None.
 
-    cmds.blendShape(blend_shape, edit=True, symmetryAxis='x', symmetrySpace=1, flipTarget=[0, target_index])
+    Returns:
+        dict: mirrored target data, inputPointsTarget as (n, 4) arrays
+    """
+    mirror_data = {'envelope': target_data['envelope'], 'target_values': dict()}
+    for target_value, value_data in target_data['target_values'].items():
+        points_target = value_data['inputPointsTarget']
+        components_target = value_data['inputComponentsTarget']
+        mirror_value_data = dict()
+        if value_data.get('name') and target and mirror_target_name:
+            mirror_value_data['name'] = value_data['name'].replace(target, mirror_target_name)
+
+        if points_target is None or not len(points_target) or not components_target:
+            mirror_value_data.update({'inputPointsTarget': points_target, 'inputComponentsTarget': components_target})
+            mirror_data['target_values'][target_value] = mirror_value_data
+            continue
+
+        component_type, elements = get_component_elements(components_target)
+        mirror_indices = symmetry_map[np.ravel_multi_index(elements.T, dimensions)]
+        unmatched = mirror_indices < 0
+        if unmatched.any():
+            logging.warning(f'{target_value}: {int(np.count_nonzero(unmatched))} points have no opposite point, '
+                            f'their deltas are not mirrored')
+
+        # Sorted by opposite point, the repeated ones keep their first delta
+        order = np.flatnonzero(~unmatched)
+        order = order[np.argsort(mirror_indices[order], kind='stable')]
+        unique_positions = np.unique(mirror_indices[order], return_index=True)[1]
+        if len(unique_positions) != len(order):
+            logging.warning(f'{target_value}: {len(order) - len(unique_positions)} points share their opposite point '
+                            f'with another one, the symmetry map is not one-to-one')
+            order = order[unique_positions]
+
+        points = np.array(points_target, dtype=np.float64).reshape(len(points_target), -1)[order]
+        points[:, 0] *= -1
+        mirror_elements = np.stack(np.unravel_index(mirror_indices[order], dimensions), axis=1)
+
+        mirror_value_data['inputPointsTarget'] = points
+        mirror_value_data['inputComponentsTarget'] = format_component_elements(component_type, mirror_elements)
+        mirror_data['target_values'][target_value] = mirror_value_data
+
+    return mirror_data
+
+
+def mirror_target(blend_shape, target, descriptor=None, symmetry=None, modifier=None):
+    """
+    Mirror blendShape target. The deltas are moved to the opposite points with the symmetry map and their X is
+    flipped, without the blendShape symmetry or sculpt targets
+
+    Args:
+        blend_shape (str): name of the blendshape
+        target (str): name of the target
+        descriptor (BlendShapeDescriptor, optional): descriptor of the blendshape, None == build one.
+                                                     Defaults to None.
+        symmetry (tuple, optional): (symmetry map, dimensions) from get_target_symmetry_map, None == get it.
+                                    Defaults to None.
+        modifier (OpenMaya.MDGModifier, optional): modifier where the deltas are queued, None == set them in a new
+                                                   modifier. Defaults to None.
+
+    Returns:
+        str: name of the mirrored target
+    """
+    target_mirror_name = get_mirror_target_name(target)
+    descriptor = get_blend_shape_descriptor(blend_shape, descriptor)
+    symmetry_map, dimensions = symmetry if symmetry else get_target_symmetry_map(blend_shape)
+
+    target_data = mirror_target_data(get_target_data(blend_shape=blend_shape, target=target, descriptor=descriptor),
+                                     symmetry_map, dimensions, target=target, mirror_target_name=target_mirror_name)
+    set_target_data(blend_shape=blend_shape, target=target_mirror_name, target_data=target_data,
+                    descriptor=descriptor, modifier=modifier)
 
-    if get_symmetry:
-        cmds.symmetricModelling(symmetry=True)
-    else:
-        cmds.symmetricModelling(symmetry=False)
-
-    # If it is not a geometry
-    node_type = cmds.nodeType(cmds.listRelatives(get_blend_shape_node(blend_shape=blend_shape),
-                                                 shapes=True,
-                                                 noIntermediate=True)[0])
-
-    if 'mesh' not in node_type:
-        for target_value in get_target_values(blend_shape=blend_shape, target=target):
-            if target_value == 1:
-                target_rebuild = cmds.sculptTarget(blend_shape,
-                                                   edit=True,
-                                                   regenerate=True,
-                                                   target=get_target_index(blend_shape=blend_shape,
-                                                                           target=target))[0]
-                mirror_rebuild = cmds.sculptTarget(blend_shape,
-                                                   edit=True,
-                                                   regenerate=True,
-                                                   target=get_target_index(blend_shape=blend_shape,
-                                                                           target=target_mirror_name))[0]
-            else:
-                target_rebuild = cmds.sculptTarget(blend_shape,
-                                                   edit=True,
-                                                   regenerate=True,
-                                                   target=get_target_index(blend_shape=blend_shape,
-                                                                           target=target),
-                                                   inbetweenWeight=target_value)[0]
-                mirror_rebuild = cmds.sculptTarget(blend_shape,
-                                                   edit=True,
-                                                   regenerate=True,
-                                                   target=get_target_index(blend_shape=blend_shape,
-                                                                           target=target_mirror_name),
-                                                   inbetweenWeight=target_value)[0]
-
-            # If it is a curve
-            if 'nurbsCurve' in node_type:
-                component_type = 'cv'
-
-                target_cv_list = cmds.ls(f'{target_rebuild}.{component_type}[*]', flatten=True)
-
-                target_cv_indices = [int(cv.split('[')[1].split(']')[0]) for cv in target_cv_list]
-
-                source_cv_max = int(max(target_cv_indices))
-
-                for cv in target_cv_list:
-                    cv_position = cmds.xform(cv, query=True, objectSpace=True, translation=True)
-
-                    cv_index = int(cv.split('[')[1].split(']')[0])
-
-                    opposite_cv = list(range(0, source_cv_max + 1))[::-1][cv_index]
-
-                    cmds.xform(cv.replace(
-                            target_rebuild, mirror_rebuild).replace(f'.{component_type}[{cv_index}]',
-                                                                    f'.{component_type}[{opposite_cv}]'),
-                        objectSpace=True, translation=[cv_position[0] * -1, cv_position[1], cv_position[2]])
-
-            # If it is a nurbs
-            if 'nurbsSurface' in node_type:
-                component_type = 'cv'
-
-                target_cv_list = cmds.ls(f'{target_rebuild}.{component_type}[*]', flatten=True)
-                print(max(target_cv_list), target_cv_list)
-                param_x = nurbs_lib.get_param_along_x(nurbs=target_rebuild)
-
-                target_cv_u_indices = [int(cv.split('[')[1].split(']')[0]) for cv in target_cv_list]
-                target_cv_v_indices = [int(cv.split('[')[2].split(']')[0]) for cv in target_cv_list]
-
-                source_u_max = int(max(target_cv_u_indices))
-                source_v_max = int(max(target_cv_v_indices))
-
-                for cv in target_cv_list:
-                    cv_position = cmds.xform(cv, query=True, objectSpace=True, translation=True)
-
-                    u_index = int(cv.split('[')[1].split(']')[0])
-                    v_index = int(cv.split('[')[2].split(']')[0])
-                    
-                    opposite_u = list(range(0, source_u_max + 1))[::-1][u_index]
-                    opposite_v = list(range(0, source_v_max + 1))[::-1][v_index]
-
-                    if param_x == 'U':
-                        cmds.xform(
-                            cv.replace(
-                                target_rebuild, mirror_rebuild).replace('.{}[{}][{}]'.format(component_type,
-                                                                                             u_index, v_index),
-                                                                        '.{}[{}][{}]'.format(component_type,
-                                                                                             opposite_u, v_index)),
-                            objectSpace=True, translation=[cv_position[0] * -1, cv_position[1], cv_position[2]])
-                    else:
-                        cmds.xform(
-                            cv.replace(
-                                target_rebuild, mirror_rebuild).replace('.{}[{}][{}]'.format(component_type,
-                                                                                             u_index, v_index),
-                                                                        '.{}[{}][{}]'.format(component_type,
-                                                                                             u_index, opposite_v)),
-                            objectSpace=True, translation=[cv_position[0] * -1, cv_position[1], cv_position[2]])
-
-            # If it is a lattice
-            if 'lattice' in node_type:
-                component_type = 'pt'
-
-                target_pt_list = cmds.ls(f'{target_rebuild}.{component_type}[*]', flatten=True)
-
-                target_pt_x_indices = [int(pt.split('[')[1].split(']')[0]) for pt in target_pt_list]
-
-                source_x_max = int(max(target_pt_x_indices))
-
-                for cv in target_pt_list:
-                    cv_position = cmds.xform(cv, query=True, objectSpace=True, translation=True)
-
-                    x_index = int(cv.split('['.format(component_type))[1].split(']')[0])
-                    y_index = int(cv.split('['.format(component_type))[2].split(']')[0])
-                    z_index = int(cv.split('['.format(component_type))[3].split(']')[0])
-
-                    opposite_x = list(range(0, source_x_max + 1))[::-1][x_index]
-                    cmds.xform(cv.replace(
-                            target_rebuild, mirror_rebuild).replace('.{}[{}][{}][{}]'.format(component_type,
-                                                                                             x_index, 
-                                                                                             y_index, 
-                                                                                             z_index),
-                                                                    '.{}[{}][{}][{}]'.format(component_type,
-                                                                                             opposite_x, 
-                                                                                             y_index, 
-                                                                                             z_index)),
-                        objectSpace=True, translation=[cv_position[0] * -1, cv_position[1], cv_position[2]])
-
-            cmds.delete(target_rebuild)
-            cmds.delete(mirror_rebuild)
-    
     logging.info(f'{target} has been transfered and flipped to --> {target_mirror_name}')
 
+    return target_mirror_name
+
+
+def mirror_targets(blend_shape, target_list=None, method=symmetry_lib.positional, seed_edge=None, cache_path=None):
+    """
+    Mirror several targets of a blendShape. The symmetry map is read once and the deltas of every mirrored target
+    are set in one modifier
+
+    Args:
+        blend_shape (str): name of the blendshape
+        target_list (list, optional): targets to mirror, None == all the left targets. Defaults to None.
+        method (str, optional): mesh only, 'positional' or 'topological'. Defaults to 'positional'.
+        seed_edge (int, optional): mesh only, edge on the symmetry plane of the topological method.
+                                   Defaults to None.
+        cache_path (str, optional): mesh only, symmetry map cache folder. Defaults to None.
+
+    Returns:
+        list: names of the mirrored targets
+    """
+    descriptor = BlendShapeDescriptor(blend_shape)
+    if target_list is None:
+        target_list = [x for x in descriptor.get_target_list()
+                       if len(x.split('_')) == 3 and x.split('_')[1] == side_lib.left]
+
+    symmetry = get_target_symmetry_map(blend_shape, method=method, seed_edge=seed_edge, cache_path=cache_path)
+
+    mirror_list = list()
+    modifier = OpenMaya.MDGModifier()
+    with modifier_lib.undo_chunk('mirrorTargets'):
+        for target in target_list:
+            mirror_list.append(mirror_target(blend_shape=blend_shape, target=target, descriptor=descriptor,
+                                             symmetry=symmetry, modifier=modifier))
+        modifier_lib.apply_modifier(modifier)
+
+    return mirror_list
+
 
 def copy_target_connection(source=None, destination_list=None, *args):
     """
@@ -869,21 +1406,93 @@ def copy_blendshape_connections(source=None, destination_list=None, *args):
 
     # Check if the destination have the same target and connect it
     for destination in destination_list:
+        destination_descriptor = BlendShapeDescriptor(destination)
         for target in source_target_list:
-            if check_target(blend_shape=destination, target=target):
+            if check_target(blend_shape=destination, target=target, descriptor=destination_descriptor):
                 copy_target_connection(source=f'{source}.{target}',
                                        destination_list=[f'{destination}.{target}'])
             else:
                 logging.info(f'{destination}.{target} does not exists.')
 
 
-def transfer_blend_shape(source=None, destination=None, *args):
+def get_transfer_correspondence(source_points, source_triangles, destination_points, method='barycentric',
+                                rbf_count=8):
+    """
+    Get the correspondence of the destination points on the source mesh, computed once and used by every target
+
+    Args:
+        source_points (np.ndarray): (n, 3) source base positions
+        source_triangles (np.ndarray): (triangle_count, 3) source triangles
+        destination_points (np.ndarray): (m, 3) destination base positions
+        method (str, optional): 'barycentric' (closest point on the source triangles) or 'rbf' (local radial basis
+                                function on the closest source points, for destinations off the source surface).
+                                Defaults to 'barycentric'.
+        rbf_count (int, optional): rbf only, closest source points per destination point. Defaults to 8.
+
+    Returns:
+        tuple: (source point indices (m, k), coefficients (m, k))
+    """
+    if method not in transfer_methods:
+        cmds.error(f'{method} is not a valid transfer method, {transfer_methods}')
+
+    if method == 'barycentric':
+        return spatial_lib.SpatialIndex(source_points, triangles=source_triangles).get_barycentric_weights(
+            destination_points)
+
+    return spatial_lib.SpatialIndex(source_points).get_rbf_weights(destination_points, k=rbf_count)
+
+
+def transfer_target_data(target_data, correspondence, source_point_count, tolerance=1e-6):
+    """
+    Map the deltas of a source target to the destination points through the correspondence, the deltas lower than
+    the tolerance are dropped
+
+    Args:
+        target_data (dict): blendshape target data dict from the get_target_data of a mesh
+        correspondence (tuple): (source point indices (m, k), coefficients (m, k)), see get_transfer_correspondence
+        source_point_count (int): number of source points
+        tolerance (float, optional): deltas with all the coordinates lower than this are dropped. Defaults to 1e-6.
+
+    Returns:
+        dict: destination target data, inputPointsTarget as (n, 4) arrays
+    """
+    indices, coefficients = correspondence
+
+    destination_data = {'envelope': target_data['envelope'], 'target_values': dict()}
+    for target_value, value_data in target_data['target_values'].items():
+        points_target = value_data['inputPointsTarget']
+        components_target = value_data['inputComponentsTarget']
+        destination_value_data = {'name': value_data['name']} if value_data.get('name') else dict()
+
+        source_deltas = np.zeros((source_point_count, 3), dtype=np.float64)
+        if points_target is not None and len(points_target) and components_target:
+            component_type, elements = get_component_elements(components_target)
+            source_deltas[elements[:, 0]] = np.asarray(points_target, dtype=np.float64).reshape(
+                len(points_target), -1)[:, :3]
+
+        deltas = np.einsum('mk,mkj->mj', coefficients, source_deltas[indices])
+        keep = np.flatnonzero(np.abs(deltas).max(axis=1, initial=0.0) > tolerance)
+
+        points = np.ones((len(keep), 4), dtype=np.float64)
+        points[:, :3] = deltas[keep]
+        destination_value_data['inputPointsTarget'] = points
+        destination_value_data['inputComponentsTarget'] = format_component_elements('vtx', keep[:, None])
+        destination_data['target_values'][target_value] = destination_value_data
+
+    return destination_data
+
+
+def transfer_blend_shape(source=None, destination=None, *args, method='barycentric', rbf_count=8):
     """
-    Transfer blendshape from source to destination
+    Transfer blendshape from source to destination. The correspondence of the destination base mesh on the source
+    base mesh is computed once, every target and in-between delta is mapped through it with numpy and the
+    destination targets are set in one pass
 
     Args:
         source (str, optional): name of the source blendshape. None == selection 0. Defaults to None.
         destination (str, optional): name of the destination blendshape. None == selection 1. Defaults to None.
+        method (str, optional): 'barycentric' or 'rbf', see get_transfer_correspondence. Defaults to 'barycentric'.
+        rbf_count (int, optional): rbf only, closest source points per destination point. Defaults to 8.
     """
     if not source and not destination: # If the inputs are None
         blendshape_list = get_blend_shapes_from_shape_editor()
@@ -909,70 +1518,45 @@ def transfer_blend_shape(source=None, destination=None, *args):
                               'or select blendShapes in the shapeEditor')
                 return
 
-    # Create the source base geometry
-    source_base = cmds.rename(cmds.listRelatives(cmds.createNode('mesh'), parent=True)[0], 
-                              f'{source}Base')
-    source_base_shape = cmds.listRelatives(source_base, shapes=True, noIntermediate=True)[0]
+    # Base meshes and correspondence
+    source_base = get_blend_shape_base(source)
+    destination_base = get_blend_shape_base(destination)
+    for blend_shape, base in [(source, source_base), (destination, destination_base)]:
+        if not base.hasFn(OpenMaya.MFn.kMeshData):
+            cmds.error(f'{blend_shape} does not deform a mesh, only meshes can be transferred')
 
-    cmds.connectAttr(f'{source}.originalGeometry[0]', f'{source_base_shape}.inMesh')
+    source_points = mesh_lib.get_mesh_points(source_base)
+    correspondence = get_transfer_correspondence(source_points=source_points,
+                                                 source_triangles=mesh_lib.get_mesh_triangles(source_base),
+                                                 destination_points=mesh_lib.get_mesh_points(destination_base),
+                                                 method=method,
+                                                 rbf_count=rbf_count)
 
-    # Create the destination base geometry
-    destination_base = cmds.rename(cmds.listRelatives(cmds.createNode('mesh'), parent=True)[0], 
-                                   f'{destination}Base')
-    destination_base_shape = cmds.listRelatives(destination_base, shapes=True, noIntermediate=True)[0]
+    # Map the deltas
+    source_descriptor = BlendShapeDescriptor(source)
+    destination_descriptor = BlendShapeDescriptor(destination)
+    source_data = get_blend_shape_data(blend_shape=source, descriptor=source_descriptor)
 
-    cmds.connectAttr(f'{destination}.originalGeometry[0]', f'{destination_base_shape}.inMesh')
+    destination_data = OrderedDict()
+    destination_data['node'] = get_blend_shape_node(destination)
+    destination_data['blendShape'] = destination
+    destination_data['targets'] = OrderedDict()
+    for target, target_data in source_data['targets'].items():
+        destination_data['targets'][target] = transfer_target_data(target_data, correspondence, len(source_points))
 
-    # Wrap
-    cmds.select(destination_base)
-    proximity_wrap = cmds.deformer(type='proximityWrap')[0]
-    cmds.setAttr(f'{proximity_wrap}.wrapMode', 0)
-
-    # Get source target list
-    source_target_list = get_blendshape_target_list(blend_shape=source)
+    with modifier_lib.undo_chunk('transferBlendShape'):
+        # Delete old targets
+        for target in destination_data['targets']:
+            if check_target(blend_shape=destination, target=target, descriptor=destination_descriptor):
+                remove_target(blend_shape=destination, target=target, descriptor=destination_descriptor)
 
-    # Delete old targets
-    for target in source_target_list:
-        if check_target(blend_shape=destination, target=target):
-            remove_target(blend_shape=destination, target=target)
-
-    # Transfer each target
-    for target in source_target_list:
-        target_values = get_target_values(blend_shape=source, target=target)
-        for value in target_values[::-1]:
-            if value == 1.0:
-                source_rebuild = cmds.sculptTarget(source, edit=True, regenerate=True,
-                                                   target=get_target_index(blend_shape=source, target=target))[0]
-            else:
-                source_rebuild = cmds.sculptTarget(source, edit=True, regenerate=True,
-                                                   target=get_target_index(blend_shape=source, target=target),
-                                                   inbetweenWeight=value)[0]
-
-            temporal_blend_shape = create_blend_shape(node=source_base, target_list=[source_rebuild])
-            cmds.setAttr('{}.{}'.format(temporal_blend_shape, get_target_name(blend_shape=temporal_blend_shape,
-                                                                              target_index=0)), 1)
-
-            # Wrap driver connections (now that we have the shapeOrig)
-            if not cmds.isConnected(f'{source_base_shape}Orig.outMesh',
-                                    f'{proximity_wrap}.drivers[0].driverBindGeometry'):
-                cmds.connectAttr(f'{source_base_shape}Orig.outMesh',
-                                 f'{proximity_wrap}.drivers[0].driverBindGeometry')
-                cmds.connectAttr(f'{source_base_shape}.outMesh',
-                                 f'{proximity_wrap}.drivers[0].driverGeometry')
-
-            delta = cmds.duplicate(destination_base)[0]
-
-            if value == 1.0:
-                new_target = add_target(blend_shape=destination, target=delta)
-                rename_target(blend_shape=destination, target=new_target, new_name=target)
-                copy_target_connection(source=f'{source}.{target}',
-                                       destination_list=[f'{destination}.{target}'])
-            else:
-                add_in_between(blend_shape=destination, existing_target=target, in_between_target=delta, value=value)
+        set_blendshape_data(blend_shape=destination, blend_shape_data=destination_data,
+                            descriptor=destination_descriptor)
 
-            cmds.delete(source_rebuild, temporal_blend_shape, delta)
+        for target in destination_data['targets']:
+            copy_target_connection(source=f'{source}.{target}', destination_list=[f'{destination}.{target}'])
 
-    cmds.delete(source_base, destination_base)
+    logging.info(f'{len(destination_data["targets"])} targets transferred from {source} to {destination}')
 
 
 def order_shape_editor_blend_shapes(blend_shape_list):
@@ -1054,6 +1638,7 @@ def automatic_corrective(geometry_name='test_c_geo',
     # Create delta Mush
     cmds.refresh()
     delta_mush_name = cmds.deltaMush(geometry_name, smoothingIterations=10, smoothingStep=0.5, envelope=1)[0]
+    deformer_lib.invalidate_deformer_history()
     cmds.setAttr(f'{delta_mush_name}.distanceWeight', 1)
     cmds.setAttr(f'{delta_mush_name}.inwardConstraint', 1)
 
@@ -1074,6 +1659,7 @@ def automatic_corrective(geometry_name='test_c_geo',
 
     # Delete deltaMush
     cmds.delete(delta_mush_name)
+    deformer_lib.invalidate_deformer_history()
 
     # Add target
     cmds.refresh()
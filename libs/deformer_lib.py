@@ -0,0 +1,146 @@
+# Imports
+import logging
+
+# Maya imports
+from maya import cmds
+
+logging = logging.getLogger(__name__)
+
+
+class DeformerHistoryCache(object):
+    """
+    Scoped cache of the deformer history of the nodes, keyed by node UUID.
+
+    Outside of a scope every query goes to Maya. Inside a scope the history and the node types of each node are
+    queried once, until a lib function that adds, removes or renames deformers invalidates the cache.
+
+    Example:
+        with deformer_lib.deformer_history_cache:
+            skin_cluster = skin_lib.get_skin_cluster_index(node, 1)
+    """
+    def __init__(self):
+        """
+        Initializes an instance of DeformerHistoryCache
+        """
+        self.history_dict = dict()
+        self.depth = 0
+        self.hits = 0
+        self.misses = 0
+
+
+    def __enter__(self):
+        """
+        Open a cache scope, scopes can be nested
+
+        Returns:
+            DeformerHistoryCache: cache
+        """
+        if not self.depth:
+            self.history_dict.clear()
+            self.hits = 0
+            self.misses = 0
+        self.depth += 1
+
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Close a cache scope, the cache is cleared when the outer scope is closed
+        """
+        self.depth -= 1
+        if not self.depth:
+            logging.debug('Deformer history cache: {hits} hits, {misses} misses, {nodes} nodes.'.format(
+                **self.get_stats()))
+            self.history_dict.clear()
+
+
+    def is_enabled(self):
+        """
+        Check if the cache is in a scope
+
+        Returns:
+            bool: True == the queries are cached
+        """
+        return self.depth > 0
+
+
+    def get_stats(self):
+        """
+        Get the cache counters of the current or last scope
+
+        Returns:
+            dict: {'hits': int, 'misses': int, 'nodes': int}
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'nodes': len(self.history_dict)}
+
+
+    def get_history(self, node):
+        """
+        Get the deformer history of the node with the type of each node
+
+        Args:
+            node (str): node's name
+
+        Returns:
+            list: [(history node, node type), ...] in cmds.listHistory order
+        """
+        if not self.is_enabled():
+            return query_history(node)
+
+        uuid = cmds.ls(node, uuid=True)[0]
+        if uuid in self.history_dict:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.history_dict[uuid] = query_history(node)
+
+        return list(self.history_dict[uuid])
+
+
+    def invalidate(self):
+        """
+        Remove all the cached histories, the counters are kept
+        """
+        self.history_dict.clear()
+
+
+deformer_history_cache = DeformerHistoryCache()
+
+
+def query_history(node):
+    """
+    Query the deformer history of the node with the type of each node, not cached
+
+    Args:
+        node (str): node's name
+
+    Returns:
+        list: [(history node, node type), ...] in cmds.listHistory order
+    """
+    inputs_list = cmds.listHistory(node, interestLevel=1, pruneDagObjects=True)
+    if not inputs_list:
+        return list()
+
+    return [(item, cmds.objectType(item)) for item in inputs_list]
+
+
+def get_deformer_list(node, deformer_type):
+    """
+    Get the deformers of a type in the node history, cached inside a deformer_history_cache scope
+
+    Args:
+        node (str): node's name
+        deformer_type (str): node type, skinCluster, blendShape...
+
+    Returns:
+        list: deformers in cmds.listHistory order
+    """
+    return [item for item, item_type in deformer_history_cache.get_history(node) if item_type == deformer_type]
+
+
+def invalidate_deformer_history():
+    """
+    Invalidate the cached deformer histories, the lib functions that add, remove or rename deformers call it
+    """
+    deformer_history_cache.invalidate()
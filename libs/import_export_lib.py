@@ -1,24 +1,43 @@
 # Imports
+import re
 import json
 import os
+import time
+import shutil
 import logging
+import tempfile
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 
 # Maya imports
 from maya import cmds
 
 # Project imports
-from hiddenStrings.libs import skin_lib, blend_shape_lib
+from hiddenStrings.libs import (deformer_lib, skin_lib, skin_weights_lib, spatial_lib, storage_lib, blend_shape_lib,
+                                blend_shape_archive_lib)
 
 logging = logging.getLogger(__name__)
 
+skin_file_formats = ['json', skin_weights_lib.npz_extension, storage_lib.chunk_extension]
+# Generic data formats, chunk files are compressed and can be read one chunk at a time
+data_file_formats = ['json', storage_lib.chunk_extension]
+data_chunk = 'data'
+# BlendShape formats, deltas archives are read over chunk files and chunk files over json files
+blend_shape_file_formats = data_file_formats + [blend_shape_archive_lib.archive_extension]
+# Import methods matched with spatial_lib against the points stored in the file
+spatial_import_methods = ['nearest', 'inverse_distance', 'barycentric']
+
 
-def export_selection(file_name, path):
+def export_selection(file_name, path, file_format='json'):
     """
     Expport selection to json
 
     Args:
         file_name (str): name of the file
         path (str): export file folder
+        file_format (str): 'json' or 'chunk' (compressed). Defaults to 'json'.
 
     Returns:
         list: selection list exported to the file
@@ -28,10 +47,11 @@ def export_selection(file_name, path):
 
     selection_data = cmds.ls(selection=True)
 
-    export_data_to_json(data=selection_data,
-                        file_name=file_name,
-                        file_path=path,
-                        relative_path=False)
+    export_data(data=selection_data,
+                file_name=file_name,
+                file_path=path,
+                relative_path=False,
+                file_format=file_format)
 
     logging.info(selection_data)
     return selection_data
@@ -39,7 +59,7 @@ def export_selection(file_name, path):
 
 def import_selection(path):
     """
-    Import selection from json
+    Import selection from json or chunk file
 
     Args:
         path (str): full path of the file to import
@@ -47,25 +67,21 @@ def import_selection(path):
     Returns:
         list: selection list imported from the file
     """
-    file_name = os.path.basename(path).split('.json')[0]
-    path = os.path.dirname(path)
-
-    selection_data = import_data_from_json(file_name=file_name,
-                                           file_path=path,
-                                           relative_path=False)
+    selection_data = import_data_from_path(path)
     cmds.select(selection_data)
     logging.info(selection_data)
 
     return selection_data
 
 
-def export_matrix(file_name, path):
+def export_matrix(file_name, path, file_format='json'):
     """
     Expport matrix to json
 
     Args:
         file_name (str): name of the file
         path (str): export file folder
+        file_format (str): 'json' or 'chunk' (compressed). Defaults to 'json'.
 
     Returns:
         matrix: matrix exported to the file
@@ -75,10 +91,11 @@ def export_matrix(file_name, path):
 
     matrix_data = cmds.xform(cmds.ls(selection=True)[0], query=True, worldSpace=True, matrix=True)
 
-    export_data_to_json(data=matrix_data,
-                        file_name=file_name,
-                        file_path=path,
-                        relative_path=False)
+    export_data(data=matrix_data,
+                file_name=file_name,
+                file_path=path,
+                relative_path=False,
+                file_format=file_format)
 
     logging.info(matrix_data)
     return matrix_data
@@ -86,7 +103,7 @@ def export_matrix(file_name, path):
 
 def import_matrix(path):
     """
-    Import matrix from json
+    Import matrix from json or chunk file
 
     Args:
         path (str): full path of the file to import
@@ -94,12 +111,7 @@ def import_matrix(path):
     Returns:
         matrix: matrix imported from the file
     """
-    file_name = os.path.basename(path).split('.json')[0]
-    path = os.path.dirname(path)
-
-    matrix_data = import_data_from_json(file_name=file_name,
-                                        file_path=path,
-                                        relative_path=False)
+    matrix_data = import_data_from_path(path)
     cmds.xform(cmds.ls(selection=True)[0], worldSpace=True, matrix=matrix_data)
     logging.info(matrix_data)
 
@@ -193,11 +205,13 @@ def import_nodes_and_connections(path, import_nodes=True, import_connections=Tru
         search_for (_type_, optional): search string. Use "," for more than once. Defaults to None.
         replace_with (_type_, optional): replace string. Use "," for more than once. Defaults to None.
     """
-    if search_for:
-        search_and_replace_in_file(path, search_for=search_for, replace_with=replace_with)
-
     with open(path, 'r') as connections_file:
-        lines = connections_file.readlines()
+        if search_for:
+            # The names are replaced in memory, the file is never rewritten
+            name_remapper = NameRemapper(search_for=search_for, replace_with=replace_with)
+            lines = name_remapper.remap(connections_file.read()).splitlines(keepends=True)
+        else:
+            lines = connections_file.readlines()
 
         if import_nodes:
             main_line_list = [index for index, value in enumerate(lines) if
@@ -227,9 +241,6 @@ def import_nodes_and_connections(path, import_nodes=True, import_connections=Tru
                     if not cmds.isConnected(input_value, output_value):
                         cmds.connectAttr(input_value, output_value, force=True)
 
-    if search_for:
-        search_and_replace_in_file(path, search_for=replace_with, replace_with=search_for)
-
     logging.info(r'{} has been imported.'.format(path))
 
 
@@ -246,14 +257,20 @@ def import_obj(path):
     return cmds.file(path, type='OBJ', i=True, force=True, returnNewNodes=True)  # i = import
 
 
-def export_blend_shape(node, path):
+def export_blend_shape(node, path, file_format='json', compression='zlib'):
     """
     Export blendShape of the node given
 
     Args:
         node (str): node of the node deformed by the blendshape we want to export
         path (str): export file folder
+        file_format (str): 'json', 'chunk' (one chunk per target, the deltas as float32 arrays) or 'deltas'
+                           (sparse archive with a json sidecar, the targets can be read one at a time).
+                           Defaults to 'json'.
+        compression (str): chunk and deltas only, 'zlib', 'lzma' or 'none' (mappable). Defaults to 'zlib'.
     """
+    if file_format not in blend_shape_file_formats:
+        cmds.error(f'{file_format} is not a valid blendShape file format, {blend_shape_file_formats}')
     if not cmds.objExists(node):
         cmds.error(f'{node} does not exists in the scene')
     blend_shape_name = blend_shape_lib.get_blend_shape(node)
@@ -264,67 +281,98 @@ def export_blend_shape(node, path):
     if not os.path.exists(path):
         os.makedirs(path)
 
-    export_data_to_json(data=blend_shape_data, file_name=blend_shape_name, file_path=path, relative_path=False,
-                        compact=True)
+    if file_format == blend_shape_archive_lib.archive_extension:
+        file_path = blend_shape_archive_lib.write_archive(f'{path}/{blend_shape_name}.{file_format}',
+                                                          blend_shape_data, compression=compression)[0]
+        logging.info(r'{} has been exported.'.format(file_path))
+        return
+
+    if file_format == storage_lib.chunk_extension:
+        # Deltas as arrays, stored in their own chunks
+        for target_data in blend_shape_data['targets'].values():
+            for value_data in target_data['target_values'].values():
+                if value_data['inputPointsTarget']:
+                    value_data['inputPointsTarget'] = np.array(value_data['inputPointsTarget'],
+                                                               dtype=np.float32).reshape(-1, 4)
 
-    logging.info(r'{}/{}.json has been exported.'.format(path, blend_shape_name))
+    file_path = export_data(data=blend_shape_data, file_name=blend_shape_name, file_path=path, relative_path=False,
+                            file_format=file_format, compact=True, chunk_key='targets', compression=compression)
 
+    logging.info(r'{} has been exported.'.format(file_path))
 
-def export_blend_shapes(node_list, path):
+
+def export_blend_shapes(node_list, path, file_format='json', compression='zlib'):
     """
     Export blendShapes of the nodes given
 
     Args:
         node_list (list): list of nodes deformed by the blendshapes we want to export
         path (str): export file folder
+        file_format (str): 'json', 'chunk' (one chunk per target, the deltas as float32 arrays) or 'deltas'
+                           (sparse archive with a json sidecar). Defaults to 'json'.
+        compression (str): chunk and deltas only, 'zlib', 'lzma' or 'none' (mappable). Defaults to 'zlib'.
     """
     for node in node_list:
-        export_blend_shape(node=node, path=path)
+        export_blend_shape(node=node, path=path, file_format=file_format, compression=compression)
 
 
-def import_blend_shape(node, path):
+def import_blend_shape(node, path, target_list=None):
     """
     Import blendShape from path
 
     Args:
         node (str): node that receives the blendshape
-        path (str): full file path to import
+        path (str): full file path to import, json, chunk or deltas
+        target_list (list, optional): targets to import, None == all of them. Chunk and deltas files only read the
+                                      chunks of these targets, and uncompressed files are mapped and read one
+                                      target at a time. Defaults to None.
     """
-    file_name = os.path.basename(path).split('.json')[0]
-    path = os.path.dirname(path)
-
     blend_shape = blend_shape_lib.get_blend_shape(node=node)
     if blend_shape:
         blend_shape = blend_shape_lib.rename_blend_shape(blend_shape=blend_shape)
     else:
         blend_shape = blend_shape_lib.create_blend_shape(node=node)
 
-    blend_shape_data = import_data_from_json(file_name=file_name, file_path=path, relative_path=False)
-
-    blend_shape_lib.set_blendshape_data(blend_shape=blend_shape, blend_shape_data=blend_shape_data)
+    if path.endswith(f'.{blend_shape_archive_lib.archive_extension}'):
+        blend_shape_data = blend_shape_archive_lib.read_archive(path, target_list=target_list, mmap_mode='r')
+    else:
+        blend_shape_data = import_data_from_path(path, chunk_list=target_list, mmap_mode='r')
+    # The deltas arrays are set as they are, every target in one modifier
+    blend_shape_lib.set_blendshape_data(blend_shape=blend_shape, blend_shape_data=blend_shape_data,
+                                        target_list=target_list)
 
-    logging.info(r'{}/{}.json has been imported.'.format(path, file_name))
+    logging.info(r'{} has been imported.'.format(path))
 
 
 def import_blend_shapes(path):
     """
-    Import all json blendShapes from folder
+    Import all json, chunk and deltas blendShapes from folder, deltas files are used over chunk files and chunk
+    files over json files with the same name
 
     Args:
         path (str): folder path to import
     """
-    file_list = [x for x in os.listdir(path) if x.endswith('.json')]
-    for blend_shape_file in file_list:
-        # Get json file node
-        blend_shape_data = import_data_from_json(file_name=blend_shape_file.split('.')[0],
-                                                 file_path=path,
-                                                 relative_path=False)
+    sidecar_suffix = f'.{blend_shape_archive_lib.archive_extension}.{blend_shape_archive_lib.sidecar_extension}'
+    file_dict = dict()
+    for blend_shape_file in sorted(os.listdir(path),
+                                   key=lambda x: blend_shape_file_formats.index(os.path.splitext(x)[1][1:])
+                                   if os.path.splitext(x)[1][1:] in blend_shape_file_formats else -1):
+        file_name, file_format = os.path.splitext(blend_shape_file)
+        if file_format[1:] in blend_shape_file_formats and not blend_shape_file.endswith(sidecar_suffix):
+            file_dict[file_name] = blend_shape_file
+
+    for blend_shape_file in file_dict.values():
+        # Get file node, chunk files only read the base chunk and deltas files the sidecar
+        file_path = r'{}/{}'.format(path, blend_shape_file)
+        if blend_shape_file.endswith(f'.{blend_shape_archive_lib.archive_extension}'):
+            blend_shape_data = blend_shape_archive_lib.read_sidecar(file_path)
+        else:
+            blend_shape_data = import_data_from_path(file_path, chunk_list=list())
 
-        import_blend_shape(node=blend_shape_data['node'], path=r'{}/{}'.format(path, blend_shape_file))
-    pass
+        import_blend_shape(node=blend_shape_data['node'], path=file_path)
 
 
-def export_skin_cluster(node, path, skin_index=1):
+def export_skin_cluster(node, path, skin_index=1, file_format='json', delta=False, compression='zlib'):
     """
     Export node skinCluster/s
     
@@ -332,36 +380,51 @@ def export_skin_cluster(node, path, skin_index=1):
         node (str): node with a skinCluster
         path (str): export file folder
         skin_index (int): index of the skin, if None all the skinClusters will be exported. Defaults to 1.
+        file_format (str): 'json' (deformerWeights), 'npz' (sparse binary) or 'chunk' (compressed, one chunk per
+                           influence). Defaults to 'json'.
+        delta (bool): npz only, write only the points changed since the previous export as a patch file.
+                      Defaults to False.
+        compression (str): chunk only, 'zlib', 'lzma' or 'none' (mappable on import). Defaults to 'zlib'.
     """
+    if file_format not in skin_file_formats:
+        cmds.error(f'{file_format} is not a valid skin file format, {skin_file_formats}')
+    if delta and file_format != skin_weights_lib.npz_extension:
+        cmds.error(f'delta exports need the {skin_weights_lib.npz_extension} file format')
+
     if skin_index:
-        skin_cluster = skin_lib.rename_skin_cluster(skin_lib.get_skin_cluster_index(node, skin_index))
-        skin_path = r'{}/{}.json'.format(path, skin_cluster)
+        skin_cluster_list = [skin_lib.get_skin_cluster_index(node, skin_index)]
+    else:
+        skin_cluster_list = skin_lib.get_skin_cluster_list(node)
+
+    for skin_cluster in skin_cluster_list:
+        skin_cluster = skin_lib.rename_skin_cluster(skin_cluster)
+        skin_path = r'{}/{}.{}'.format(path, skin_cluster, file_format)
         # Check if the file exists and is writable
         if os.path.exists(skin_path) and not os.access(skin_path, os.W_OK):
             logging.info(f'{skin_path} is not writeable. Check Permissions.')
         else:
             if not os.path.exists(path):
                 os.makedirs(path)
-            # Export JSON
-            cmds.deformerWeights(f'{skin_cluster}.json', deformer=skin_cluster, method='index',
-                                 export=True, format='JSON', path=path)
-    else:
-        skin_cluster_list = skin_lib.get_skin_cluster_list(node)
-        for skin_cluster in skin_cluster_list:
-            skin_cluster = skin_lib.rename_skin_cluster(skin_cluster)
-            skin_path = r'{}/{}.json'.format(path, skin_cluster)
-            # Check if the file exists and is writable
-            if os.path.exists(skin_path) and not os.access(skin_path, os.W_OK):
-                logging.info(f'{skin_path} is not writeable. Check Permissions.')
+            if delta:
+                # Export skinCluster NPZ patch
+                skin_data = skin_weights_lib.write_skin_weights_delta(skin_lib.get_skin_weights(skin_cluster),
+                                                                      skin_path)
+                logging.info('{}: {}/{} blocks changed.'.format(skin_cluster, skin_data['changed_blocks'],
+                                                                skin_data['block_count']))
+            elif file_format == skin_weights_lib.npz_extension:
+                # Export skinCluster NPZ
+                skin_lib.get_skin_weights(skin_cluster).save(skin_path)
+            elif file_format == storage_lib.chunk_extension:
+                # Export skinCluster chunks
+                skin_lib.get_skin_weights(skin_cluster).save_chunks(skin_path, compression=compression)
             else:
-                if not os.path.exists(path):
-                    os.makedirs(path)
                 # Export skinCluster JSON
                 cmds.deformerWeights(f'{skin_cluster}.json', deformer=skin_cluster, method='index',
                                      export=True, format='JSON', path=path)
 
 
-def export_skin_clusters(node_list, path, skin_index=1):
+def export_skin_clusters(node_list, path, skin_index=1, file_format='json', batch=False, max_workers=None,
+                         delta=False, compression='zlib'):
     """
     Export all skinClusters
 
@@ -369,38 +432,159 @@ def export_skin_clusters(node_list, path, skin_index=1):
         node_list (list): list of nodes with the skinClusters we want to export
         path (str): export folder path
         skin_index (int): index of the skin, if None all the skinClusters will be exported. Defaults to 1.
+        file_format (str): 'json' (deformerWeights), 'npz' (sparse binary) or 'chunk' (compressed, one chunk per
+                           influence). Defaults to 'json'.
+        batch (bool): read all the weights first and write the files in a background pool. Defaults to False.
+        max_workers (int): number of writing threads in batch mode, None == default pool size. Defaults to None.
+        delta (bool): npz only, write only the points changed since the previous export. Defaults to False.
+        compression (str): chunk only, 'zlib', 'lzma' or 'none' (mappable on import). Defaults to 'zlib'.
+
+    Returns:
+        dict: batch mode manifest, see export_skin_clusters_batch
     """
-    for node in node_list:
-        export_skin_cluster(node=node, path=path, skin_index=skin_index)
+    if batch:
+        return export_skin_clusters_batch(node_list=node_list, path=path, skin_index=skin_index,
+                                          file_format=file_format, max_workers=max_workers, delta=delta,
+                                          compression=compression)
+
+    with deformer_lib.deformer_history_cache:
+        for node in node_list:
+            export_skin_cluster(node=node, path=path, skin_index=skin_index, file_format=file_format, delta=delta,
+                                compression=compression)
 
 
-def import_skin_cluster(node, path, skin_index=1, import_method='index', search_for=None, replace_with=None):
+def export_skin_clusters_batch(node_list, path, skin_index=1, file_format='npz', max_workers=None, delta=False,
+                               compression='zlib'):
+    """
+    Export all skinClusters reading the weights with the API in the main thread and handing the serialization,
+    compression and writing to a thread pool, so the export is limited by the Maya reads.
+    The json files have the deformerWeights layout and are written without deformerWeights
+
+    Args:
+        node_list (list): list of nodes with the skinClusters we want to export
+        path (str): export folder path
+        skin_index (int): index of the skin, if None all the skinClusters will be exported. Defaults to 1.
+        file_format (str): 'json' (deformerWeights layout), 'npz' (sparse binary) or 'chunk'. Defaults to 'npz'.
+        max_workers (int): number of writing threads, None == default pool size. Defaults to None.
+        delta (bool): npz only, write only the points changed since the previous export as patch files, the
+                      file data gets the 'patch', 'changed_blocks' and 'block_count' keys. Defaults to False.
+        compression (str): chunk only, 'zlib', 'lzma' or 'none' (mappable on import). Defaults to 'zlib'.
+
+    Returns:
+        dict: manifest {'files': [{'node', 'skin_cluster', 'file', 'read_time', 'write_time', 'size'}, ...],
+                        'read_time': seconds, 'total_time': seconds}
+    """
+    if file_format not in skin_file_formats:
+        cmds.error(f'{file_format} is not a valid skin file format, {skin_file_formats}')
+    if delta and file_format != skin_weights_lib.npz_extension:
+        cmds.error(f'delta exports need the {skin_weights_lib.npz_extension} file format')
+
+    if delta:
+        write_function = skin_weights_lib.write_skin_weights_delta
+    else:
+        write_function = partial(skin_weights_lib.write_skin_weights_file, compression=compression)
+
+    if not os.path.exists(path):
+        os.makedirs(path)
+
+    start_time = time.perf_counter()
+    future_list = list()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor, deformer_lib.deformer_history_cache:
+        for node in node_list:
+            if skin_index:
+                skin_cluster_list = [skin_lib.get_skin_cluster_index(node, skin_index)]
+            else:
+                skin_cluster_list = skin_lib.get_skin_cluster_list(node)
+
+            for skin_cluster in skin_cluster_list:
+                skin_cluster = skin_lib.rename_skin_cluster(skin_cluster)
+                skin_path = r'{}/{}.{}'.format(path, skin_cluster, file_format)
+                # Check if the file exists and is writable
+                if os.path.exists(skin_path) and not os.access(skin_path, os.W_OK):
+                    logging.info(f'{skin_path} is not writeable. Check Permissions.')
+                    continue
+
+                # Maya reads in the main thread, files in the pool
+                read_start_time = time.perf_counter()
+                skin_weights = skin_lib.get_skin_weights(skin_cluster)
+                read_time = time.perf_counter() - read_start_time
+
+                future_list.append(({'node': node, 'skin_cluster': skin_cluster, 'read_time': read_time},
+                                    executor.submit(write_function, skin_weights, skin_path)))
+
+        read_time = time.perf_counter() - start_time
+
+        file_list = list()
+        for file_data, future in future_list:
+            file_data.update(future.result())
+            file_list.append(file_data)
+
+    manifest = {'files': file_list,
+                'read_time': read_time,
+                'total_time': time.perf_counter() - start_time}
+
+    logging.info('{} skinClusters exported in {:.3f}s ({:.3f}s reading).'.format(len(file_list),
+                                                                                  manifest['total_time'],
+                                                                                  manifest['read_time']))
+    return manifest
+
+
+def import_skin_cluster(node, path, skin_index=1, import_method='index', search_for=None, replace_with=None,
+                        bulk=False, neighbour_count=4):
     """
     Import skinCluster from path
 
     Args:
         node (str): node that receives the skinCluster
-        path (str): full path of the skinCluster to import
+        path (str): full path of the skinCluster to import, json, npz or chunk
         skin_index (int): index of the skin, if None all the skinClusters will be exported. Defaults to 1.
-        import_method (str): index or nearest. Defaults to 'index'.
-        search_for (str): search string. Use ',' for more than once
+        import_method (str): 'index', 'nearest' (closest point), 'inverse_distance' (closest points weighted by
+                             distance) or 'barycentric' (closest point on the triangles, npz files exported from
+                             meshes). The spatial methods are always imported in bulk. Defaults to 'index'.
+        search_for (str): search string, replaced in memory. Use ',' for more than once
         replace_with (str): replace string. Use ',' for more than once
+        bulk (bool): read the file once and set all the weights in one MFnSkinCluster.setWeights call instead of
+                     using deformerWeights. npz and chunk files are always imported in bulk. Defaults to False.
+        neighbour_count (int): closest points used by the inverse_distance method. Defaults to 4.
     """
+    if import_method != 'index' and import_method not in spatial_import_methods:
+        cmds.error(f'{import_method} is not a valid import method, {["index"] + spatial_import_methods}')
+
     skin_cluster = skin_lib.get_skin_cluster_index(node, skin_index)
     file_name = os.path.basename(path)
+    file_format = file_name.split('.')[-1]
     path = os.path.dirname(path)
 
-    if search_for:
-        search_and_replace_in_file(r'{}/{}'.format(path, file_name), search_for=search_for, replace_with=replace_with)
+    bulk = bulk or file_format in [skin_weights_lib.npz_extension, storage_lib.chunk_extension] \
+        or import_method in spatial_import_methods
+
+    skin_weights = None
+    if file_format == skin_weights_lib.npz_extension:
+        # Get npz file weights, with its delta patches if it has any
+        skin_weights = skin_weights_lib.load_skin_weights_delta(r'{}/{}'.format(path, file_name))
+
+    elif file_format == storage_lib.chunk_extension:
+        # Get chunk file weights, uncompressed files are mapped
+        skin_weights = skin_weights_lib.SkinWeights.load_chunks(r'{}/{}'.format(path, file_name), mmap_mode='r')
+
+    elif bulk or search_for:
+        # Get json file weights, streamed straight to arrays
+        skin_weights = skin_weights_lib.SkinWeights.from_deformer_weights_file(r'{}/{}'.format(path, file_name))
 
-    # Get json file joints
-    skin_data = import_data_from_json(file_name=file_name.split('.')[0],
-                                      file_path=path,
-                                      relative_path=False)
+    if skin_weights:
+        # Get file joints, the file is never rewritten, the names are replaced in memory
+        if search_for:
+            name_remapper = NameRemapper(search_for=search_for, replace_with=replace_with)
+            skin_weights.influences = name_remapper.remap_list(skin_weights.influences)
+        file_skin_joints = skin_weights.influences
 
-    file_skin_joints = list()
-    for value in skin_data['deformerWeight']['weights']:
-        file_skin_joints.append(value['source'])
+    else:
+        # Get json file joints, only the header is read
+        skin_header = skin_weights_lib.read_deformer_weights_header(r'{}/{}'.format(path, file_name))
+
+        file_skin_joints = list()
+        for value in skin_header['weights']:
+            file_skin_joints.append(value['source'])
 
     # Check if the joints exists in the scene
     joints_not_in_scene = list()
@@ -424,19 +608,33 @@ def import_skin_cluster(node, path, skin_index=1, import_method='index', search_
     else:
         skin_cluster = skin_lib.create_skin_cluster(joints=file_skin_joints, node=node, skin_index=skin_index)
 
+    # Weights are set in bulk with the API, without pruning, locking or normalizing passes
+    if bulk:
+        if import_method in spatial_import_methods:
+            skin_weights = interpolate_skin_weights(skin_weights=skin_weights,
+                                                    file_path=r'{}/{}'.format(path, file_name),
+                                                    points=skin_lib.get_skin_cluster_points(skin_cluster),
+                                                    import_method=import_method,
+                                                    neighbour_count=neighbour_count)
+        skin_lib.set_skin_weights(skin_cluster=skin_cluster, skin_weights=skin_weights, normalize=True)
+
+        logging.info(f'{file_name} has been imported.')
+        return
+
+    # Non bulk index imports go through deformerWeights, remapped weights need a temporary json file
+    import_path = path
+    if skin_weights:
+        import_path = tempfile.mkdtemp(prefix='hiddenStrings')
+        export_data_to_json(data=skin_weights.to_deformer_weights(), file_name=file_name.split('.')[0],
+                            file_path=import_path, relative_path=False, compact=True)
+
     # Reading normalize weights
     skin_normalize = cmds.skinCluster(skin_cluster, query=True, normalizeWeights=True)
     # disable normalize weights
     cmds.skinCluster(skin_cluster, edit=True, normalizeWeights=0)
 
     # Empty skin cluster, if not it does not work as expected
-    node_type = cmds.nodeType(cmds.listRelatives(node, shapes=True)[0])
-    if 'nurbs' in node_type:
-        component_type = 'cv'
-    elif 'lattice' in node_type:
-        component_type = 'pt'
-    else:
-        component_type = 'vtx'
+    component_type = skin_lib.get_component_type(node)
 
     shape_components = f'{cmds.listRelatives(node, shapes=True, noIntermediate=True)[0]}.{component_type}[:]'
 
@@ -447,41 +645,149 @@ def import_skin_cluster(node, path, skin_index=1, import_method='index', search_
 
     # Import skinCluster
     try:
-        cmds.deformerWeights(file_name, path=path, deformer=skin_cluster, im=True, method=import_method)
+        cmds.deformerWeights(f'{file_name.split(".")[0]}.json', path=import_path, deformer=skin_cluster, im=True,
+                             method=import_method)
     except:
         logging.warning(f'{skin_cluster} has not been imported, check the topology')
+    finally:
+        if import_path != path:
+            shutil.rmtree(import_path, ignore_errors=True)
 
     # Restore normalize weights
     cmds.skinCluster(skin_cluster, edit=True, normalizeWeights=skin_normalize)
     cmds.skinCluster(skin_cluster, edit=True, forceNormalizeWeights=True)
 
-    if search_for:
-        search_and_replace_in_file(r'{}/{}'.format(path, file_name), search_for=replace_with, replace_with=search_for)
-
     logging.info(f'{file_name} has been imported.')
 
 
-def import_skin_clusters(path, import_method='index'):
+def interpolate_skin_weights(skin_weights, file_path, points, import_method='nearest', neighbour_count=4):
+    """
+    Get the weights of the points given from the weights of the file by proximity. The spatial index of the file
+    points is cached, so importing the same file onto several LODs builds it once
+
+    Args:
+        skin_weights (skin_weights_lib.SkinWeights): file weights, with the point positions
+        file_path (str): full path of the file, used as the cache key
+        points (np.ndarray): (point_count, 3) world positions of the points that receive the weights
+        import_method (str): 'nearest', 'inverse_distance' or 'barycentric'. Defaults to 'nearest'.
+        neighbour_count (int): closest points used by the inverse_distance method. Defaults to 4.
+
+    Returns:
+        skin_weights_lib.SkinWeights: weights of the points
+    """
+    if skin_weights.points is None:
+        cmds.error(f'{file_path} has no point positions')
+    if import_method == 'barycentric' and skin_weights.triangles is None:
+        cmds.error(f'{file_path} has no triangles, export the mesh skinCluster as npz')
+
+    spatial_index = spatial_lib.get_cached_spatial_index(file_path=file_path,
+                                                         points=skin_weights.points,
+                                                         triangles=skin_weights.triangles)
+
+    if import_method == 'barycentric':
+        point_indices, coefficients = spatial_index.get_barycentric_weights(points)
+    elif import_method == 'inverse_distance':
+        point_indices, coefficients = spatial_index.get_inverse_distance_weights(points, k=neighbour_count)
+    else:
+        point_indices, coefficients = spatial_index.get_nearest_weights(points)
+
+    return skin_weights.interpolate(point_indices=point_indices, coefficients=coefficients, points=points)
+
+
+def import_skin_clusters(path, import_method='index', bulk=False):
+    """
+    Import all json, npz and chunk skinClusters from folder
+
+    Args:
+        path (str): folder path to import
+        import_method (str): 'index', 'nearest', 'inverse_distance' or 'barycentric'. Defaults to 'index'.
+        bulk (bool): set the weights in one MFnSkinCluster.setWeights call. Defaults to False.
+    """
+    # Delta patches and manifests are read with their base file
+    file_list = [x for x in os.listdir(path) if x.split('.')[-1] in skin_file_formats
+                 and not skin_weights_lib.is_patch_file(x) and not x.endswith(skin_weights_lib.manifest_extension)]
+    with deformer_lib.deformer_history_cache:
+        for skin_file in file_list:
+            if skin_file.endswith(f'.{skin_weights_lib.npz_extension}'):
+                # Get npz file node, only the header is read
+                skin_header = skin_weights_lib.read_npz_header(r'{}/{}'.format(path, skin_file))
+                node_shape = skin_header['shape']
+                skin_cluster = skin_header['deformer']
+            elif skin_file.endswith(f'.{storage_lib.chunk_extension}'):
+                # Get chunk file node, only the header is read
+                skin_header = skin_weights_lib.read_chunk_header(r'{}/{}'.format(path, skin_file))
+                node_shape = skin_header['shape']
+                skin_cluster = skin_header['deformer']
+            else:
+                # Get json file node, only the header is read
+                skin_header = skin_weights_lib.read_deformer_weights_header(r'{}/{}'.format(path, skin_file))
+                node_shape = skin_header['shapes'][0]['name']
+                skin_cluster = skin_header['weights'][0]['deformer']
+
+            node = cmds.listRelatives(node_shape, parent=True)[0]
+            skin_index = int(skin_cluster.split('_')[0][-1:])
+
+            import_skin_cluster(node=node, path=r'{}/{}'.format(path, skin_file),
+                                skin_index=skin_index, import_method=import_method, bulk=bulk)
+
+
+def compact_skin_clusters(path):
     """
-    Import all json skinClusters from folder
+    Fold the delta patches of all the npz skinClusters from folder back into their base files
 
     Args:
-        path (str): 
-        import_method (str): can be 'index' or 'nearest'
+        path (str): folder path
     """
-    file_list = [x for x in os.listdir(path) if x.endswith('.json')]
+    file_list = [x for x in os.listdir(path) if x.endswith(f'.{skin_weights_lib.npz_extension}')
+                 and not skin_weights_lib.is_patch_file(x)]
     for skin_file in file_list:
-        # Get json file node
-        skin_data = import_data_from_json(file_name=skin_file.split('.')[0],
-                                          file_path=path,
-                                          relative_path=False)
+        patch_count = skin_weights_lib.compact_skin_weights_delta(r'{}/{}'.format(path, skin_file))
+        if patch_count:
+            logging.info(f'{skin_file}: {patch_count} patches compacted.')
+
+
+def convert_skin_json_to_npz(path, output_path=None, max_influences=None, quantize=False):
+    """
+    Convert a deformerWeights json skin file to the sparse binary npz format
+
+    Args:
+        path (str): full path of the json file
+        output_path (str, optional): output folder, None == same folder as the json file. Defaults to None.
+        max_influences (int, optional): prune the weights to max influences per point. Defaults to None.
+        quantize (bool, optional): store the weights as uint16. Defaults to False.
+
+    Returns:
+        str: npz file path
+    """
+    file_name = os.path.basename(path).split('.json')[0]
+    output_path = output_path if output_path else os.path.dirname(path)
 
-        node = cmds.listRelatives(skin_data['deformerWeight']['shapes'][0]['name'], parent=True)[0]
-        skin_cluster = skin_data['deformerWeight']['weights'][0]['deformer']
-        skin_index = int(skin_cluster.split('_')[0][-1:])
+    skin_weights = skin_weights_lib.SkinWeights.from_deformer_weights_file(path)
+    if max_influences:
+        skin_weights = skin_weights.prune(max_influences=max_influences)
 
-        import_skin_cluster(node=node, path=r'{}/{}'.format(path, skin_file),
-                            skin_index=skin_index, import_method=import_method)
+    return skin_weights.save(r'{}/{}.{}'.format(output_path, file_name, skin_weights_lib.npz_extension),
+                             quantize=quantize)
+
+
+def convert_skin_npz_to_json(path, output_path=None):
+    """
+    Convert a sparse binary npz skin file to the deformerWeights json format
+
+    Args:
+        path (str): full path of the npz file
+        output_path (str, optional): output folder, None == same folder as the npz file. Defaults to None.
+
+    Returns:
+        str: json file path
+    """
+    file_name = os.path.basename(path).split(f'.{skin_weights_lib.npz_extension}')[0]
+    output_path = output_path if output_path else os.path.dirname(path)
+
+    skin_weights = skin_weights_lib.load_skin_weights_delta(path)
+
+    return export_data_to_json(data=skin_weights.to_deformer_weights(), file_name=file_name,
+                               file_path=output_path, relative_path=False, use_indent=True)
 
 
 def export_data_to_json(data, file_name, file_path, relative_path=True, use_indent=True, compact=False):
@@ -540,32 +846,222 @@ def import_data_from_json(file_name, file_path, relative_path=True):
     return data
 
 
-def search_and_replace_in_file(path, search_for, replace_with):
+def get_data_file_path(file_name, file_path, relative_path=True, file_format='json'):
     """
-    Replace words in the file
+    Get the full path of a data file
 
     Args:
-        path (str): path
-        search_for (str): search string. Use ',' for more than once
-        replace_with (str): replace string. Use ',' for more than once
+        file_name (str): file name
+        file_path (str): file folder path
+        relative_path (bool): relative to the file. Defaults to True
+        file_format (str): file extension. Defaults to 'json'
 
     Returns:
-        str: path
+        str: file path name with extension
     """
+    if relative_path:
+        module_path = os.path.dirname(os.path.dirname(__file__))
+        return f'{module_path}/{file_path}/{file_name}.{file_format}'
 
-    search_for = search_for.split(',')
-    replace_with = replace_with.split(',')
+    return f'{file_path}/{file_name}.{file_format}'
 
-    if len(search_for) != len(replace_with):
-        cmds.error('Search for and replace with must have same number of words (split with commas)')
 
-    with open(path, 'r+') as skin_file:
-        lines = skin_file.readlines()
-        skin_file.seek(0)
-        skin_file.truncate()
-        for line in lines:
-            for index, value in enumerate(search_for):
-                line = line.replace(value, replace_with[index])
-            skin_file.writelines(line)
+def export_data(data, file_name, file_path, relative_path=True, file_format='json', compact=False, chunk_key=None,
+                compression='zlib'):
+    """
+    Export data to a json or chunk file
 
-    return path
+    Args:
+        data (object): data to export
+        file_name (str): file name
+        file_path (str): file folder path
+        relative_path (bool): relative to the file. Defaults to True
+        file_format (str): 'json' or 'chunk'. Defaults to 'json'
+        compact (bool): json only, no indentation. Defaults to False
+        chunk_key (str): chunk only, each item of the data[chunk_key] dictionary is stored in its own chunk, so it
+                         can be imported alone. Defaults to None
+        compression (str): chunk only, 'zlib', 'lzma' or 'none'. The np.ndarray values are stored in their own
+                           chunks, uncompressed files can be mapped on import. Defaults to 'zlib'
+
+    Returns:
+        str: file path name with extension
+    """
+    if file_format not in data_file_formats:
+        cmds.error(f'{file_format} is not a valid data file format, {data_file_formats}')
+
+    if file_format == 'json':
+        return export_data_to_json(data=data, file_name=file_name, file_path=file_path, relative_path=relative_path,
+                                   compact=compact)
+
+    # One chunk with the data, and one chunk per item of the chunk_key dictionary
+    chunk_dict = dict()
+    if chunk_key:
+        chunk_dict[data_chunk] = storage_lib.pack_arrays({key: value for key, value in data.items()
+                                                          if key != chunk_key}, data_chunk, chunk_dict)
+        for key, value in data[chunk_key].items():
+            chunk_dict[f'{chunk_key}/{key}'] = storage_lib.pack_arrays(value, f'{chunk_key}/{key}', chunk_dict)
+    else:
+        chunk_dict[data_chunk] = storage_lib.pack_arrays(data, data_chunk, chunk_dict)
+
+    return storage_lib.write_chunk_file(get_data_file_path(file_name=file_name, file_path=file_path,
+                                                           relative_path=relative_path, file_format=file_format),
+                                        chunk_dict=chunk_dict, metadata={'chunk_key': chunk_key},
+                                        compression=compression)
+
+
+def import_data(file_name, file_path, relative_path=True, file_format=None, chunk_list=None, mmap_mode=None):
+    """
+    Import data from a json or chunk file
+
+    Args:
+        file_name (str): file name
+        file_path (str): file folder path
+        relative_path (bool): relative to the file. Defaults to True
+        file_format (str): 'json' or 'chunk', None == the chunk file if it exists, if not the json file.
+                           Defaults to None
+        chunk_list (list): chunk only, keys of the data[chunk_key] dictionary to read, None == all of them.
+                           Defaults to None
+        mmap_mode (str): chunk only, np.memmap mode of the arrays of uncompressed files, None == read the arrays.
+                         Defaults to None
+
+    Returns:
+        object: data imported
+    """
+    chunk_file_path = get_data_file_path(file_name=file_name, file_path=file_path, relative_path=relative_path,
+                                         file_format=storage_lib.chunk_extension)
+    if file_format == 'json' or not storage_lib.is_chunk_file(chunk_file_path):
+        return import_data_from_json(file_name=file_name, file_path=file_path, relative_path=relative_path)
+
+    chunk_reader = storage_lib.ChunkFileReader(chunk_file_path, mmap_mode=mmap_mode)
+    data = storage_lib.unpack_arrays(chunk_reader.read_chunk(data_chunk), chunk_reader)
+    chunk_key = chunk_reader.get_metadata().get('chunk_key')
+    if chunk_key:
+        prefix = f'{chunk_key}/'
+        key_list = [x[len(prefix):] for x in chunk_reader.get_chunk_names() if x.startswith(prefix)]
+        if chunk_list is not None:
+            key_list = [x for x in key_list if x in chunk_list]
+        data[chunk_key] = {key: storage_lib.unpack_arrays(chunk_reader.read_chunk(f'{prefix}{key}'), chunk_reader)
+                           for key in key_list}
+
+    return data
+
+
+def import_data_from_path(path, chunk_list=None, mmap_mode=None):
+    """
+    Import data from the full path of a json or chunk file
+
+    Args:
+        path (str): full path of the file
+        chunk_list (list): chunk only, keys of the data[chunk_key] dictionary to read, None == all of them.
+                           Defaults to None
+        mmap_mode (str): chunk only, np.memmap mode of the arrays of uncompressed files. Defaults to None
+
+    Returns:
+        object: data imported
+    """
+    file_name, file_format = os.path.splitext(os.path.basename(path))
+
+    return import_data(file_name=file_name, file_path=os.path.dirname(path), relative_path=False,
+                       file_format=file_format[1:] if file_format[1:] in data_file_formats else None,
+                       chunk_list=chunk_list, mmap_mode=mmap_mode)
+
+
+class NameRemapper(object):
+    """
+    Search and replace rules compiled into one regex, the text is scanned once whatever the number of rules.
+    The rules are applied at the same time, where several words match the longest one is replaced
+
+    Args:
+        search_for (str): search string. Use ',' for more than once
+        replace_with (str): replace string. Use ',' for more than once
+    """
+    def __init__(self, search_for, replace_with):
+        """
+        Initializes an instance of NameRemapper
+
+        Args:
+            search_for (str): search string. Use ',' for more than once
+            replace_with (str): replace string. Use ',' for more than once
+        """
+        search_for = search_for.split(',')
+        replace_with = replace_with.split(',')
+
+        if len(search_for) != len(replace_with):
+            cmds.error('Search for and replace with must have same number of words (split with commas)')
+        if '' in search_for:
+            cmds.error('Search for can not have empty words')
+
+        self.replace_dict = dict(zip(search_for, replace_with))
+        self.regex = re.compile(self.get_trie_pattern(self.replace_dict))
+
+
+    @staticmethod
+    def get_trie_pattern(word_list):
+        """
+        Get a regex pattern with the words merged in a prefix tree, at each position of the text only one branch
+        can match so the cost does not depend on the number of words
+
+        Args:
+            word_list (list): words to match
+
+        Returns:
+            str: regex pattern
+        """
+        trie = dict()
+        for word in word_list:
+            node = trie
+            for character in word:
+                node = node.setdefault(character, dict())
+            node[''] = None  # End of word
+
+        def get_node_pattern(node):
+            branch_list = [re.escape(character) + get_node_pattern(child)
+                           for character, child in node.items() if character]
+            if not branch_list:
+                return ''
+            pattern = branch_list[0] if len(branch_list) == 1 else '(?:{})'.format('|'.join(branch_list))
+            # The end of a word is optional, a longer word is tried first
+            if '' in node:
+                pattern = f'(?:{pattern})?'
+            return pattern
+
+        return get_node_pattern(trie)
+
+
+    def replace_match(self, match):
+        """
+        Get the replace word of a regex match
+
+        Args:
+            match (re.Match): regex match
+
+        Returns:
+            str: replace word
+        """
+        return self.replace_dict[match.group()]
+
+
+    def remap(self, string):
+        """
+        Replace the words in the string
+
+        Args:
+            string (str): string
+
+        Returns:
+            str: string with the words replaced
+        """
+        return self.regex.sub(self.replace_match, string)
+
+
+    def remap_list(self, string_list):
+        """
+        Replace the words in each string of the list
+
+        Args:
+            string_list (list): list of strings
+
+        Returns:
+            list: list with the words replaced
+        """
+        return [self.remap(x) for x in string_list]
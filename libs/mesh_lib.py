@@ -0,0 +1,157 @@
+# Imports
+import os
+import logging
+import tempfile
+
+import numpy as np
+
+# Maya imports
+from maya import cmds
+from maya.api import OpenMaya
+
+# Project imports
+from hiddenStrings.libs import symmetry_lib
+
+logging = logging.getLogger(__name__)
+
+
+def get_mesh_function_set(node):
+    """
+    Get the MFnMesh of a mesh transform or shape, or of mesh data like the geometry of a deformer plug
+
+    Args:
+        node (str or OpenMaya.MObject): mesh transform or shape, or mesh data
+
+    Returns:
+        OpenMaya.MFnMesh: mesh function set
+    """
+    if isinstance(node, OpenMaya.MObject):
+        if not node.hasFn(OpenMaya.MFn.kMesh) and not node.hasFn(OpenMaya.MFn.kMeshData):
+            cmds.error(f'{node.apiTypeStr} is not mesh data')
+        return OpenMaya.MFnMesh(node)
+
+    selection_list = OpenMaya.MSelectionList()
+    selection_list.add(node)
+    dag_path = selection_list.getDagPath(0)
+    if dag_path.hasFn(OpenMaya.MFn.kTransform):
+        dag_path.extendToShape()
+    if not dag_path.hasFn(OpenMaya.MFn.kMesh):
+        cmds.error(f'{node} is not a mesh')
+
+    return OpenMaya.MFnMesh(dag_path)
+
+
+def get_mesh_points(node, space=OpenMaya.MSpace.kObject):
+    """
+    Get the vertex positions of a mesh
+
+    Args:
+        node (str or OpenMaya.MObject): mesh transform or shape, or mesh data
+        space (int, optional): OpenMaya.MSpace. Defaults to OpenMaya.MSpace.kObject.
+
+    Returns:
+        np.ndarray: (vertex_count, 3) positions
+    """
+    points = get_mesh_function_set(node).getPoints(space)
+
+    return np.array([(x.x, x.y, x.z) for x in points], dtype=np.float64).reshape(-1, 3)
+
+
+def get_mesh_triangles(node):
+    """
+    Get the triangles of a mesh
+
+    Args:
+        node (str or OpenMaya.MObject): mesh transform or shape, or mesh data
+
+    Returns:
+        np.ndarray: (triangle_count, 3) vertex indices
+    """
+    triangle_counts, triangle_vertices = get_mesh_function_set(node).getTriangles()
+
+    return np.array(triangle_vertices, dtype=np.int64).reshape(-1, 3)
+
+
+def get_mesh_polygons(node):
+    """
+    Get the polygons of a mesh as vertex counts and a flat vertex list
+
+    Args:
+        node (str or OpenMaya.MObject): mesh transform or shape, or mesh data
+
+    Returns:
+        tuple: (polygon_counts, polygon_vertices) int64 arrays
+    """
+    polygon_counts, polygon_vertices = get_mesh_function_set(node).getVertices()
+
+    return np.array(polygon_counts, dtype=np.int64), np.array(polygon_vertices, dtype=np.int64)
+
+
+def get_symmetry_cache_path():
+    """
+    Get the default symmetry map cache folder, next to the scene or in the temp folder for unsaved scenes
+
+    Returns:
+        str: folder path
+    """
+    scene_path = cmds.file(query=True, sceneName=True)
+    if scene_path:
+        return f'{os.path.dirname(scene_path)}/symmetry'
+
+    return os.path.join(tempfile.gettempdir(), 'hiddenStrings', 'symmetry')
+
+
+def get_mesh_symmetry_map(node, method=symmetry_lib.positional, axis='x', seed_edge=None, cache_path=None,
+                          rebuild=False):
+    """
+    Get the vertex symmetry map of a mesh. The map is cached on disk by topology hash, so it is computed once per
+    topology. Positional maps are cached by the rounded vertex positions too, so a re-sculpted mesh gets a new map,
+    and topological maps by the seed edge vertices, so a walk from another edge gets a new map
+
+    Args:
+        node (str or OpenMaya.MObject): mesh transform or shape, or mesh data
+        method (str, optional): 'positional' (mirrored positions in object space) or 'topological' (walk from a
+                                center edge). Defaults to 'positional'.
+        axis (str, optional): mirror axis, 'x', 'y' or 'z'. Defaults to 'x'.
+        seed_edge (int, optional): index of an edge on the symmetry plane, needed by the topological method.
+                                   Defaults to None.
+        cache_path (str, optional): cache folder, None == get_symmetry_cache_path. Defaults to None.
+        rebuild (bool, optional): ignore the cached map. Defaults to False.
+
+    Returns:
+        np.ndarray: (vertex_count,) opposite vertex of each vertex
+    """
+    if method not in symmetry_lib.symmetry_methods:
+        cmds.error(f'{method} is not a valid symmetry method, {symmetry_lib.symmetry_methods}')
+
+    polygon_counts, polygon_vertices = get_mesh_polygons(node)
+    topology_hash = symmetry_lib.get_topology_hash(polygon_counts, polygon_vertices)
+    points = get_mesh_points(node) if method == symmetry_lib.positional else None
+    points_hash = symmetry_lib.get_points_hash(points) if points is not None else None
+    seed_vertices = None
+    if method == symmetry_lib.topological:
+        if seed_edge is None:
+            cmds.error('the topological symmetry needs a seed edge on the symmetry plane')
+        seed_vertices = tuple(get_mesh_function_set(node).getEdgeVertices(seed_edge))
+
+    cache_path = cache_path if cache_path else get_symmetry_cache_path()
+    file_path = symmetry_lib.get_symmetry_map_path(cache_path=cache_path, topology_hash=topology_hash,
+                                                   method=method, axis=axis, points_hash=points_hash,
+                                                   seed_vertices=seed_vertices)
+    if not rebuild:
+        symmetry_map = symmetry_lib.load_symmetry_map(file_path, topology_hash=topology_hash)
+        if symmetry_map is not None:
+            return symmetry_map
+
+    if method == symmetry_lib.topological:
+        symmetry_map = symmetry_lib.get_topological_symmetry_map(polygon_counts=polygon_counts,
+                                                                 polygon_vertices=polygon_vertices,
+                                                                 seed_edge=seed_vertices)
+    else:
+        symmetry_map = symmetry_lib.get_positional_symmetry_map(points=points, axis=axis)
+
+    symmetry_lib.save_symmetry_map(file_path=file_path, symmetry_map=symmetry_map, topology_hash=topology_hash,
+                                   method=method, axis=axis)
+    logging.info(f'symmetry map cached in {file_path}')
+
+    return symmetry_map
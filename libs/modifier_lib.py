@@ -0,0 +1,76 @@
+# Imports
+import logging
+from contextlib import contextmanager
+
+# Maya imports
+from maya import cmds
+
+logging = logging.getLogger(__name__)
+
+# Command registered by plugins/apply_modifier.py
+command_name = 'applyModifier'
+
+# Modifiers waiting for the command, the command takes the last one
+pending_modifier_list = list()
+
+
+def is_undoable():
+    """
+    Check if the modifiers can be added to the undo queue
+
+    Returns:
+        bool: True == the applyModifier plug-in is loaded
+    """
+    return hasattr(cmds, command_name)
+
+
+def apply_modifier(modifier):
+    """
+    Run an MDGModifier or MDagModifier, or any object with doIt and undoIt methods like
+    skin_lib.SkinWeightsModifier. With the applyModifier plug-in loaded the modifier is run by the command, so the
+    whole modifier is undone in one step. Without it the modifier is run directly and can not be undone
+
+    Args:
+        modifier (OpenMaya.MDGModifier): modifier with the changes queued
+
+    Returns:
+        OpenMaya.MDGModifier: modifier
+    """
+    if not is_undoable():
+        logging.warning(f'{command_name} plug-in is not loaded, the changes can not be undone.')
+        modifier.doIt()
+        return modifier
+
+    pending_modifier_list.append(modifier)
+    try:
+        getattr(cmds, command_name)()
+    finally:
+        if modifier in pending_modifier_list:
+            pending_modifier_list.remove(modifier)
+
+    return modifier
+
+
+def pop_modifier():
+    """
+    Take the last modifier given to apply_modifier, used by the applyModifier command
+
+    Returns:
+        OpenMaya.MDGModifier: modifier, None if there is none
+    """
+    return pending_modifier_list.pop() if pending_modifier_list else None
+
+
+@contextmanager
+def undo_chunk(chunk_name):
+    """
+    Group the undoable changes of the scope in one undo step
+
+    Args:
+        chunk_name (str): name shown in the undo queue
+    """
+    cmds.undoInfo(openChunk=True, chunkName=chunk_name)
+    try:
+        yield
+    finally:
+        cmds.undoInfo(closeChunk=True)
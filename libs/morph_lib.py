@@ -4,7 +4,7 @@ import logging
 from maya import cmds
 
 # Project imports
-from hiddenStrings.libs import side_lib, usage_lib
+from hiddenStrings.libs import side_lib, usage_lib, deformer_lib
 
 logging = logging.getLogger(__name__)
 
@@ -59,6 +59,7 @@ def create_morph_deformer(driver,
     # Create the morph deformer
     morph_node = cmds.rename(cmds.deformer(driven_list, type='morph'),
                              f'{driver_descriptor}{driver_usage}_{driver_side}_morph')
+    deformer_lib.invalidate_deformer_history()
     # Morph attributes
     cmds.setAttr(f'{morph_node}.morphMode', morph_mode)
     cmds.setAttr(f'{morph_node}.morphSpace', morph_space)
@@ -0,0 +1,388 @@
+# Imports
+import logging
+
+import numpy as np
+
+# Maya imports
+from maya import cmds
+from maya.api import OpenMaya
+
+# Project imports
+from hiddenStrings.libs import usage_lib, modifier_lib
+
+logging = logging.getLogger(__name__)
+
+skin_pose_attr = 'skinPoseData'
+
+# Plug value types of the table
+double_type = 0
+int_type = 1
+bool_type = 2
+
+# Transform channels, with their default value
+transform_channel_list = [(f'{attr}{axis}', 1.0 if attr == 's' else 0.0) for attr in 'trs' for axis in 'xyz']
+# Controls with any of these plugs changed are set with xform, their matrix is not only translate, rotate and scale
+pivot_attr_list = ['rotatePivot', 'scalePivot', 'rotatePivotTranslate', 'scalePivotTranslate', 'rotateAxis',
+                   'shear']
+
+# Numeric attribute types with a scalar value
+numeric_type_dict = {OpenMaya.MFnNumericData.kBoolean: bool_type,
+                     OpenMaya.MFnNumericData.kByte: int_type,
+                     OpenMaya.MFnNumericData.kChar: int_type,
+                     OpenMaya.MFnNumericData.kShort: int_type,
+                     OpenMaya.MFnNumericData.kInt: int_type,
+                     OpenMaya.MFnNumericData.kFloat: double_type,
+                     OpenMaya.MFnNumericData.kDouble: double_type}
+
+# Cached tables, {control uuids: PoseTable}
+pose_table_cache = dict()
+
+
+class PoseTable(object):
+    """
+    Table of the pose plugs of a list of controls: the transform channels and the scalar user defined attributes,
+    with their default values and the skin pose matrix of each control. The table is read once in one pass with
+    the API, the poses are read and set as arrays, and set with one modifier in one undo step
+
+    Args:
+        control_list (list): controls
+    """
+    def __init__(self, control_list):
+        """
+        Initializes an instance of PoseTable
+
+        Args:
+            control_list (list): controls
+        """
+        self.control_list = list(control_list)
+        self.uuid_list = cmds.ls(self.control_list, uuid=True) if self.control_list else list()
+
+        selection_list = OpenMaya.MSelectionList()
+        for ctr in self.control_list:
+            selection_list.add(ctr)
+
+        self.handle_list = list()
+        self.plug_list = list()
+        plug_controls = list()
+        type_list = list()
+        default_list = list()
+        self.transform_plug_indices = np.full((len(self.control_list), len(transform_channel_list)), -1,
+                                              dtype=np.int64)
+        self.skin_pose_plug_dict = dict()
+        self.rotate_order_plug_dict = dict()
+        self.xform_control_set = set()
+
+        for control_index in range(len(self.control_list)):
+            node = selection_list.getDependNode(control_index)
+            node_fn = OpenMaya.MFnDependencyNode(node)
+            self.handle_list.append(OpenMaya.MObjectHandle(node))
+
+            # Transform channels
+            if node.hasFn(OpenMaya.MFn.kTransform):
+                for channel_index, (channel, default_value) in enumerate(transform_channel_list):
+                    self.transform_plug_indices[control_index, channel_index] = len(self.plug_list)
+                    self.plug_list.append(node_fn.findPlug(channel, False))
+                    plug_controls.append(control_index)
+                    type_list.append(double_type)
+                    default_list.append(default_value)
+                self.rotate_order_plug_dict[control_index] = node_fn.findPlug('rotateOrder', False)
+                if node.hasFn(OpenMaya.MFn.kJoint) or not self.has_default_pivots(node_fn):
+                    self.xform_control_set.add(control_index)
+
+            # Scalar user defined attributes
+            for attribute_index in range(node_fn.attributeCount()):
+                attribute = node_fn.attribute(attribute_index)
+                attribute_fn = OpenMaya.MFnAttribute(attribute)
+                # Children of compound attributes are skipped
+                if not attribute_fn.dynamic or not attribute_fn.parent.isNull():
+                    continue
+                if attribute_fn.name == skin_pose_attr:
+                    self.skin_pose_plug_dict[control_index] = node_fn.findPlug(attribute, False)
+                    continue
+
+                plug_type, default_value = self.get_attribute_default(attribute)
+                if plug_type is None:
+                    continue
+                plug = node_fn.findPlug(attribute, False)
+                if plug.isArray or plug.isCompound:
+                    continue
+                self.plug_list.append(plug)
+                plug_controls.append(control_index)
+                type_list.append(plug_type)
+                default_list.append(default_value)
+
+        self.plug_controls = np.array(plug_controls, dtype=np.int64)
+        self.plug_types = np.array(type_list, dtype=np.int8)
+        self.default_values = np.array(default_list, dtype=np.float64)
+        self.skin_pose_data_dict = dict()
+
+
+    def is_valid(self):
+        """
+        Check if the controls of the table still exist. The UUIDs are saved with the scene, so after opening or
+        reverting the scene, or reloading a reference, the same UUIDs can belong to new nodes and the plugs of the
+        table point to deleted ones
+
+        Returns:
+            bool: True == all the controls are alive
+        """
+        return all(x.isValid() for x in self.handle_list)
+
+
+    @staticmethod
+    def has_default_pivots(node_fn):
+        """
+        Check if the pivots, rotate axis and shear of a transform are zero
+
+        Args:
+            node_fn (OpenMaya.MFnDependencyNode): transform function set
+
+        Returns:
+            bool: True == the local matrix only depends on translate, rotate and scale
+        """
+        for attr in pivot_attr_list:
+            plug = node_fn.findPlug(attr, False)
+            if any(abs(plug.child(i).asDouble()) > 1e-9 for i in range(plug.numChildren())):
+                return False
+
+        return True
+
+
+    @staticmethod
+    def get_attribute_default(attribute):
+        """
+        Get the value type and the default of a scalar attribute
+
+        Args:
+            attribute (OpenMaya.MObject): attribute
+
+        Returns:
+            tuple: (plug type, default value), (None, None) for non scalar attributes
+        """
+        if attribute.hasFn(OpenMaya.MFn.kNumericAttribute):
+            attribute_fn = OpenMaya.MFnNumericAttribute(attribute)
+            plug_type = numeric_type_dict.get(attribute_fn.numericType())
+            if plug_type is None:
+                return None, None
+            return plug_type, float(attribute_fn.default)
+
+        if attribute.hasFn(OpenMaya.MFn.kEnumAttribute):
+            return int_type, float(OpenMaya.MFnEnumAttribute(attribute).default)
+
+        if attribute.hasFn(OpenMaya.MFn.kUnitAttribute):
+            attribute_fn = OpenMaya.MFnUnitAttribute(attribute)
+            unit_type = attribute_fn.unitType()
+            if unit_type == OpenMaya.MFnUnitAttribute.kAngle:
+                return double_type, attribute_fn.default.asRadians()
+            if unit_type == OpenMaya.MFnUnitAttribute.kDistance:
+                return double_type, attribute_fn.default.asCentimeters()
+
+        return None, None
+
+
+    def get_values(self):
+        """
+        Get the current values of the plugs, in internal units
+
+        Returns:
+            np.ndarray: (plug_count,) values
+        """
+        values = np.empty(len(self.plug_list), dtype=np.float64)
+        for index, plug in enumerate(self.plug_list):
+            values[index] = plug.asDouble()
+
+        return values
+
+
+    def get_default_values(self):
+        """
+        Get the default values of the plugs
+
+        Returns:
+            np.ndarray: (plug_count,) values
+        """
+        return self.default_values.copy()
+
+
+    def get_skin_pose_matrix(self, control_index):
+        """
+        Get the skin pose matrix stored in a control, the parsed matrices are cached by string
+
+        Args:
+            control_index (int): index of the control in the table
+
+        Returns:
+            list: 16 floats, None if the control has no skin pose
+        """
+        if control_index not in self.skin_pose_plug_dict:
+            return None
+
+        skin_pose_data = self.skin_pose_plug_dict[control_index].asString()
+        if skin_pose_data not in self.skin_pose_data_dict:
+            matrix = skin_pose_data.split('[')[-1].split(']')[0].split(',')
+            self.skin_pose_data_dict[skin_pose_data] = [float(x) for x in matrix] if skin_pose_data else None
+
+        return self.skin_pose_data_dict[skin_pose_data]
+
+
+    def get_skin_pose_values(self):
+        """
+        Get the skin pose, the default values with the skin pose matrices of the controls decomposed in their
+        translate, rotate and scale channels. The matrices are stored with xform in UI units, their translation is
+        converted to internal units like the rest of the values
+
+        Returns:
+            tuple: (values (plug_count,), {control index: matrix} of the controls that need xform)
+        """
+        values = self.get_default_values()
+        xform_dict = dict()
+        ui_unit = OpenMaya.MDistance.uiUnit()
+        for control_index in self.skin_pose_plug_dict:
+            matrix = self.get_skin_pose_matrix(control_index)
+            if matrix is None or control_index not in self.rotate_order_plug_dict:
+                continue
+            if control_index in self.xform_control_set:
+                xform_dict[control_index] = matrix
+                continue
+
+            transformation_matrix = OpenMaya.MTransformationMatrix(OpenMaya.MMatrix(matrix))
+            rotation = transformation_matrix.rotation()
+            rotation.reorderIt(self.rotate_order_plug_dict[control_index].asInt())
+            translation = [OpenMaya.MDistance(x, ui_unit).asCentimeters()
+                           for x in transformation_matrix.translation(OpenMaya.MSpace.kTransform)]
+            channel_values = (translation
+                              + [rotation.x, rotation.y, rotation.z]
+                              + list(transformation_matrix.scale(OpenMaya.MSpace.kTransform)))
+            values[self.transform_plug_indices[control_index]] = channel_values
+
+        return values, xform_dict
+
+
+    def set_values(self, values, xform_dict=None, chunk_name='setPose'):
+        """
+        Set the plug values with one modifier in one undo step, the plugs that already have the value, and the
+        locked or connected plugs are skipped
+
+        Args:
+            values (np.ndarray): (plug_count,) values in internal units
+            xform_dict (dict, optional): {control index: object space matrix} set with xform after the values.
+                                         Defaults to None.
+            chunk_name (str, optional): name of the undo step. Defaults to 'setPose'.
+
+        Returns:
+            int: number of plugs changed
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) != len(self.plug_list):
+            raise ValueError(f'{len(values)} values given for {len(self.plug_list)} plugs')
+
+        modifier = OpenMaya.MDGModifier()
+        changed_count = 0
+        for plug, plug_type, value in zip(self.plug_list, self.plug_types.tolist(), values.tolist()):
+            if plug.isLocked or plug.isDestination or abs(plug.asDouble() - value) <= 1e-9:
+                continue
+            if plug_type == double_type:
+                modifier.newPlugValueDouble(plug, value)
+            elif plug_type == bool_type:
+                modifier.newPlugValueBool(plug, bool(value))
+            else:
+                modifier.newPlugValueInt(plug, int(round(value)))
+            changed_count += 1
+
+        with modifier_lib.undo_chunk(chunk_name):
+            if changed_count:
+                modifier_lib.apply_modifier(modifier)
+            for control_index, matrix in (xform_dict or dict()).items():
+                cmds.xform(self.control_list[control_index], objectSpace=True, matrix=matrix)
+
+        return changed_count
+
+
+def get_control_list():
+    """
+    Get the controls of the scene
+
+    Returns:
+        list: controls
+    """
+    return cmds.ls(f'*_{usage_lib.control}')
+
+
+def get_pose_table(control_list=None, rebuild=False):
+    """
+    Get the pose table of the controls, cached by control UUIDs, so deleted or new controls build a new table.
+    Cached tables with deleted controls, from a scene opened again or a reloaded reference, are built again
+
+    Args:
+        control_list (list, optional): controls, None == all the controls of the scene. Defaults to None.
+        rebuild (bool, optional): read the table again, after adding or removing attributes. Defaults to False.
+
+    Returns:
+        PoseTable: table
+    """
+    control_list = get_control_list() if control_list is None else control_list
+    key = tuple(cmds.ls(control_list, uuid=True)) if control_list else tuple()
+
+    if rebuild or key not in pose_table_cache or not pose_table_cache[key].is_valid():
+        pose_table_cache[key] = PoseTable(control_list)
+
+    return pose_table_cache[key]
+
+
+def clear_pose_table_cache():
+    """
+    Remove all the cached pose tables
+    """
+    pose_table_cache.clear()
+
+
+def set_skin_pose(control_list=None, rebuild=False):
+    """
+    Set the controls to default and then apply the skin pose attribute if exists, the skin pose is in objectSpace
+    and does not take into account follows settings
+
+    Args:
+        control_list (list, optional): controls, None == all the controls of the scene. Defaults to None.
+        rebuild (bool, optional): read the pose table again. Defaults to False.
+
+    Returns:
+        int: number of plugs changed
+    """
+    pose_table = get_pose_table(control_list=control_list, rebuild=rebuild)
+    values, xform_dict = pose_table.get_skin_pose_values()
+
+    return pose_table.set_values(values, xform_dict=xform_dict, chunk_name='skinPose')
+
+
+def snapshot_pose(control_list=None):
+    """
+    Store the current pose of the controls
+
+    Args:
+        control_list (list, optional): controls, None == all the controls of the scene. Defaults to None.
+
+    Returns:
+        dict: {'controls': control list, 'uuids': control UUIDs, 'values': np.ndarray}
+    """
+    pose_table = get_pose_table(control_list=control_list)
+
+    return {'controls': list(pose_table.control_list),
+            'uuids': list(pose_table.uuid_list),
+            'values': pose_table.get_values()}
+
+
+def restore_pose(snapshot):
+    """
+    Restore a pose stored with snapshot_pose
+
+    Args:
+        snapshot (dict): pose from snapshot_pose
+
+    Returns:
+        int: number of plugs changed
+    """
+    pose_table = get_pose_table(control_list=cmds.ls(snapshot['uuids']))
+    if pose_table.uuid_list != snapshot['uuids'] or len(pose_table.plug_list) != len(snapshot['values']):
+        cmds.error('the controls or their attributes have changed since the snapshot')
+
+    return pose_table.set_values(snapshot['values'], chunk_name='restorePose')
@@ -1,77 +1,155 @@
 # Imports
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 
 # Maya imports
 from maya import cmds
+from maya.api import OpenMaya, OpenMayaAnim
 
 # Project imports
-from hiddenStrings.libs import side_lib, usage_lib
+from hiddenStrings.libs import (side_lib, usage_lib, deformer_lib, mesh_lib, modifier_lib, pose_lib, skin_weights_lib,
+                                spatial_lib)
 
 logging = logging.getLogger(__name__)
 
 
-def set_labels():
+class JointLabelsScope(object):
     """
-    Set the joints label for mirror and transfer skin tools
+    Scope where the joint labels are already set. The scene joints are labeled once when the outer scope opens and
+    set_labels skips the labeling inside the scope, so several transfer_skin calls label the scene once
+
+    Example:
+        with skin_lib.joint_labels_scope:
+            for target in target_list:
+                skin_lib.transfer_skin(source, target)
     """
-    joint_list = cmds.ls(type='joint')
+    def __init__(self):
+        """
+        Initializes an instance of JointLabelsScope
+        """
+        self.depth = 0
 
-    for jnt in joint_list:
-        if len(jnt.split('_')) == 3:
-            desc, side, usage = jnt.split('_')
-            usage_capitalize = f'{usage[0].upper()}{usage[1:]}'
 
-            if side == side_lib.center:
-                cmds.setAttr(f'{jnt}.side', 0)
-            if side == side_lib.left:
-                cmds.setAttr(f'{jnt}.side', 1)
-            if side == side_lib.right:
-                cmds.setAttr(f'{jnt}.side', 2)
+    def __enter__(self):
+        """
+        Open a labels scope, the scene joints are labeled when the outer scope opens
 
-            cmds.setAttr(f'{jnt}.type', 18)
-            cmds.setAttr(f'{jnt}.otherType', f'{desc}{usage_capitalize}', type='string')
+        Returns:
+            JointLabelsScope: scope
+        """
+        if not self.depth:
+            set_labels(force=True)
+        self.depth += 1
 
-            logging.info('labels has been set.')
-        else:
-            cmds.setAttr(f'{jnt}.type', 18)
-            cmds.setAttr(f'{jnt}.otherType', jnt, type='string')
-            logging.info('{} has an incorrect name, should be renamed with the following pattern:'
-                         ' descriptor_side_usage.'.format(jnt))
+        return self
 
 
-def set_skin_pose(*args):
+    def __exit__(self, exc_type, exc_value, traceback):
+        """
+        Close a labels scope
+        """
+        self.depth -= 1
+
+
+    def is_enabled(self):
+        """
+        Check if the labels are already set
+
+        Returns:
+            bool: True == inside a scope
+        """
+        return self.depth > 0
+
+
+joint_labels_scope = JointLabelsScope()
+
+
+def get_joint_label(joint_name):
     """
-    Set all controls in the scene to default and then apply the skin pose attribute if exists, the skin pose is in
-    objectSpace and does not take into account follows settings
+    Get the label of a joint from its name
+
+    Args:
+        joint_name (str): joint's name, descriptor_side_usage
+
+    Returns:
+        tuple: (side, other type), side is None when the name has no valid side
     """
-    skin_pose_attr = 'skinPoseData'
+    if len(joint_name.split('_')) != 3:
+        return None, joint_name
 
-    control_list = cmds.ls(f'*_{usage_lib.control}')
+    desc, side, usage = joint_name.split('_')
+    usage_capitalize = f'{usage[0].upper()}{usage[1:]}'
+    side_value = {side_lib.center: 0, side_lib.left: 1, side_lib.right: 2}.get(side)
 
-    for ctr in control_list:
-        user_attrs = cmds.listAttr(ctr, userDefined=True)
-        if user_attrs:
-            for user_attr in cmds.listAttr(ctr, userDefined=True):
-                try:
-                    user_attr_dv = cmds.attributeQuery(user_attr, node=ctr, listDefault=True)[0]
-                    cmds.setAttr(f'{ctr}.{user_attr}', user_attr_dv)
-                except:
-                    pass
+    return side_value, f'{desc}{usage_capitalize}'
 
-        for attr in 'trs':
-            for axis in 'xyz':
-                attr_value = 1 if attr == 's' else 0
-                try:
-                    cmds.setAttr(f'{ctr}.{attr}{axis}', attr_value)
-                except:
-                    pass
 
-        if cmds.attributeQuery(skin_pose_attr, node=ctr, exists=True):
-            skin_pose_data = cmds.getAttr(f'{ctr}.{skin_pose_attr}')
-            skin_pose_data = skin_pose_data.split('[')[-1].split(']')[0].split(',')
-            skin_pose_data = [float(x) for x in skin_pose_data]
+def set_labels(joint_list=None, force=False):
+    """
+    Set the joints label for mirror and transfer skin tools. All the labels are set in one MDGModifier in one undo
+    step and the joints that already have the right labels are skipped
 
-            cmds.xform(ctr, objectSpace=True, matrix=skin_pose_data)
+    Args:
+        joint_list (list, optional): joints to label, None == all the joints in the scene. Defaults to None.
+        force (bool, optional): label the joints even inside a joint_labels_scope. Defaults to False.
+
+    Returns:
+        int: number of joints with changed labels
+    """
+    if joint_labels_scope.is_enabled() and not force:
+        return 0
+
+    joint_list = cmds.ls(type='joint') if joint_list is None else joint_list
+    # MSelectionList merges repeated names, the joints have to be unique to keep the indices in sync
+    joint_list = list(dict.fromkeys(joint_list))
+
+    selection_list = OpenMaya.MSelectionList()
+    for jnt in joint_list:
+        selection_list.add(jnt)
+
+    modifier = OpenMaya.MDGModifier()
+    changed_count = 0
+    for index, jnt in enumerate(joint_list):
+        side, other_type = get_joint_label(jnt)
+        if len(jnt.split('_')) != 3:
+            logging.info('{} has an incorrect name, should be renamed with the following pattern:'
+                         ' descriptor_side_usage.'.format(jnt))
+
+        node_fn = OpenMaya.MFnDependencyNode(selection_list.getDependNode(index))
+        side_plug = node_fn.findPlug('side', False)
+        type_plug = node_fn.findPlug('type', False)
+        other_type_plug = node_fn.findPlug('otherType', False)
+
+        changed = False
+        if side is not None and side_plug.asInt() != side:
+            modifier.newPlugValueInt(side_plug, side)
+            changed = True
+        # 18 == Other, the label is taken from otherType
+        if type_plug.asInt() != 18:
+            modifier.newPlugValueInt(type_plug, 18)
+            changed = True
+        if other_type_plug.asString() != other_type:
+            modifier.newPlugValueString(other_type_plug, other_type)
+            changed = True
+        changed_count += changed
+
+    if changed_count:
+        with modifier_lib.undo_chunk('setLabels'):
+            modifier_lib.apply_modifier(modifier)
+    logging.info(f'labels has been set, {changed_count} of {len(joint_list)} joints changed.')
+
+    return changed_count
+
+
+def set_skin_pose(*args):
+    """
+    Set all controls in the scene to default and then apply the skin pose attribute if exists, the skin pose is in
+    objectSpace and does not take into account follows settings. The controls are read once into a cached
+    pose_lib.PoseTable and set with one modifier in one undo step
+    """
+    pose_lib.set_skin_pose()
 
 
 def format_skin_cluster_name(node,
@@ -111,7 +189,10 @@ def rename_skin_cluster(skin_cluster):
     skin_cluster_list = get_skin_cluster_list(node)
     skin_index = skin_cluster_list.index(skin_cluster) + 1
 
-    skin_cluster = cmds.rename(skin_cluster, format_skin_cluster_name(node, skin_index))
+    skin_cluster_name = format_skin_cluster_name(node, skin_index)
+    if skin_cluster != skin_cluster_name:
+        skin_cluster = cmds.rename(skin_cluster, skin_cluster_name)
+        deformer_lib.invalidate_deformer_history()
 
     return skin_cluster
 
@@ -125,99 +206,277 @@ def rename_all_skin_clusters():
         rename_skin_cluster(skin_cluster)
 
 
-def create_skin_cluster(node,
-                        joints,
-                        prebinds=None,
-                        skin_index=1):
+def get_depend_nodes(node_list):
     """
-    Create skinCluster by default
+    Get the MObjects of several nodes with one selection list
 
     Args:
-        node (str):, geometry, nurbs, curve, etc
-        joints (list): list of joints to bind
-        prebinds (list): list of prebinds. Defaults to None.
-        skin_index (int): index of the skin. Defaults to 1.
-    
+        node_list (list): node names
+
     Returns:
-        str: skinCluster
+        list: OpenMaya.MObject per node
     """
-    deformer_list = cmds.listHistory(node, pruneDagObjects=True)
+    selection_list = OpenMaya.MSelectionList()
+    for node in node_list:
+        selection_list.add(node)
 
-    if prebinds:
-        for prebind in prebinds:
-            if not cmds.objExists(prebind):
-                logging.error(f'{prebind} does not exists in the scene')
+    return [selection_list.getDependNode(i) for i in range(selection_list.length())]
 
-    if deformer_list:
-        node_shape = cmds.listRelatives(node, shapes=True, noIntermediate=True)[0]
 
-        output_geometry_connection = [x for x in cmds.listConnections(
-            f'{node_shape}', plugs=True) if 'outputGeometry' in x][0]
+def get_matrix_plug_value(plug):
+    """
+    Get the matrix value of a matrix plug
+
+    Args:
+        plug (OpenMaya.MPlug): matrix plug
 
+    Returns:
+        OpenMaya.MMatrix: matrix
+    """
+    return OpenMaya.MFnMatrixData(plug.asMObject()).matrix()
 
-        node_connection = cmds.listConnections(output_geometry_connection, plugs=True)[0]
-        last_deformer = output_geometry_connection.split('.')[0]
 
-        connection_index = output_geometry_connection.split('[')[-1].split(']')[0]
-        original_geometry_connection = cmds.listConnections('{}.originalGeometry[{}]'.format(last_deformer,
-                                                                                             connection_index),
-                                                                                             plugs=True)[0]
+def set_matrix_plug_value(modifier, plug, matrix):
+    """
+    Queue a matrix value in the modifier
 
-        node_dup = cmds.duplicate(node)[0]
+    Args:
+        modifier (OpenMaya.MDGModifier): modifier
+        plug (OpenMaya.MPlug): matrix plug
+        matrix (OpenMaya.MMatrix): matrix
+    """
+    modifier.newPlugValue(plug, OpenMaya.MFnMatrixData().create(matrix))
 
-        skin_cluster = cmds.skinCluster(joints,
-                                        node_dup,
-                                        toSelectedBones=True,
-                                        bindMethod=0,
-                                        removeUnusedInfluence=False,
-                                        includeHiddenSelections=True,
-                                        obeyMaxInfluences=False)[0]
 
-        # Connect new skin between last deform and node
-        cmds.connectAttr(original_geometry_connection,
-                            f'{skin_cluster}.originalGeometry[0]', force=True)
-        cmds.connectAttr(output_geometry_connection,
-                            f'{skin_cluster}.input[0].inputGeometry', force=True)
+def add_lock_influence_weights(joint_list):
+    """
+    Add the lockInfluenceWeights attribute to the joints missing it, the attribute skinCluster adds to its
+    influences, in one undoable modifier
 
-        cmds.connectAttr(f'{skin_cluster}.outputGeometry[0]', node_connection, force=True)
+    Args:
+        joint_list (list): joint names
 
-        cmds.delete(node_dup)
+    Returns:
+        list: joints where the attribute was added
+    """
+    modifier = OpenMaya.MDGModifier()
+    added_list = list()
+    for joint, joint_object in zip(joint_list, get_depend_nodes(joint_list)):
+        if OpenMaya.MFnDependencyNode(joint_object).hasAttribute('lockInfluenceWeights') or joint in added_list:
+            continue
+        attribute = OpenMaya.MFnNumericAttribute().create('lockInfluenceWeights', 'liw',
+                                                           OpenMaya.MFnNumericData.kBoolean, False)
+        modifier.addAttribute(joint_object, attribute)
+        added_list.append(joint)
 
-    else:
-        skin_cluster = cmds.skinCluster(joints, 
-                                        node,
-                                        toSelectedBones=True,
-                                        bindMethod=0,
-                                        removeUnusedInfluence=False,
-                                        includeHiddenSelections=True,
-                                        obeyMaxInfluences=False)[0]
-        
-    # Rename skinCluster
-    skin_cluster = cmds.rename(skin_cluster, format_skin_cluster_name(node, skin_index))
-    
-    if prebinds:
-        for index, prebind in enumerate(prebinds):
-            if prebind:
-                if '.' in prebind:
-                        descriptor, side = joints[index].split('_')[:2]
-                        inverse_matrix = cmds.createNode(
-                            'inverseMatrix',
-                            name='{}{}_{}_{}'.format(descriptor,
-                                                     usage_lib.get_usage_capitalize(usage_lib.prebind),
-                                                     side, usage_lib.inverse_matrix))
-                        cmds.connectAttr(prebind, f'{inverse_matrix}.inputMatrix')
-                        cmds.connectAttr(f'{inverse_matrix}.outputMatrix',
-                                        f'{skin_cluster}.bindPreMatrix[{index}]')
+    if added_list:
+        modifier_lib.apply_modifier(modifier)
+
+    return added_list
+
+
+def connect_skin_influences(modifier, skin_cluster, joint_list, index_list):
+    """
+    Queue the connections of the joints as skinCluster influences: worldMatrix to matrix, lockInfluenceWeights to
+    lockWeights, objectColorRGB to influenceColor, and the current worldInverseMatrix as bindPreMatrix.
+    The joints need the lockInfluenceWeights attribute, see add_lock_influence_weights
+
+    Args:
+        modifier (OpenMaya.MDGModifier): modifier
+        skin_cluster (str): name of the skinCluster
+        joint_list (list): joint names
+        index_list (list): influence index of each joint
+    """
+    skin_cluster_fn = OpenMaya.MFnDependencyNode(get_depend_nodes([skin_cluster])[0])
+    matrix_plug = skin_cluster_fn.findPlug('matrix', False)
+    lock_weights_plug = skin_cluster_fn.findPlug('lockWeights', False)
+    influence_color_plug = skin_cluster_fn.findPlug('influenceColor', False)
+    bind_pre_matrix_plug = skin_cluster_fn.findPlug('bindPreMatrix', False)
+
+    for joint_object, index in zip(get_depend_nodes(joint_list), index_list):
+        joint_fn = OpenMaya.MFnDependencyNode(joint_object)
+        modifier.connect(joint_fn.findPlug('worldMatrix', False).elementByLogicalIndex(0),
+                         matrix_plug.elementByLogicalIndex(index))
+        modifier.connect(joint_fn.findPlug('lockInfluenceWeights', False),
+                         lock_weights_plug.elementByLogicalIndex(index))
+        modifier.connect(joint_fn.findPlug('objectColorRGB', False),
+                         influence_color_plug.elementByLogicalIndex(index))
+        set_matrix_plug_value(modifier,
+                              bind_pre_matrix_plug.elementByLogicalIndex(index),
+                              get_matrix_plug_value(joint_fn.findPlug('worldInverseMatrix',
+                                                                      False).elementByLogicalIndex(0)))
+
+
+def connect_skin_prebinds(modifier, skin_cluster, joint_list, index_list, prebind_list, inverse_matrix_dict):
+    """
+    Queue the prebind connections of the skinCluster influences. Prebind nodes drive the bindPreMatrix with their
+    worldInverseMatrix, prebind plugs (node.attribute) through an inverseMatrix node. The inverseMatrix nodes are
+    shared, each prebind plug gets one, reusing the one already connected to it
+
+    Args:
+        modifier (OpenMaya.MDGModifier): modifier
+        skin_cluster (str): name of the skinCluster
+        joint_list (list): joint names
+        index_list (list): influence index of each joint
+        prebind_list (list): prebind node or node.attribute of each joint, None == no prebind
+        inverse_matrix_dict (dict): {prebind plug: inverseMatrix MObject}, shared between calls and filled
+                                    with the inverseMatrix nodes created
+    """
+    bind_pre_matrix_plug = OpenMaya.MFnDependencyNode(
+        get_depend_nodes([skin_cluster])[0]).findPlug('bindPreMatrix', False)
+
+    for joint, index, prebind in zip(joint_list, index_list, prebind_list):
+        if not prebind:
+            continue
+
+        if '.' in prebind:
+            if prebind not in inverse_matrix_dict:
+                connection_list = cmds.listConnections(prebind, source=False, destination=True,
+                                                       type='inverseMatrix') or list()
+                if connection_list:
+                    inverse_matrix_dict[prebind] = get_depend_nodes(connection_list[:1])[0]
                 else:
-                    cmds.connectAttr(f'{prebind}.worldInverseMatrix',
-                                    f'{skin_cluster}.bindPreMatrix[{index}]')
+                    descriptor, side = joint.split('_')[:2]
+                    inverse_matrix = modifier.createNode('inverseMatrix')
+                    modifier.renameNode(inverse_matrix, '{}{}_{}_{}'.format(
+                        descriptor, usage_lib.get_usage_capitalize(usage_lib.prebind), side,
+                        usage_lib.inverse_matrix))
+                    selection_list = OpenMaya.MSelectionList()
+                    selection_list.add(prebind)
+                    modifier.connect(selection_list.getPlug(0),
+                                     OpenMaya.MFnDependencyNode(inverse_matrix).findPlug('inputMatrix', False))
+                    inverse_matrix_dict[prebind] = inverse_matrix
+            source_plug = OpenMaya.MFnDependencyNode(inverse_matrix_dict[prebind]).findPlug('outputMatrix', False)
+        else:
+            source_plug = OpenMaya.MFnDependencyNode(get_depend_nodes([prebind])[0]).findPlug(
+                'worldInverseMatrix', False).elementByLogicalIndex(0)
 
-    return skin_cluster
+        modifier.connect(source_plug, bind_pre_matrix_plug.elementByLogicalIndex(index))
+
+
+def set_closest_joint_weights(skin_cluster, joint_list):
+    """
+    Weight each point of the skinCluster fully to the joint of the closest bone, like skinCluster -bindMethod 0
+    -toSelectedBones. Each joint owns the bones to its child joints of the joint_list, the joints without one are a
+    point at their pivot. Used for the skinClusters inserted on skinned nodes, so they start from the same weights as
+    the skinClusters created with bindMethod 0
+
+    Args:
+        skin_cluster (str): name of the skinCluster
+        joint_list (list): joint names, in influence order
+    """
+    points = get_skin_cluster_points(skin_cluster)
+    joint_points = np.array([cmds.xform(x, query=True, translation=True, worldSpace=True) for x in joint_list],
+                            dtype=np.float64).reshape(-1, 3)
+    joint_index_dict = {cmds.ls(x, long=True)[0]: i for i, x in enumerate(joint_list)}
+    bone_list = list()
+    for joint, joint_index in joint_index_dict.items():
+        children = cmds.listRelatives(joint, children=True, type='joint', fullPath=True) or list()
+        child_indices = [joint_index_dict[x] for x in children if x in joint_index_dict]
+        bone_list.extend([(joint_index, x) for x in child_indices or [joint_index]])
+    bones = np.array(bone_list, dtype=np.int64).reshape(-1, 2)
+    _, bone_indices = spatial_lib.get_closest_segments(points, joint_points[bones[:, 0]], joint_points[bones[:, 1]])
+
+    set_skin_weights(skin_cluster, skin_weights_lib.SkinWeights.from_coo(rows=np.arange(len(points)),
+                                                                         columns=bones[bone_indices, 0],
+                                                                         values=np.ones(len(points)),
+                                                                         point_count=len(points),
+                                                                         influences=get_skin_cluster_influences(
+                                                                             skin_cluster)))
+
+
+def create_skin_clusters(spec_list):
+    """
+    Create several skinClusters. The deformer stacks are resolved once, the nodes without skinCluster are bound with
+    skinCluster and the nodes with one get the new skinCluster inserted at the end of their deformer chain, so the
+    geometry is never duplicated. The inserted ones are weighted like bindMethod 0, see set_closest_joint_weights.
+    The prebind plugs shared by several influences get one inverseMatrix node and all the prebinds are connected in
+    one modifier
+
+    Args:
+        spec_list (list): [(node, joints), (node, joints, prebinds), (node, joints, prebinds, skin_index), ...],
+                          prebinds and skin_index default to None and 1
+
+    Returns:
+        list: skinClusters, in the spec_list order
+    """
+    spec_list = [tuple(spec) + (None, 1)[len(spec) - 2:] for spec in spec_list]
+
+    prebind_node_list = list({x.split('.')[0] for spec in spec_list if spec[2] for x in spec[2] if x})
+    for prebind in set(prebind_node_list) - set(cmds.ls(prebind_node_list)):
+        logging.error(f'{prebind} does not exists in the scene')
+
+    with deformer_lib.deformer_history_cache:
+        skinned_list = [bool(get_skin_cluster_list(node)) for node, joints, prebinds, skin_index in spec_list]
+
+    # The skinClusters are created inside the undo chunk, so one undo removes them with their connections
+    with modifier_lib.undo_chunk('createSkinClusters'):
+        skin_cluster_list = list()
+        for (node, joints, prebinds, skin_index), skinned in zip(spec_list, skinned_list):
+            skin_cluster_name = format_skin_cluster_name(node, skin_index)
+            if skinned:
+                skin_cluster = cmds.deformer(node, type='skinCluster', name=skin_cluster_name)[0]
+            else:
+                skin_cluster = cmds.skinCluster(joints,
+                                                node,
+                                                name=skin_cluster_name,
+                                                toSelectedBones=True,
+                                                bindMethod=0,
+                                                removeUnusedInfluence=False,
+                                                includeHiddenSelections=True,
+                                                obeyMaxInfluences=False)[0]
+            skin_cluster_list.append(skin_cluster)
+        deformer_lib.invalidate_deformer_history()
+
+        # The inserted skinClusters get their influences like skinCluster does
+        layered_list = [(skin_cluster, spec) for skin_cluster, spec, skinned in
+                        zip(skin_cluster_list, spec_list, skinned_list) if skinned]
+        if layered_list:
+            add_lock_influence_weights([x for skin_cluster, spec in layered_list for x in spec[1]])
+
+        modifier = OpenMaya.MDGModifier()
+        for skin_cluster, (node, joints, prebinds, skin_index) in layered_list:
+            connect_skin_influences(modifier, skin_cluster, joints, range(len(joints)))
+            geom_matrix_plug = OpenMaya.MFnDependencyNode(get_depend_nodes([skin_cluster])[0]).findPlug(
+                'geomMatrix', False)
+            set_matrix_plug_value(modifier, geom_matrix_plug,
+                                  OpenMaya.MSelectionList().add(node).getDagPath(0).inclusiveMatrix())
+
+        inverse_matrix_dict = dict()
+        for skin_cluster, (node, joints, prebinds, skin_index) in zip(skin_cluster_list, spec_list):
+            if prebinds:
+                connect_skin_prebinds(modifier, skin_cluster, joints, range(len(joints)), prebinds,
+                                      inverse_matrix_dict)
+        modifier_lib.apply_modifier(modifier)
+
+        for skin_cluster, (node, joints, prebinds, skin_index) in layered_list:
+            set_closest_joint_weights(skin_cluster, joints)
+
+    return skin_cluster_list
+
+
+def create_skin_cluster(node,
+                        joints,
+                        prebinds=None,
+                        skin_index=1):
+    """
+    Create skinCluster by default, see create_skin_clusters
+
+    Args:
+        node (str):, geometry, nurbs, curve, etc
+        joints (list): list of joints to bind
+        prebinds (list): list of prebinds. Defaults to None.
+        skin_index (int): index of the skin. Defaults to 1.
+    
+    Returns:
+        str: skinCluster
+    """
+    return create_skin_clusters([(node, joints, prebinds, skin_index)])[0]
 
 
 def get_skin_cluster_list(node):
     """
-    Find skinClusters attached to the node
+    Find skinClusters attached to the node, cached inside a deformer_lib.deformer_history_cache scope
 
     Args:
         node (str): node's name
@@ -225,15 +484,7 @@ def get_skin_cluster_list(node):
     Returns:
         list: skinClusters list
     """
-    skin_cluster_list = list()
-    inputs_list = cmds.listHistory(node, interestLevel=1, pruneDagObjects=True)
-    if inputs_list:
-        for item in inputs_list:
-            if cmds.objectType(item) == 'skinCluster':
-                skin_cluster_list.append(item)
-        skin_cluster_list = skin_cluster_list[::-1]
-
-    return skin_cluster_list
+    return deformer_lib.get_deformer_list(node, 'skinCluster')[::-1]
 
 
 def get_skin_cluster_index(node, index=1):
@@ -249,8 +500,9 @@ def get_skin_cluster_index(node, index=1):
     """
     if index >= 1:
         index = index - 1
-    if len(get_skin_cluster_list(node)) - 1 >= index:
-        return get_skin_cluster_list(node)[index]
+    skin_cluster_list = get_skin_cluster_list(node)
+    if len(skin_cluster_list) - 1 >= index:
+        return skin_cluster_list[index]
     else:
         return None
 
@@ -286,8 +538,8 @@ def transfer_skin(source, target, source_skin_index=1, target_skin_index=1, surf
     else:
         target_skin_cluster = create_skin_cluster(joints=source_skin_joints, node=target, skin_index=target_skin_index)
 
-    # Transfer skinCluster
-    set_labels()
+    # Transfer skinCluster, only the influences need labels
+    set_labels(joint_list=cmds.skinCluster(target_skin_cluster, query=True, influence=True))
     cmds.copySkinWeights(sourceSkin=source_skin_cluster, destinationSkin=target_skin_cluster,
                          surfaceAssociation=surface_association,
                          noMirror=True,
@@ -295,61 +547,608 @@ def transfer_skin(source, target, source_skin_index=1, target_skin_index=1, surf
                          normalize=True)
 
 
+class SkinTransferPlan(object):
+    """
+    Skin transfer from one source skinCluster to many targets. The source weights, points and spatial index are
+    read once and every target samples them by proximity, vectorized over all its points
+
+    Args:
+        source (str): source node
+        source_skin_index (int): -1 (last), 1, 2, 3. Defaults to 1.
+        surface_association (str): 'closestPoint' (closest point on the triangles, closest vertex on non meshes),
+                                   'closestComponent' (closest vertex) or 'inverseDistance' (closest vertices
+                                   weighted by distance). Defaults to 'closestPoint'.
+        influence_map (dict, optional): {source influence: target influence}, the influences not in the map keep
+                                        their name. Defaults to None.
+        neighbour_count (int): closest vertices used by inverseDistance. Defaults to 4.
+    """
+    surface_associations = ['closestPoint', 'closestComponent', 'inverseDistance']
+
+    def __init__(self, source, source_skin_index=1, surface_association='closestPoint', influence_map=None,
+                 neighbour_count=4):
+        """
+        Initializes an instance of SkinTransferPlan
+
+        Args:
+            source (str): source node
+            source_skin_index (int): -1 (last), 1, 2, 3. Defaults to 1.
+            surface_association (str): 'closestPoint', 'closestComponent' or 'inverseDistance'.
+                                       Defaults to 'closestPoint'.
+            influence_map (dict, optional): {source influence: target influence}. Defaults to None.
+            neighbour_count (int): closest vertices used by inverseDistance. Defaults to 4.
+        """
+        if surface_association not in self.surface_associations:
+            cmds.error(f'{surface_association} is not a valid surface association, {self.surface_associations}')
+
+        self.source = source
+        self.surface_association = surface_association
+        self.neighbour_count = neighbour_count
+
+        self.source_skin_cluster = get_skin_cluster_index(node=source, index=source_skin_index)
+        if not self.source_skin_cluster:
+            cmds.error(f'{source} skinCluster index {source_skin_index} does not exists')
+
+        # Source snapshot, with the influences already renamed to the target names
+        self.skin_weights = get_skin_weights(self.source_skin_cluster)
+        influence_map = influence_map if influence_map else dict()
+        self.influences = [influence_map.get(x, x) for x in self.skin_weights.influences]
+        if len(set(self.influences)) != len(self.influences):
+            cmds.error(f'the influence map gives repeated target influences: {self.influences}')
+        self.skin_weights.influences = self.influences
+
+        self.spatial_index = spatial_lib.SpatialIndex(points=self.skin_weights.points,
+                                                      triangles=self.skin_weights.triangles)
+
+
+    def sample(self, points):
+        """
+        Sample the source weights at the points given, it does not touch the scene so it can run in a thread
+
+        Args:
+            points (np.ndarray): (point_count, 3) world positions
+
+        Returns:
+            skin_weights_lib.SkinWeights: weights of the points
+        """
+        if self.surface_association == 'closestPoint' and self.skin_weights.triangles is not None:
+            point_indices, coefficients = self.spatial_index.get_barycentric_weights(points)
+        elif self.surface_association == 'inverseDistance':
+            point_indices, coefficients = self.spatial_index.get_inverse_distance_weights(points,
+                                                                                          k=self.neighbour_count)
+        else:
+            point_indices, coefficients = self.spatial_index.get_nearest_weights(points)
+
+        return self.skin_weights.interpolate(point_indices=point_indices, coefficients=coefficients, points=points)
+
+
+    def prepare_target(self, target, target_skin_index=1):
+        """
+        Get or create the target skinCluster with all the source influences
+
+        Args:
+            target (str): target node
+            target_skin_index (int): -1 (last), 1, 2, 3. Defaults to 1.
+
+        Returns:
+            str: target skinCluster
+        """
+        target_skin_cluster = get_skin_cluster_index(node=target, index=target_skin_index)
+
+        # If skinCluster exists get its joints and add the joints that are not in the skinCluster
+        if target_skin_cluster:
+            skin_cluster_joints = cmds.skinCluster(target_skin_cluster, query=True, influence=True)
+            joints_to_add = [x for x in self.influences if x not in skin_cluster_joints]
+            if joints_to_add:
+                cmds.skinCluster(target_skin_cluster, edit=True, addInfluence=joints_to_add, lockWeights=True)
+
+        # If skinCluster does not exist create it
+        else:
+            target_skin_cluster = create_skin_cluster(joints=self.influences, node=target,
+                                                      skin_index=target_skin_index)
+
+        return target_skin_cluster
+
+
+    def apply(self, target, target_skin_index=1):
+        """
+        Transfer the source weights to one target
+
+        Args:
+            target (str): target node
+            target_skin_index (int): -1 (last), 1, 2, 3. Defaults to 1.
+
+        Returns:
+            str: target skinCluster
+        """
+        return self.apply_batch(target_list=[target], target_skin_index=target_skin_index)[0]
+
+
+    def apply_batch(self, target_list, target_skin_index=1, max_workers=None):
+        """
+        Transfer the source weights to many targets. The skinClusters and points are read in the main thread, the
+        sampling runs in a thread pool when max_workers is given and the weights are set in bulk
+
+        Args:
+            target_list (list): target nodes
+            target_skin_index (int): -1 (last), 1, 2, 3. Defaults to 1.
+            max_workers (int, optional): sampling threads, None == sample in the main thread. Defaults to None.
+
+        Returns:
+            list: target skinClusters
+        """
+        with modifier_lib.undo_chunk('transferSkin'):
+            with deformer_lib.deformer_history_cache:
+                skin_cluster_list = [self.prepare_target(target=x, target_skin_index=target_skin_index)
+                                     for x in target_list]
+            points_list = [get_skin_cluster_points(x) for x in skin_cluster_list]
+
+            if max_workers:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    skin_weights_list = list(executor.map(self.sample, points_list))
+            else:
+                skin_weights_list = [self.sample(x) for x in points_list]
+
+            for skin_cluster, skin_weights in zip(skin_cluster_list, skin_weights_list):
+                set_skin_weights(skin_cluster=skin_cluster, skin_weights=skin_weights, normalize=True)
+
+        logging.info(f'{self.source_skin_cluster} transferred to {len(skin_cluster_list)} nodes.')
+
+        return skin_cluster_list
+
+
+def transfer_skin_to_targets(source, target_list, source_skin_index=1, target_skin_index=1,
+                             surface_association='closestPoint', max_workers=None):
+    """
+    Transfer skin from one object to many, the source is read once with a SkinTransferPlan
+
+    Args:
+        source (str): source node
+        target_list (list): target nodes
+        source_skin_index (int):. -1 (last), 1, 2, 3. Defaults to 1.
+        target_skin_index (int):. -1 (last), 1, 2, 3. Defaults to 1.
+        surface_association (str): closestPoint, closestComponent or inverseDistance. Defaults to 'closestPoint'.
+        max_workers (int, optional): sampling threads, None == sample in the main thread. Defaults to None.
+
+    Returns:
+        list: target skinClusters
+    """
+    transfer_plan = SkinTransferPlan(source=source, source_skin_index=source_skin_index,
+                                     surface_association=surface_association)
+
+    return transfer_plan.apply_batch(target_list=target_list, target_skin_index=target_skin_index,
+                                     max_workers=max_workers)
+
+
+def get_free_influence_indices(skin_cluster, count):
+    """
+    Get the lowest free logical indices of the skinCluster matrix array, the array can be sparse after removing
+    influences
+
+    Args:
+        skin_cluster (str): name of the skinCluster
+        count (int): number of indices
+
+    Returns:
+        list: free logical indices
+    """
+    matrix_plug = OpenMaya.MFnDependencyNode(get_depend_nodes([skin_cluster])[0]).findPlug('matrix', False)
+    used_indices = set(matrix_plug.getExistingArrayAttributeIndices())
+
+    free_indices = list()
+    index = 0
+    while len(free_indices) < count:
+        if index not in used_indices:
+            free_indices.append(index)
+        index += 1
+
+    return free_indices
+
+
+def add_joints_to_skin_cluster(joint_list, skin_cluster_name, prebind_list=None):
+    """
+    Add several joints to an existing skinCluster. The free indices are found in one query, the joints missing the
+    lockInfluenceWeights attribute get it directly and the matrix, lock, color and bindPreMatrix plugs of all the
+    joints are connected in one modifier. The joints already in the skinCluster are skipped
+
+    Args:
+        joint_list (list): names of the joints to include
+        skin_cluster_name (str): name of the skinCluster
+        prebind_list (list, optional): prebind node or node.attribute of each joint, None == no prebind.
+                                       Defaults to None.
+
+    Returns:
+        list: influence index of each joint added
+    """
+    prebind_list = prebind_list if prebind_list else [None] * len(joint_list)
+
+    # Checks
+    if not cmds.objExists(skin_cluster_name):
+        cmds.error(f'{skin_cluster_name} does not exists in the scene')
+    node_list = joint_list + [x.split('.')[0] for x in prebind_list if x]
+    existing_list = cmds.ls(node_list)
+    missing_list = [x for x in node_list if x not in existing_list]
+    if missing_list:
+        cmds.error(f'{missing_list} do not exist in the scene')
+
+    influence_list = cmds.ls(get_skin_cluster_influences(skin_cluster_name), long=True)
+    pair_list = [(joint, prebind) for joint, prebind in zip(joint_list, prebind_list)
+                 if cmds.ls(joint, long=True)[0] not in influence_list]
+    if not pair_list:
+        return list()
+    joint_list, prebind_list = [list(x) for x in zip(*pair_list)]
+
+    index_list = get_free_influence_indices(skin_cluster_name, len(joint_list))
+
+    with modifier_lib.undo_chunk('addJointsToSkinCluster'):
+        add_lock_influence_weights(joint_list)
+
+        modifier = OpenMaya.MDGModifier()
+        connect_skin_influences(modifier, skin_cluster_name, joint_list, index_list)
+        connect_skin_prebinds(modifier, skin_cluster_name, joint_list, index_list, prebind_list, dict())
+        modifier_lib.apply_modifier(modifier)
+
+    return index_list
+
+
 def add_joint_to_skin_cluster(joint_name, skin_cluster_name, prebind_name=None):
     """
-    Add a joint to an existing skinCluster
+    Add a joint to an existing skinCluster, see add_joints_to_skin_cluster
 
     Args:
         prebind_name (str):name of the prebind node or node.attribute
         joint_name (str): name of the joint to include
         skin_cluster_name (str): name of the skinCluster
     """
-    # Checks
-    if not cmds.objExists(joint_name):
-        logging.error(f'{joint_name} does not exists in the scene')
-    if not cmds.objExists(skin_cluster_name):
-        logging.error(f'{skin_cluster_name} does not exists in the scene')
-    if prebind_name:
-        if not cmds.objExists(prebind_name):
-            logging.error(f'{prebind_name} does not exists in the scene')
-
-    # Create a tmp skin to create some attributes in the joint
-    cube_temp = cmds.polyCube()[0]
-    cmds.skinCluster(joint_name,
-                     cube_temp,
-                     toSelectedBones=True,
-                     bindMethod=0,
-                     removeUnusedInfluence=False,
-                     includeHiddenSelections=True,
-                     obeyMaxInfluences=False)[0]
-    cmds.delete(cube_temp)
-    
-    # Get next joint skin index for the skinCluster connections
-    joint_index = str(len(cmds.listConnections(f'{skin_cluster_name}.matrix')))
-
-    # Create connections
-    cmds.connectAttr(f'{joint_name}.worldMatrix[0]',
-                     f'{skin_cluster_name}.matrix[{joint_index}]')
-    cmds.connectAttr(f'{joint_name}.lockInfluenceWeights',
-                     f'{skin_cluster_name}.lockWeights[{joint_index}]')
-    cmds.connectAttr(f'{joint_name}.objectColorRGB',
-                     f'{skin_cluster_name}.influenceColor[{joint_index}]')
-
-    # If prebind exists then connect it, else set to its default value
-    if prebind_name:
-        if '.' in prebind_name:
-            descriptor, side = joint_name.split('_')[:2]
-            inverse_matrix = cmds.createNode(
-                'inverseMatrix', 
-                name='{}{}_{}_{}'.format(descriptor, usage_lib.get_usage_capitalize(usage_lib.prebind),
-                                         side, usage_lib.inverse_matrix))
-            cmds.connectAttr(prebind_name, f'{inverse_matrix}.inputMatrix')
-            cmds.connectAttr(f'{inverse_matrix}.outputMatrix', 
-                             f'{skin_cluster_name}.bindPreMatrix[{joint_index}]')
-        else:
-            cmds.connectAttr(f'{prebind_name}.worldInverseMatrix',
-                            f'{skin_cluster_name}.bindPreMatrix[{joint_index}]')
+    add_joints_to_skin_cluster([joint_name], skin_cluster_name, prebind_list=[prebind_name])
+
+
+def get_component_type(node):
+    """
+    Get the component type used by the skinCluster for the node given
+
+    Args:
+        node (str): transform or shape name
+
+    Returns:
+        str: 'vtx', 'cv' or 'pt'
+    """
+    if cmds.objectType(node, isType='transform'):
+        node = cmds.listRelatives(node, shapes=True)[0]
+    node_type = cmds.nodeType(node)
+
+    if 'nurbs' in node_type:
+        return 'cv'
+    elif 'lattice' in node_type:
+        return 'pt'
+    else:
+        return 'vtx'
+
+
+def get_skin_cluster_function_set(skin_cluster):
+    """
+    Get the MFnSkinCluster of the skinCluster given
+
+    Args:
+        skin_cluster (str): name of the skinCluster
+
+    Returns:
+        OpenMayaAnim.MFnSkinCluster: skinCluster function set
+    """
+    selection_list = OpenMaya.MSelectionList()
+    selection_list.add(skin_cluster)
+
+    return OpenMayaAnim.MFnSkinCluster(selection_list.getDependNode(0))
+
+
+def get_skin_cluster_components(skin_cluster):
+    """
+    Get the dag path and all the components of the shape deformed by the skinCluster
+
+    Args:
+        skin_cluster (str): name of the skinCluster
+
+    Returns:
+        tuple: (OpenMaya.MDagPath, OpenMaya.MObject)
+    """
+    node_shape = cmds.skinCluster(skin_cluster, query=True, geometry=True)[0]
+
+    selection_list = OpenMaya.MSelectionList()
+    selection_list.add(f'{node_shape}.{get_component_type(node_shape)}[*]')
+
+    return selection_list.getComponent(0)
+
+
+def get_skin_cluster_influences(skin_cluster):
+    """
+    Get the skinCluster influences in the order used by MFnSkinCluster (physical index)
+
+    Args:
+        skin_cluster (str): name of the skinCluster
+
+    Returns:
+        list: influence names
+    """
+    skin_cluster_fn = get_skin_cluster_function_set(skin_cluster)
+
+    return [x.partialPathName() for x in skin_cluster_fn.influenceObjects()]
+
+
+def get_skin_weights(skin_cluster):
+    """
+    Get all the skinCluster weights in one MFnSkinCluster.getWeights call
+
+    Args:
+        skin_cluster (str): name of the skinCluster
+
+    Returns:
+        skin_weights_lib.SkinWeights: sparse weights, including the world space positions of the points and the
+                                      triangles of meshes
+    """
+    skin_cluster_fn = get_skin_cluster_function_set(skin_cluster)
+    dag_path, components = get_skin_cluster_components(skin_cluster)
+
+    weights, influence_count = skin_cluster_fn.getWeights(dag_path, components)
+    influences = [x.partialPathName() for x in skin_cluster_fn.influenceObjects()]
+
+    weights = np.array(weights, dtype=np.float64).reshape(-1, influence_count)
+
+    return skin_weights_lib.SkinWeights.from_dense(weights=weights,
+                                                   influences=influences,
+                                                   shape=dag_path.partialPathName(),
+                                                   deformer=skin_cluster,
+                                                   points=get_skin_cluster_points(skin_cluster),
+                                                   triangles=get_skin_cluster_triangles(skin_cluster))
+
+
+def get_skin_cluster_points(skin_cluster):
+    """
+    Get the world space positions of the skinCluster geometry points
+
+    Args:
+        skin_cluster (str): name of the skinCluster
+
+    Returns:
+        np.ndarray: (point_count, 3) positions
+    """
+    dag_path, components = get_skin_cluster_components(skin_cluster)
+    positions = OpenMaya.MItGeometry(dag_path).allPositions(OpenMaya.MSpace.kWorld)
+
+    return np.array([(x.x, x.y, x.z) for x in positions], dtype=np.float64).reshape(-1, 3)
+
+
+def get_skin_cluster_triangles(skin_cluster):
+    """
+    Get the triangles of the skinCluster mesh
+
+    Args:
+        skin_cluster (str): name of the skinCluster
+
+    Returns:
+        np.ndarray: (triangle_count, 3) vertex indices, None if the geometry is not a mesh
+    """
+    dag_path, components = get_skin_cluster_components(skin_cluster)
+    if not dag_path.hasFn(OpenMaya.MFn.kMesh):
+        return None
+
+    triangle_counts, triangle_vertices = OpenMaya.MFnMesh(dag_path).getTriangles()
+
+    return np.array(triangle_vertices, dtype=np.int32).reshape(-1, 3)
+
+
+class SkinWeightsModifier(object):
+    """
+    Modifier of the weights of a skinCluster, for modifier_lib.apply_modifier. doIt sets the weights with
+    MFnSkinCluster.setWeights and keeps the old weights, so the applyModifier command can undo and redo it
+
+    Args:
+        skin_cluster_fn (OpenMayaAnim.MFnSkinCluster): skinCluster function set
+        dag_path (OpenMaya.MDagPath): deformed shape
+        components (OpenMaya.MObject): deformed components
+        influence_indices (OpenMaya.MIntArray): influences set
+        values (OpenMaya.MDoubleArray): weights, point major
+    """
+    def __init__(self, skin_cluster_fn, dag_path, components, influence_indices, values):
+        """
+        Initializes an instance of SkinWeightsModifier
+
+        Args:
+            skin_cluster_fn (OpenMayaAnim.MFnSkinCluster): skinCluster function set
+            dag_path (OpenMaya.MDagPath): deformed shape
+            components (OpenMaya.MObject): deformed components
+            influence_indices (OpenMaya.MIntArray): influences set
+            values (OpenMaya.MDoubleArray): weights, point major
+        """
+        self.skin_cluster_fn = skin_cluster_fn
+        self.dag_path = dag_path
+        self.components = components
+        self.influence_indices = influence_indices
+        self.values = values
+        self.old_values = None
+
+
+    def doIt(self):
+        """
+        Set the weights, the old weights are kept the first time
+        """
+        old_values = self.skin_cluster_fn.setWeights(self.dag_path, self.components, self.influence_indices,
+                                                     self.values, False, True)
+        if self.old_values is None:
+            self.old_values = old_values
+
+
+    def undoIt(self):
+        """
+        Set the old weights back
+        """
+        self.skin_cluster_fn.setWeights(self.dag_path, self.components, self.influence_indices, self.old_values,
+                                        False, False)
+
+
+def set_skin_weights(skin_cluster, skin_weights, normalize=False):
+    """
+    Set the skinCluster weights in one MFnSkinCluster.setWeights call, undoable with the applyModifier plug-in.
+    Only the influences with weights in the skinCluster or in the weights given are set, the influences that are
+    not in the weights given are set to 0
+
+    Args:
+        skin_cluster (str): name of the skinCluster
+        skin_weights (skin_weights_lib.SkinWeights): sparse weights
+        normalize (bool, optional): normalize each point weights before setting them. Defaults to False.
+    """
+    skin_cluster_fn = get_skin_cluster_function_set(skin_cluster)
+    dag_path, components = get_skin_cluster_components(skin_cluster)
+
+    influence_paths = skin_cluster_fn.influenceObjects()
+    influences = [x.partialPathName() for x in influence_paths]
+    influences_not_in_skin = [x for x in skin_weights.influences if x not in influences]
+    if influences_not_in_skin:
+        cmds.error(f'missing in {skin_cluster}: {influences_not_in_skin}')
+
+    point_count = OpenMaya.MItGeometry(dag_path).count()
+    if point_count != skin_weights.get_point_count():
+        cmds.error(f'{skin_cluster} has {point_count} points and the weights have '
+                   f'{skin_weights.get_point_count()}, check the topology')
+
+    skin_weights = skin_weights.reorder_influences(influences)
+    if normalize:
+        skin_weights = skin_weights.normalize()
+
+    # The influences with weights now or in the new weights, the rest stay at 0
+    used_indices = [index for index, influence_path in enumerate(influence_paths)
+                    if len(skin_cluster_fn.getPointsAffectedByInfluence(influence_path)[1])]
+    columns = np.union1d(np.unique(skin_weights.indices), used_indices).astype(np.int64)
+    column_positions = np.full(len(influences), -1, dtype=np.int64)
+    column_positions[columns] = np.arange(len(columns))
+
+    weights = np.zeros((point_count, len(columns)), dtype=np.float64)
+    weights[skin_weights.get_rows(), column_positions[skin_weights.indices]] = skin_weights.values
+
+    modifier = SkinWeightsModifier(skin_cluster_fn=skin_cluster_fn,
+                                   dag_path=dag_path,
+                                   components=components,
+                                   influence_indices=OpenMaya.MIntArray(columns.tolist()),
+                                   values=OpenMaya.MDoubleArray(weights.ravel()))
+    modifier_lib.apply_modifier(modifier)
+
+
+def get_skin_cluster_adjacency(skin_cluster):
+    """
+    Get the vertex neighbours of the skinCluster mesh from its polygon edges
+
+    Args:
+        skin_cluster (str): name of the skinCluster
+
+    Returns:
+        tuple: (indptr, indices) CSR vertex neighbours
+    """
+    dag_path, components = get_skin_cluster_components(skin_cluster)
+    if not dag_path.hasFn(OpenMaya.MFn.kMesh):
+        cmds.error(f'{skin_cluster} does not deform a mesh')
+
+    mesh_fn = OpenMaya.MFnMesh(dag_path)
+    polygon_counts, polygon_vertices = mesh_fn.getVertices()
+
+    return skin_weights_lib.get_edge_adjacency(edges=skin_weights_lib.get_polygon_edges(polygon_counts,
+                                                                                       polygon_vertices),
+                                               point_count=mesh_fn.numVertices)
+
+
+def smooth_skin_weights(skin_cluster, iterations=10, strength=0.5, point_indices=None, locked_influences=None):
+    """
+    Smooth the skinCluster weights with Laplacian iterations in NumPy and set them back in one bulk call
+
+    Args:
+        skin_cluster (str): name of the skinCluster
+        iterations (int): smoothing iterations. Defaults to 10.
+        strength (float): 0 == no change, 1 == neighbours average. Defaults to 0.5.
+        point_indices (list, optional): vertices to smooth, None == all. Defaults to None.
+        locked_influences (list, optional): influences that keep their weights, None == the influences with
+                                            lockInfluenceWeights on. Defaults to None.
+    """
+    skin_weights = get_skin_weights(skin_cluster)
+
+    if locked_influences is None:
+        locked_influences = [x for x in skin_weights.influences
+                             if cmds.attributeQuery('lockInfluenceWeights', node=x, exists=True)
+                             and cmds.getAttr(f'{x}.lockInfluenceWeights')]
+
+    skin_weights = skin_weights.smooth(adjacency=get_skin_cluster_adjacency(skin_cluster),
+                                       iterations=iterations,
+                                       strength=strength,
+                                       locked_influences=locked_influences,
+                                       point_mask=point_indices)
+
+    set_skin_weights(skin_cluster=skin_cluster, skin_weights=skin_weights)
+    logging.info(f'{skin_cluster} weights smoothed.')
+
+
+def get_mirror_influence_map(influence_list):
+    """
+    Get the opposite side influence of each influence, from the descriptor_side_usage names
+
+    Args:
+        influence_list (list): influence names
+
+    Returns:
+        dict: {influence: opposite influence}, center and unnamed influences are not in the dictionary
+    """
+    influence_map = dict()
+    for influence in influence_list:
+        if len(influence.split('_')) == 3:
+            desc, side, usage = influence.split('_')
+            opposite_side = side_lib.get_opposite_side(side)
+            if side in side_lib.valid_sides and opposite_side != side:
+                influence_map[influence] = f'{desc}_{opposite_side}_{usage}'
+
+    return influence_map
+
+
+def mirror_skin_weights(node, skin_index=1, direction='positive', axis='x', method='positional', seed_edge=None,
+                        cache_path=None, tolerance=1e-4):
+    """
+    Mirror the skinCluster weights from one side of the mesh to the other. The vertex symmetry map is cached by
+    topology, so mirroring again is a permutation of the weights plus an influence side swap
+
+    Args:
+        node (str): mesh with a skinCluster
+        skin_index (int): -1 (last), 1, 2, 3. Defaults to 1.
+        direction (str): 'positive' (+axis to -axis) or 'negative' (-axis to +axis). Defaults to 'positive'.
+        axis (str): mirror axis, 'x', 'y' or 'z'. Defaults to 'x'.
+        method (str): symmetry map method, 'positional' or 'topological'. Defaults to 'positional'.
+        seed_edge (int, optional): edge on the symmetry plane for the topological method. Defaults to None.
+        cache_path (str, optional): symmetry map cache folder, None == next to the scene. Defaults to None.
+        tolerance (float): vertices closer than this to the symmetry plane are not mirrored. Defaults to 1e-4.
+    """
+    skin_cluster = get_skin_cluster_index(node=node, index=skin_index)
+    if not skin_cluster:
+        cmds.error(f'{node} skinCluster index {skin_index} does not exists')
+
+    symmetry_map = mesh_lib.get_mesh_symmetry_map(node=node, method=method, axis=axis, seed_edge=seed_edge,
+                                                  cache_path=cache_path)
+
+    # Vertices on the destination side, in object space like the symmetry map
+    axis_values = mesh_lib.get_mesh_points(node)[:, ['x', 'y', 'z'].index(axis)]
+    if direction == 'positive':
+        point_indices = np.flatnonzero(axis_values < -tolerance)
     else:
-        cmds.setAttr(f'{skin_cluster_name}.bindPreMatrix[{joint_index}]',
-                     cmds.getAttr(f'{joint_name}.worldInverseMatrix'),
-                     type='matrix')
+        point_indices = np.flatnonzero(axis_values > tolerance)
+
+    skin_weights = get_skin_weights(skin_cluster)
+    influence_map = get_mirror_influence_map(skin_weights.influences)
+
+    missing_influences = [x for x in influence_map.values() if not cmds.objExists(x)]
+    if missing_influences:
+        cmds.error(f'missing in the scene: {missing_influences}')
+
+    skin_weights = skin_weights.mirror(symmetry_map=symmetry_map, influence_map=influence_map,
+                                       point_indices=point_indices)
+
+    with modifier_lib.undo_chunk('mirrorSkinWeights'):
+        skin_cluster_joints = cmds.skinCluster(skin_cluster, query=True, influence=True)
+        joints_to_add = [x for x in influence_map.values() if x not in skin_cluster_joints]
+        if joints_to_add:
+            cmds.skinCluster(skin_cluster, edit=True, addInfluence=joints_to_add, lockWeights=True)
+
+        set_skin_weights(skin_cluster=skin_cluster, skin_weights=skin_weights, normalize=True)
+
+    logging.info(f'{skin_cluster} weights mirrored, {len(point_indices)} vertices.')
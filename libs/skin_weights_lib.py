@@ -0,0 +1,1764 @@
+# Imports
+import os
+import re
+import json
+import time
+import logging
+import hashlib
+
+import numpy as np
+
+# Project imports
+from hiddenStrings.libs import storage_lib
+
+logging = logging.getLogger(__name__)
+
+# File format
+npz_extension = 'npz'
+npz_version = 1
+
+quantize_scale = 65535  # uint16 weights, max error 1 / 131070
+
+# Chunk file, one chunk per influence
+influence_chunk_tag = 'influence'
+
+# Delta exports
+manifest_extension = 'manifest.json'
+patch_tag = 'patch'
+delta_block_size = 1024
+
+
+class SkinWeights(object):
+    """
+    Sparse skin weights container, one row per point (vertex, cv or lattice point) and one column per influence
+
+    The weights are stored as CSR arrays:
+        indptr (int64): row i weights live in the slice indptr[i]:indptr[i + 1]
+        indices (int32): influence index of each weight
+        values (float32): weight values
+
+    Args:
+        indptr (np.ndarray): row pointers, len == point_count + 1
+        indices (np.ndarray): influence index per weight
+        values (np.ndarray): weight value per weight
+        influences (list): influence names
+        shape (str, optional): name of the deformed shape. Defaults to None.
+        deformer (str, optional): name of the deformer. Defaults to None.
+        points (np.ndarray, optional): (point_count, 3) positions. Defaults to None.
+        triangles (np.ndarray, optional): (triangle_count, 3) point indices of the mesh triangles. Defaults to None.
+    """
+    def __init__(self, indptr, indices, values, influences, shape=None, deformer=None, points=None, triangles=None):
+        """
+        Initializes an instance of SkinWeights
+
+        Args:
+            indptr (np.ndarray): row pointers, len == point_count + 1
+            indices (np.ndarray): influence index per weight
+            values (np.ndarray): weight value per weight
+            influences (list): influence names
+            shape (str, optional): name of the deformed shape. Defaults to None.
+            deformer (str, optional): name of the deformer. Defaults to None.
+            points (np.ndarray, optional): (point_count, 3) positions. Defaults to None.
+            triangles (np.ndarray, optional): (triangle_count, 3) point indices of the mesh triangles.
+                                              Defaults to None.
+        """
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.values = np.asarray(values, dtype=np.float32)
+        self.influences = [str(x) for x in influences]
+        self.shape = shape
+        self.deformer = deformer
+        self.points = None if points is None else np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.triangles = None if triangles is None else np.asarray(triangles, dtype=np.int32).reshape(-1, 3)
+
+        if len(self.indices) != len(self.values):
+            raise ValueError('indices and values must have the same length')
+        if self.indptr[-1] != len(self.values):
+            raise ValueError('indptr does not match the number of values')
+
+
+    # ---------- Get methods ----------
+    def get_point_count(self):
+        """
+        Number of points (rows)
+
+        Returns:
+            int: point count
+        """
+        return len(self.indptr) - 1
+
+
+    def get_influence_count(self):
+        """
+        Number of influences (columns)
+
+        Returns:
+            int: influence count
+        """
+        return len(self.influences)
+
+
+    def get_rows(self):
+        """
+        Point index of each stored weight, the COO expansion of indptr
+
+        Returns:
+            np.ndarray: row index per weight
+        """
+        return np.repeat(np.arange(self.get_point_count(), dtype=np.int64), np.diff(self.indptr))
+
+
+    def get_influence_index(self, influence):
+        """
+        Get the column of the influence given
+
+        Args:
+            influence (str): influence name
+
+        Returns:
+            int: influence index
+        """
+        if influence not in self.influences:
+            raise ValueError(f'{influence} is not in the weights influences')
+
+        return self.influences.index(influence)
+
+
+    def get_row_sums(self):
+        """
+        Sum of the weights of each point
+
+        Returns:
+            np.ndarray: (point_count,) sums
+        """
+        return np.bincount(self.get_rows(), weights=self.values, minlength=self.get_point_count())
+
+
+    def get_quantized_values(self):
+        """
+        Get the values quantized to uint16, weights are clamped between 0 and 1
+
+        Returns:
+            np.ndarray: uint16 values
+        """
+        return np.round(np.clip(self.values, 0.0, 1.0) * quantize_scale).astype(np.uint16)
+
+
+    def extract_influence(self, influence, dense=True):
+        """
+        Get the weights of one influence
+
+        Args:
+            influence (str): influence name
+            dense (bool, optional): True == (point_count,) array, False == (point_indices, values). Defaults to True.
+
+        Returns:
+            np.ndarray or tuple: influence weights
+        """
+        mask = self.indices == self.get_influence_index(influence)
+
+        if not dense:
+            return self.get_rows()[mask], self.values[mask]
+
+        weights = np.zeros(self.get_point_count(), dtype=np.float32)
+        weights[self.get_rows()[mask]] = self.values[mask]
+
+        return weights
+
+
+    # ---------- Constructors ----------
+    @classmethod
+    def from_coo(cls, rows, columns, values, point_count, influences, shape=None, deformer=None, points=None,
+                 triangles=None, tolerance=0.0):
+        """
+        Create the weights from (point, influence, value) triplets, duplicated triplets are summed
+
+        Args:
+            rows (np.ndarray): point index per weight
+            columns (np.ndarray): influence index per weight
+            values (np.ndarray): weight value per weight
+            point_count (int): number of points
+            influences (list): influence names
+            shape (str, optional): name of the deformed shape. Defaults to None.
+            deformer (str, optional): name of the deformer. Defaults to None.
+            points (np.ndarray, optional): (point_count, 3) positions. Defaults to None.
+            triangles (np.ndarray, optional): (triangle_count, 3) point indices. Defaults to None.
+            tolerance (float, optional): weights lower or equal than this are dropped. Defaults to 0.0.
+
+        Returns:
+            SkinWeights: sparse weights
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+
+        keep = np.abs(values) > tolerance
+        rows, columns, values = rows[keep], columns[keep], values[keep]
+
+        # Sort by point and then by influence, and merge duplicated entries
+        key = rows * max(len(influences), 1) + columns
+        order = np.argsort(key, kind='stable')
+        key, rows, columns, values = key[order], rows[order], columns[order], values[order]
+        if len(key):
+            unique_mask = np.empty(len(key), dtype=bool)
+            unique_mask[0] = True
+            unique_mask[1:] = key[1:] != key[:-1]
+            unique_positions = np.flatnonzero(unique_mask)
+            values = np.add.reduceat(values, unique_positions)
+            rows, columns = rows[unique_positions], columns[unique_positions]
+
+        indptr = np.zeros(point_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=point_count), out=indptr[1:])
+
+        return cls(indptr=indptr, indices=columns, values=values, influences=influences,
+                   shape=shape, deformer=deformer, points=points, triangles=triangles)
+
+
+    @classmethod
+    def from_dense(cls, weights, influences, shape=None, deformer=None, points=None, triangles=None,
+                   tolerance=0.0):
+        """
+        Create the weights from a dense (point_count, influence_count) matrix
+
+        Args:
+            weights (np.ndarray): dense weights matrix
+            influences (list): influence names
+            shape (str, optional): name of the deformed shape. Defaults to None.
+            deformer (str, optional): name of the deformer. Defaults to None.
+            points (np.ndarray, optional): (point_count, 3) positions. Defaults to None.
+            triangles (np.ndarray, optional): (triangle_count, 3) point indices. Defaults to None.
+            tolerance (float, optional): weights lower or equal than this are dropped. Defaults to 0.0.
+
+        Returns:
+            SkinWeights: sparse weights
+        """
+        weights = np.asarray(weights).reshape(-1, len(influences))
+        mask = np.abs(weights) > tolerance
+
+        indptr = np.zeros(weights.shape[0] + 1, dtype=np.int64)
+        np.cumsum(mask.sum(axis=1), out=indptr[1:])
+        # Row major nonzero keeps the CSR order (point, then influence)
+        indices = np.nonzero(mask)[1]
+
+        return cls(indptr=indptr, indices=indices, values=weights[mask], influences=influences,
+                   shape=shape, deformer=deformer, points=points, triangles=triangles)
+
+
+    @classmethod
+    def from_deformer_weights(cls, deformer_weights_data):
+        """
+        Create the weights from the data of a cmds.deformerWeights JSON file
+
+        Args:
+            deformer_weights_data (dict): data loaded from the JSON file
+
+        Returns:
+            SkinWeights: sparse weights
+        """
+        deformer_weight = deformer_weights_data['deformerWeight']
+
+        shape_data = deformer_weight['shapes'][0] if deformer_weight.get('shapes') else dict()
+        points = None
+        if shape_data.get('points'):
+            points = np.zeros((shape_data['size'], 3), dtype=np.float64)
+            points[[x['index'] for x in shape_data['points']]] = [x['value'] for x in shape_data['points']]
+
+        influences = [x['source'] for x in deformer_weight['weights']]
+        point_count = shape_data.get('size', 0)
+
+        rows_list, columns_list, values_list = list(), list(), list()
+        for influence_index, influence_data in enumerate(deformer_weight['weights']):
+            influence_rows = np.array([x['index'] for x in influence_data['points']], dtype=np.int64)
+            rows_list.append(influence_rows)
+            columns_list.append(np.full(len(influence_rows), influence_index, dtype=np.int64))
+            values_list.append(np.array([x['value'] for x in influence_data['points']], dtype=np.float64))
+            if len(influence_rows):
+                point_count = max(point_count, int(influence_rows.max()) + 1)
+
+        deformer = deformer_weight['weights'][0]['deformer'] if deformer_weight['weights'] else None
+
+        return cls.from_coo(rows=np.concatenate(rows_list) if rows_list else [],
+                            columns=np.concatenate(columns_list) if columns_list else [],
+                            values=np.concatenate(values_list) if values_list else [],
+                            point_count=point_count,
+                            influences=influences,
+                            shape=shape_data.get('name'),
+                            deformer=deformer,
+                            points=points)
+
+
+    @classmethod
+    def from_deformer_weights_file(cls, file_path, buffer_size=4 << 20):
+        """
+        Create the weights streaming a cmds.deformerWeights JSON file, the points are parsed in chunks straight to
+        arrays so the file is never built as python dicts
+
+        Args:
+            file_path (str): full path of the json file
+            buffer_size (int, optional): bytes read per chunk. Defaults to 4 << 20.
+
+        Returns:
+            SkinWeights: sparse weights
+        """
+        shape, deformer, points, point_count = None, None, None, 0
+        influences = list()
+        rows_list, columns_list, values_list = list(), list(), list()
+
+        for section, data, arrays in DeformerWeightsReader(file_path, buffer_size).walk(read_shape_points=True):
+            if section == 'shape' and shape is None:
+                shape = data.get('name')
+                point_count = data.get('size', 0)
+                if arrays:
+                    points = np.zeros((point_count, 3), dtype=np.float64)
+                    points[arrays[0]] = arrays[1]
+
+            elif section == 'weights_chunk':
+                rows_list.append(arrays[0])
+                columns_list.append(np.full(len(arrays[0]), len(influences), dtype=np.int64))
+                values_list.append(arrays[1])
+                if len(arrays[0]):
+                    point_count = max(point_count, int(arrays[0].max()) + 1)
+
+            elif section == 'weights':
+                influences.append(data['source'])
+                deformer = deformer if deformer else data.get('deformer')
+
+        return cls.from_coo(rows=np.concatenate(rows_list) if rows_list else [],
+                            columns=np.concatenate(columns_list) if columns_list else [],
+                            values=np.concatenate(values_list) if values_list else [],
+                            point_count=point_count,
+                            influences=influences,
+                            shape=shape,
+                            deformer=deformer,
+                            points=points)
+
+
+    def copy(self, values=None):
+        """
+        Get a copy of the weights
+
+        Args:
+            values (np.ndarray, optional): new values with the same sparsity. Defaults to None.
+
+        Returns:
+            SkinWeights: copy
+        """
+        return SkinWeights(indptr=self.indptr.copy(),
+                           indices=self.indices.copy(),
+                           values=self.values.copy() if values is None else values,
+                           influences=list(self.influences),
+                           shape=self.shape,
+                           deformer=self.deformer,
+                           points=None if self.points is None else self.points.copy(),
+                           triangles=None if self.triangles is None else self.triangles.copy())
+
+
+    # ---------- Edit methods ----------
+    def normalize(self):
+        """
+        Get a copy of the weights with the weights of each point adding up 1, empty points are kept empty
+
+        Returns:
+            SkinWeights: normalized weights
+        """
+        row_sums = self.get_row_sums()[self.get_rows()]
+        values = np.divide(self.values, row_sums, out=np.zeros_like(self.values), where=row_sums > 0)
+
+        return self.copy(values=values)
+
+
+    def prune(self, max_influences=None, tolerance=0.0, normalize=True):
+        """
+        Get a copy of the weights keeping the biggest max_influences weights per point and dropping the weights
+        lower or equal than the tolerance
+
+        Args:
+            max_influences (int, optional): max influences per point, None == no limit. Defaults to None.
+            tolerance (float, optional): weights lower or equal than this are dropped. Defaults to 0.0.
+            normalize (bool, optional): normalize the weights after pruning. Defaults to True.
+
+        Returns:
+            SkinWeights: pruned weights
+        """
+        rows = self.get_rows()
+        keep = np.abs(self.values) > tolerance
+
+        if max_influences:
+            # Sort each row from the biggest weight to the lowest, the rank is the position inside the row
+            order = np.lexsort((-self.values, rows))
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order)) - self.indptr[rows[order]]
+            keep &= rank < max_influences
+
+        pruned = SkinWeights.from_coo(rows=rows[keep],
+                                      columns=self.indices[keep],
+                                      values=self.values[keep],
+                                      point_count=self.get_point_count(),
+                                      influences=self.influences,
+                                      shape=self.shape,
+                                      deformer=self.deformer,
+                                      points=self.points,
+                                      triangles=self.triangles)
+
+        return pruned.normalize() if normalize else pruned
+
+
+    def take_points(self, point_indices):
+        """
+        Get the weights of the points given, the result has len(point_indices) points
+
+        Args:
+            point_indices (np.ndarray): point indices
+
+        Returns:
+            SkinWeights: weights of the points
+        """
+        point_indices = np.asarray(point_indices, dtype=np.int64)
+        counts = np.diff(self.indptr)[point_indices]
+        indptr = np.zeros(len(point_indices) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+
+        # Positions of the values of each point in the original arrays
+        positions = np.repeat(self.indptr[point_indices] - indptr[:-1], counts) + np.arange(indptr[-1])
+
+        return SkinWeights(indptr=indptr,
+                           indices=self.indices[positions],
+                           values=self.values[positions],
+                           influences=list(self.influences),
+                           shape=self.shape,
+                           deformer=self.deformer,
+                           points=None if self.points is None else self.points[point_indices])
+
+
+    def replace_points(self, point_indices, skin_weights):
+        """
+        Get a copy of the weights with the points given replaced by the weights of skin_weights, the influences are
+        matched by name and the new ones are added at the end
+
+        Args:
+            point_indices (np.ndarray): point indices, one per skin_weights point
+            skin_weights (SkinWeights): new weights of the points
+
+        Returns:
+            SkinWeights: weights with the points replaced
+        """
+        point_indices = np.asarray(point_indices, dtype=np.int64)
+        if len(point_indices) != skin_weights.get_point_count():
+            raise ValueError(f'{len(point_indices)} point indices for {skin_weights.get_point_count()} points')
+
+        influences = self.influences + [x for x in skin_weights.influences if x not in self.influences]
+        influence_index_dict = {name: index for index, name in enumerate(influences)}
+        column_map = np.array([influence_index_dict[x] for x in skin_weights.influences], dtype=np.int64)
+
+        rows = self.get_rows()
+        keep = ~np.isin(rows, point_indices)
+
+        return SkinWeights.from_coo(rows=np.concatenate([rows[keep], point_indices[skin_weights.get_rows()]]),
+                                    columns=np.concatenate([self.indices[keep],
+                                                            column_map[skin_weights.indices]
+                                                            if len(skin_weights.indices) else []]),
+                                    values=np.concatenate([self.values[keep], skin_weights.values]),
+                                    point_count=self.get_point_count(),
+                                    influences=influences,
+                                    shape=self.shape,
+                                    deformer=self.deformer,
+                                    points=self.points,
+                                    triangles=self.triangles)
+
+
+    def interpolate(self, point_indices, coefficients, points=None):
+        """
+        Get new weights as a linear combination of the points weights, new point i gets
+        sum(coefficients[i, j] * weights[point_indices[i, j]])
+
+        Args:
+            point_indices (np.ndarray): (new_point_count, k) point indices
+            coefficients (np.ndarray): (new_point_count, k) coefficients
+            points (np.ndarray, optional): (new_point_count, 3) positions of the new points. Defaults to None.
+
+        Returns:
+            SkinWeights: interpolated weights
+        """
+        point_indices = np.asarray(point_indices, dtype=np.int64)
+        coefficients = np.asarray(coefficients, dtype=np.float64)
+        point_count, sample_count = point_indices.shape
+
+        samples = self.take_points(point_indices.ravel())
+        sample_rows = samples.get_rows()
+
+        return SkinWeights.from_coo(rows=sample_rows // sample_count,
+                                    columns=samples.indices,
+                                    values=samples.values * coefficients.ravel()[sample_rows],
+                                    point_count=point_count,
+                                    influences=self.influences,
+                                    shape=self.shape,
+                                    deformer=self.deformer,
+                                    points=points)
+
+
+    def get_block_hashes(self, block_size=delta_block_size):
+        """
+        Hash the weights in blocks of points, used to find the points changed between exports
+
+        Args:
+            block_size (int, optional): points per block. Defaults to delta_block_size.
+
+        Returns:
+            list: hex digest per block
+        """
+        hash_list = list()
+        for start in range(0, self.get_point_count(), block_size):
+            end = min(start + block_size, self.get_point_count())
+            value_start, value_end = self.indptr[start], self.indptr[end]
+
+            block_hash = hashlib.blake2b(digest_size=16)
+            block_hash.update(np.diff(self.indptr[start:end + 1]).tobytes())
+            block_hash.update(self.indices[value_start:value_end].tobytes())
+            block_hash.update(self.values[value_start:value_end].tobytes())
+            hash_list.append(block_hash.hexdigest())
+
+        return hash_list
+
+
+    def get_geometry_hash(self):
+        """
+        Hash the point positions and the triangles, the delta exports write a new base when they change
+
+        Returns:
+            str: hex digest, None if the weights have no points nor triangles
+        """
+        if self.points is None and self.triangles is None:
+            return None
+
+        geometry_hash = hashlib.blake2b(digest_size=16)
+        if self.points is not None:
+            # The npz files store the points as float32
+            geometry_hash.update(self.points.astype(np.float32).tobytes())
+        geometry_hash.update(b'|')
+        if self.triangles is not None:
+            geometry_hash.update(self.triangles.tobytes())
+
+        return geometry_hash.hexdigest()
+
+
+    def smooth(self, adjacency, iterations=10, strength=0.5, locked_influences=None, point_mask=None,
+               tolerance=1e-4, chunk_size=32):
+        """
+        Get a copy of the weights smoothed with Laplacian iterations, each point moves its weights to the average
+        of its neighbours. The locked influences keep their weights and the other influences are normalized to
+        fill what the locked ones leave, weights lower or equal than the tolerance are dropped before normalizing.
+        Only the columns of the smoothed influences are expanded, chunk_size at a time, the rest of the weights
+        stay sparse
+
+        Args:
+            adjacency (tuple): (indptr, indices) CSR point neighbours, see get_edge_adjacency
+            iterations (int, optional): smoothing iterations. Defaults to 10.
+            strength (float, optional): 0 == no change, 1 == neighbours average. Defaults to 0.5.
+            locked_influences (list, optional): influences that are not smoothed. Defaults to None.
+            point_mask (np.ndarray, optional): (point_count,) bool or point indices to smooth, None == all.
+                                               Defaults to None.
+            tolerance (float, optional): smoothed weights lower or equal than this are dropped. Defaults to 1e-4.
+            chunk_size (int, optional): influences smoothed at once, bounds the memory. Defaults to 32.
+
+        Returns:
+            SkinWeights: smoothed weights
+        """
+        adjacency_indptr, adjacency_indices = adjacency
+        adjacency_indptr = np.asarray(adjacency_indptr, dtype=np.int64)
+        adjacency_indices = np.asarray(adjacency_indices, dtype=np.int64)
+        point_count = self.get_point_count()
+        if len(adjacency_indptr) != point_count + 1:
+            raise ValueError(f'the adjacency has {len(adjacency_indptr) - 1} points and the weights {point_count}')
+
+        mask = np.ones(point_count, dtype=bool)
+        if point_mask is not None:
+            point_mask = np.asarray(point_mask)
+            if point_mask.dtype == bool:
+                mask = point_mask.copy()
+            else:
+                mask = np.zeros(point_count, dtype=bool)
+                mask[point_mask] = True
+
+        degree = np.diff(adjacency_indptr)
+        mask &= degree > 0
+
+        # Padded neighbour table, the padding points to an extra row of zeros
+        neighbour_table = np.full((point_count, max(int(degree.max(initial=0)), 1)), point_count, dtype=np.int64)
+        neighbour_rows = np.repeat(np.arange(point_count), degree)
+        neighbour_table[neighbour_rows, np.arange(len(adjacency_indices)) - adjacency_indptr[neighbour_rows]] = \
+            adjacency_indices
+        inverse_degree = (1.0 / np.maximum(degree, 1)).astype(np.float32)[:, None]
+        point_strength = (strength * mask).astype(np.float32)[:, None]
+
+        rows = self.get_rows()
+        locked_columns = [self.get_influence_index(x) for x in locked_influences] if locked_influences else list()
+        used_columns = np.flatnonzero(np.bincount(self.indices, minlength=len(self.influences)))
+        smooth_columns = np.array([x for x in used_columns if x not in locked_columns], dtype=np.int64)
+        smooth_entries = np.isin(self.indices, smooth_columns)
+
+        # Only the rows of the masked points are replaced, the sparse entries of the smoothed columns
+        row_list, column_list, value_list = list(), list(), list()
+        masked_points = np.flatnonzero(mask)
+        for start in range(0, len(smooth_columns), chunk_size):
+            columns = smooth_columns[start:start + chunk_size]
+            column_positions = np.full(len(self.influences), -1, dtype=np.int64)
+            column_positions[columns] = np.arange(len(columns))
+            entries = np.flatnonzero(column_positions[self.indices] >= 0)
+
+            chunk = np.zeros((point_count + 1, len(columns)), dtype=np.float32)
+            chunk[rows[entries], column_positions[self.indices[entries]]] = self.values[entries]
+            for iteration in range(iterations):
+                average = chunk[neighbour_table[:, 0]]
+                for neighbour_column in range(1, neighbour_table.shape[1]):
+                    average += chunk[neighbour_table[:, neighbour_column]]
+                average *= inverse_degree
+                average -= chunk[:-1]
+                average *= point_strength
+                chunk[:-1] += average
+
+            chunk_rows, chunk_columns = np.nonzero(chunk[masked_points] > tolerance)
+            chunk_rows = masked_points[chunk_rows]
+            row_list.append(chunk_rows)
+            column_list.append(columns[chunk_columns])
+            value_list.append(chunk[chunk_rows, chunk_columns])
+
+        smooth_rows = np.concatenate(row_list) if row_list else np.zeros(0, dtype=np.int64)
+        smooth_indices = np.concatenate(column_list) if column_list else np.zeros(0, dtype=np.int64)
+        smooth_values = np.concatenate(value_list).astype(np.float64) if value_list else np.zeros(0)
+
+        # The smoothed influences fill what the locked ones leave
+        locked_entries = ~smooth_entries
+        locked_sums = np.bincount(rows[locked_entries], weights=self.values[locked_entries], minlength=point_count)
+        smooth_sums = np.bincount(smooth_rows, weights=smooth_values, minlength=point_count)
+        scale = np.divide(np.maximum(1.0 - locked_sums, 0.0), smooth_sums,
+                          out=np.ones(point_count), where=smooth_sums > 0)
+        smooth_values *= scale[smooth_rows]
+
+        # Points outside of the mask keep all their weights exactly, the masked points keep their locked weights
+        keep = ~mask[rows] | locked_entries
+
+        return SkinWeights.from_coo(rows=np.concatenate([rows[keep], smooth_rows]),
+                                    columns=np.concatenate([self.indices[keep], smooth_indices]),
+                                    values=np.concatenate([self.values[keep], smooth_values]),
+                                    point_count=point_count,
+                                    influences=self.influences,
+                                    shape=self.shape,
+                                    deformer=self.deformer,
+                                    points=self.points,
+                                    triangles=self.triangles)
+
+
+    def mirror(self, symmetry_map, influence_map, point_indices):
+        """
+        Get a copy of the weights with the points given taking the weights of their opposite points, with the
+        influences swapped by the influence map. The points without an opposite point keep their weights
+
+        Args:
+            symmetry_map (np.ndarray): (point_count,) opposite point of each point, -1 == no opposite point
+            influence_map (dict): {influence: opposite influence}, the influences not in the map keep their name
+            point_indices (np.ndarray): points that receive the mirrored weights
+
+        Returns:
+            SkinWeights: mirrored weights
+        """
+        point_indices = np.asarray(point_indices, dtype=np.int64)
+        symmetry_map = np.asarray(symmetry_map, dtype=np.int64)
+        if len(symmetry_map) != self.get_point_count():
+            raise ValueError(f'the symmetry map has {len(symmetry_map)} points and the weights '
+                             f'{self.get_point_count()}')
+
+        # Negative indices would wrap to the last points, the unmatched points are skipped
+        unmatched = symmetry_map[point_indices] < 0
+        if unmatched.any():
+            logging.warning(f'{int(np.count_nonzero(unmatched))} points have no opposite point and are not '
+                            f'mirrored: {point_indices[unmatched][:10].tolist()}')
+            point_indices = point_indices[~unmatched]
+
+        opposite_weights = self.take_points(symmetry_map[point_indices])
+        opposite_weights.influences = [influence_map.get(x, x) for x in opposite_weights.influences]
+        if len(set(opposite_weights.influences)) != len(opposite_weights.influences):
+            raise ValueError(f'the influence map gives repeated influences: {opposite_weights.influences}')
+
+        return self.replace_points(point_indices, opposite_weights)
+
+
+    def merge_influences(self, influence_list, target_influence):
+        """
+        Get a copy of the weights with the influences given merged into the target influence, the merged
+        influences are removed
+
+        Args:
+            influence_list (list): influences to merge
+            target_influence (str): influence that receives the weights, it is added if it does not exist
+
+        Returns:
+            SkinWeights: merged weights
+        """
+        influences = [x for x in self.influences if x not in influence_list or x == target_influence]
+        if target_influence not in influences:
+            influences.append(target_influence)
+
+        influence_index_dict = {name: index for index, name in enumerate(influences)}
+        column_map = np.array([influence_index_dict[target_influence if x in influence_list else x]
+                               for x in self.influences], dtype=np.int64)
+
+        return SkinWeights.from_coo(rows=self.get_rows(),
+                                    columns=column_map[self.indices] if len(self.indices) else [],
+                                    values=self.values,
+                                    point_count=self.get_point_count(),
+                                    influences=influences,
+                                    shape=self.shape,
+                                    deformer=self.deformer,
+                                    points=self.points,
+                                    triangles=self.triangles)
+
+
+    # ---------- Conversions ----------
+    def to_dense(self, dtype=np.float64):
+        """
+        Get the dense (point_count, influence_count) weights matrix
+
+        Args:
+            dtype (np.dtype, optional): data type of the matrix. Defaults to np.float64.
+
+        Returns:
+            np.ndarray: dense weights matrix
+        """
+        weights = np.zeros((self.get_point_count(), self.get_influence_count()), dtype=dtype)
+        weights[self.get_rows(), self.indices] = self.values
+
+        return weights
+
+
+    def to_deformer_weights(self):
+        """
+        Get the data with the cmds.deformerWeights JSON layout, so it can be imported with deformerWeights
+
+        Returns:
+            dict: deformerWeights data
+        """
+        shape_data = {'name': self.shape,
+                      'group': 0,
+                      'stride': 3,
+                      'size': self.get_point_count(),
+                      'max': self.get_point_count()}
+        if self.points is not None:
+            shape_data['points'] = [{'index': index, 'value': value}
+                                    for index, value in enumerate(self.points.tolist())]
+
+        rows = self.get_rows()
+        weights_list = list()
+        for influence_index, influence in enumerate(self.influences):
+            mask = self.indices == influence_index
+            influence_rows = rows[mask].tolist()
+            influence_values = self.values[mask].astype(np.float64).tolist()
+            weights_list.append({'deformer': self.deformer,
+                                 'source': influence,
+                                 'shape': self.shape,
+                                 'layer': 0,
+                                 'defaultValue': 0.0,
+                                 'size': len(influence_rows),
+                                 'max': influence_rows[-1] if influence_rows else 0,
+                                 'points': [{'index': index, 'value': value}
+                                            for index, value in zip(influence_rows, influence_values)]})
+
+        return {'deformerWeight': {'headerInfo': {'fileName': '',
+                                                  'worldMatrix': [1.0, 0.0, 0.0, 0.0,
+                                                                  0.0, 1.0, 0.0, 0.0,
+                                                                  0.0, 0.0, 1.0, 0.0,
+                                                                  0.0, 0.0, 0.0, 1.0]},
+                                   'shapes': [shape_data],
+                                   'weights': weights_list}}
+
+
+    def reorder_influences(self, influences):
+        """
+        Get a copy of the weights with the columns following the influences order given, the influences that are not
+        in the weights are added empty
+
+        Args:
+            influences (list): new influence order
+
+        Returns:
+            SkinWeights: reordered weights
+        """
+        influence_index_dict = {name: index for index, name in enumerate(influences)}
+        missing_list = [x for x in self.influences if x not in influence_index_dict]
+        if missing_list:
+            raise ValueError(f'influences missing in the new order: {missing_list}')
+
+        column_map = np.array([influence_index_dict[x] for x in self.influences], dtype=np.int64)
+
+        return SkinWeights.from_coo(rows=self.get_rows(),
+                                    columns=column_map[self.indices] if len(self.indices) else [],
+                                    values=self.values,
+                                    point_count=self.get_point_count(),
+                                    influences=influences,
+                                    shape=self.shape,
+                                    deformer=self.deformer,
+                                    points=self.points,
+                                    triangles=self.triangles)
+
+
+    # ---------- File methods ----------
+    def save(self, file_path, quantize=False):
+        """
+        Save the weights to a compressed .npz file. The delta manifest and patches of a previous export to the same
+        file are removed, so they are not applied on top of the new weights
+
+        Args:
+            file_path (str): full path of the file, with the .npz extension
+            quantize (bool, optional): store the values as uint16 instead of float32. Defaults to False.
+
+        Returns:
+            str: file path
+        """
+        data = {'version': np.array(npz_version, dtype=np.int32),
+                'indptr': self.indptr,
+                'indices': self.indices,
+                'influences': np.array(self.influences, dtype=np.str_),
+                'shape': np.array(self.shape or '', dtype=np.str_),
+                'deformer': np.array(self.deformer or '', dtype=np.str_),
+                'point_count': np.array(self.get_point_count(), dtype=np.int64)}
+        if quantize:
+            data['values_uint16'] = self.get_quantized_values()
+        else:
+            data['values'] = self.values
+        if self.points is not None:
+            data['points'] = self.points.astype(np.float32)
+        if self.triangles is not None:
+            data['triangles'] = self.triangles
+
+        remove_skin_weights_delta(file_path)
+        with open(file_path, 'wb') as write_file:
+            np.savez_compressed(write_file, **data)
+
+        return file_path
+
+
+    def save_deformer_weights(self, file_path):
+        """
+        Save the weights to a json file with the cmds.deformerWeights layout
+
+        Args:
+            file_path (str): full path of the file, with the .json extension
+
+        Returns:
+            str: file path
+        """
+        with open(file_path, 'w') as write_file:
+            json.dump(self.to_deformer_weights(), write_file)
+
+        return file_path
+
+
+    def save_chunks(self, file_path, compression='zlib'):
+        """
+        Save the weights to a chunk file with an index and a value chunk per influence, so single influences can be
+        read without loading the rest. Uncompressed files can be mapped, see load_chunks
+
+        Args:
+            file_path (str): full path of the file, with the .chunk extension
+            compression (str, optional): 'zlib', 'lzma' or 'none' (mappable). Defaults to 'zlib'.
+
+        Returns:
+            str: file path
+        """
+        rows = self.get_rows()
+        order = np.argsort(self.indices, kind='stable')
+        influence_starts = np.searchsorted(self.indices[order], np.arange(self.get_influence_count() + 1))
+
+        chunk_dict = dict()
+        if self.points is not None:
+            chunk_dict['points'] = self.points.astype(np.float32)
+        if self.triangles is not None:
+            chunk_dict['triangles'] = self.triangles
+        for i, influence in enumerate(self.influences):
+            influence_order = order[influence_starts[i]:influence_starts[i + 1]]
+            chunk_dict[f'{influence_chunk_tag}/{influence}/indices'] = rows[influence_order].astype(np.int32)
+            chunk_dict[f'{influence_chunk_tag}/{influence}/values'] = self.values[influence_order]
+
+        metadata = {'version': npz_version,
+                    'shape': self.shape or '',
+                    'deformer': self.deformer or '',
+                    'influences': list(self.influences),
+                    'point_count': self.get_point_count()}
+
+        return storage_lib.write_chunk_file(file_path, chunk_dict, metadata=metadata, compression=compression)
+
+
+    @classmethod
+    def load_chunks(cls, file_path, influence_list=None, point_indices=None, mmap_mode='r'):
+        """
+        Load the weights from a chunk file. The arrays of uncompressed files are mapped, so only the influences
+        and points asked for are read from disk
+
+        Args:
+            file_path (str): full path of the file, with the .chunk extension
+            influence_list (list, optional): influences to read, None == all of them. Defaults to None.
+            point_indices (np.ndarray, optional): sorted points to read, renumbered from 0, None == all of them.
+                                                  Defaults to None.
+            mmap_mode (str, optional): np.memmap mode of uncompressed files, None == read the arrays.
+                                       Defaults to 'r'.
+
+        Returns:
+            SkinWeights: sparse weights, with the influences of influence_list only if given
+        """
+        chunk_reader = storage_lib.ChunkFileReader(file_path, mmap_mode=mmap_mode)
+        metadata = chunk_reader.get_metadata()
+        influences = metadata['influences'] if influence_list is None else list(influence_list)
+        chunk_names = chunk_reader.get_chunk_names()
+
+        point_count = metadata['point_count']
+        if point_indices is not None:
+            point_indices = np.asarray(point_indices, dtype=np.int64)
+            point_count = len(point_indices)
+
+        row_list, column_list, value_list = list(), list(), list()
+        for i, influence in enumerate(influences):
+            chunk_name = f'{influence_chunk_tag}/{influence}'
+            if f'{chunk_name}/indices' not in chunk_names:
+                raise ValueError(f'{influence} is not an influence of {file_path}')
+            rows = chunk_reader.read_chunk(f'{chunk_name}/indices')
+            values = chunk_reader.read_chunk(f'{chunk_name}/values')
+            if point_indices is not None:
+                # The rows of each influence are sorted, only the pages of the points asked for are read
+                positions = np.clip(np.searchsorted(rows, point_indices), 0, max(len(rows) - 1, 0))
+                positions = positions[rows[positions] == point_indices] if len(rows) else positions[:0]
+                rows = np.searchsorted(point_indices, rows[positions])
+                values = values[positions]
+            row_list.append(np.asarray(rows))
+            column_list.append(np.full(len(rows), i, dtype=np.int64))
+            value_list.append(np.asarray(values))
+
+        points = chunk_reader.read_chunk('points') if 'points' in chunk_names else None
+        triangles = chunk_reader.read_chunk('triangles') if 'triangles' in chunk_names else None
+        if point_indices is not None:
+            points = None if points is None else points[point_indices]
+            triangles = None
+
+        return cls.from_coo(rows=np.concatenate(row_list) if row_list else [],
+                            columns=np.concatenate(column_list) if column_list else [],
+                            values=np.concatenate(value_list) if value_list else [],
+                            point_count=point_count,
+                            influences=influences,
+                            shape=metadata['shape'] or None,
+                            deformer=metadata['deformer'] or None,
+                            points=points,
+                            triangles=triangles)
+
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Load the weights from a .npz file
+
+        Args:
+            file_path (str): full path of the file, with the .npz extension
+
+        Returns:
+            SkinWeights: sparse weights
+        """
+        with np.load(file_path, allow_pickle=False) as data:
+            if 'values_uint16' in data.files:
+                values = data['values_uint16'].astype(np.float32) / quantize_scale
+            else:
+                values = data['values']
+
+            return cls(indptr=data['indptr'],
+                       indices=data['indices'],
+                       values=values,
+                       influences=data['influences'].tolist(),
+                       shape=str(data['shape']) or None,
+                       deformer=str(data['deformer']) or None,
+                       points=data['points'] if 'points' in data.files else None,
+                       triangles=data['triangles'] if 'triangles' in data.files else None)
+
+
+class DeformerWeightsReader(object):
+    """
+    Streaming reader of cmds.deformerWeights JSON files.
+
+    The file is read in chunks of bytes, the point arrays are skipped or parsed straight to numpy arrays and only the
+    small header values are decoded with json. deformerWeights files only contain Maya names and numbers, so the
+    brackets and braces are never inside strings and the nesting can be tracked in bulk with numpy.
+
+    Args:
+        file_path (str): full path of the json file
+        buffer_size (int, optional): bytes read per chunk. Defaults to 4 << 20.
+    """
+    whitespace_regex = re.compile(rb'\s*')
+    string_regex = re.compile(rb'"(?:[^"\\]|\\.)*"')
+    scalar_regex = re.compile(rb'-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null')
+    weight_point_regex = re.compile(rb'"index"\s*:\s*(\d+)\s*,\s*"value"\s*:\s*([-+0-9.eE]+)')
+    shape_point_regex = re.compile(rb'"index"\s*:\s*(\d+)\s*,\s*"value"\s*:\s*'
+                                   rb'\[\s*([^,\s]+)\s*,\s*([^,\s]+)\s*,\s*([^\]\s]+)\s*\]')
+
+    def __init__(self, file_path, buffer_size=4 << 20):
+        """
+        Initializes an instance of DeformerWeightsReader
+
+        Args:
+            file_path (str): full path of the json file
+            buffer_size (int, optional): bytes read per chunk. Defaults to 4 << 20.
+        """
+        self.file_path = file_path
+        self.buffer_size = buffer_size
+
+        self.read_file = None
+        self.buffer = b''
+        self.position = 0
+        self.end_of_file = False
+
+
+    # ---------- Buffer methods ----------
+    def fill_buffer(self):
+        """
+        Drop the consumed bytes and read the next chunk of the file
+
+        Returns:
+            bool: False if the end of the file has been reached
+        """
+        chunk = self.read_file.read(self.buffer_size) if not self.end_of_file else b''
+        if not chunk:
+            self.end_of_file = True
+            return False
+
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+
+        return True
+
+
+    def peek(self):
+        """
+        Skip the whitespaces and get the next character without consuming it
+
+        Returns:
+            bytes: next character
+        """
+        while True:
+            self.position = self.whitespace_regex.match(self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position:self.position + 1]
+            if not self.fill_buffer():
+                raise ValueError(f'{self.file_path}: unexpected end of file')
+
+
+    def expect(self, character):
+        """
+        Consume the next character, it must be the character given
+
+        Args:
+            character (bytes): expected character
+        """
+        if self.peek() != character:
+            raise ValueError(f'{self.file_path}: expected {character} at byte {self.position}, '
+                             f'found {self.peek()}')
+        self.position += 1
+
+
+    def match_token(self, regex):
+        """
+        Consume the next string or scalar token, reading more chunks if the token is cut by the buffer
+
+        Args:
+            regex (re.Pattern): token regex
+
+        Returns:
+            bytes: token
+        """
+        self.peek()
+        # Scalars are short, keep some bytes after them so a number is never cut by the buffer
+        while len(self.buffer) - self.position < 64 and self.fill_buffer():
+            pass
+
+        while True:
+            token_match = regex.match(self.buffer, self.position)
+            if token_match and (token_match.end() < len(self.buffer) or self.end_of_file):
+                self.position = token_match.end()
+                return token_match.group()
+            if not self.fill_buffer() and not token_match:
+                raise ValueError(f'{self.file_path}: invalid token at byte {self.position}')
+
+
+    def consume_container(self, keep=False):
+        """
+        Consume the array or object at the current position
+
+        Args:
+            keep (bool, optional): return the bytes of the container. Defaults to False.
+
+        Returns:
+            bytes: container bytes if keep == True
+        """
+        self.peek()
+        depth = 0
+        kept_list = list()
+        while True:
+            bracket_positions, is_closing_brace, depths = self.scan_depth(depth)
+
+            closing = np.flatnonzero(depths == 0)
+            if len(closing):
+                end = self.position + int(bracket_positions[closing[0]]) + 1
+                if keep:
+                    kept_list.append(self.buffer[self.position:end])
+                self.position = end
+                return b''.join(kept_list)
+
+            depth = int(depths[-1]) if len(depths) else depth
+            if keep:
+                kept_list.append(self.buffer[self.position:])
+            self.position = len(self.buffer)
+            if not self.fill_buffer():
+                raise ValueError(f'{self.file_path}: unexpected end of file')
+
+
+    def scan_depth(self, depth):
+        """
+        Get the nesting depth after each bracket or brace from the current position to the end of the buffer
+
+        Args:
+            depth (int): depth at the current position
+
+        Returns:
+            tuple: (bracket positions relative to the current position, closing brace mask, depths)
+        """
+        data = np.frombuffer(self.buffer, dtype=np.uint8, offset=self.position)
+        is_opening = (data == 91) | (data == 123)  # [ {
+        bracket_positions = np.flatnonzero(is_opening | (data == 93) | (data == 125))  # ] }
+
+        depths = depth + np.cumsum(np.where(is_opening[bracket_positions], 1, -1))
+
+        return bracket_positions, data[bracket_positions] == 125, depths
+
+
+    # ---------- Value methods ----------
+    def read_string(self):
+        """
+        Consume and decode the string at the current position
+
+        Returns:
+            str: string
+        """
+        return json.loads(self.match_token(self.string_regex))
+
+
+    def read_value(self):
+        """
+        Consume and decode the value at the current position
+
+        Returns:
+            object: decoded value
+        """
+        character = self.peek()
+        if character in (b'[', b'{'):
+            return json.loads(self.consume_container(keep=True))
+        elif character == b'"':
+            return self.read_string()
+        else:
+            return json.loads(self.match_token(self.scalar_regex))
+
+
+    def skip_value(self):
+        """
+        Consume the value at the current position without decoding it
+        """
+        character = self.peek()
+        if character in (b'[', b'{'):
+            self.consume_container()
+        elif character == b'"':
+            self.match_token(self.string_regex)
+        else:
+            self.match_token(self.scalar_regex)
+
+
+    def iter_object(self):
+        """
+        Iterate the object at the current position, the caller must consume the value of each key
+
+        Yields:
+            str: key
+        """
+        self.expect(b'{')
+        if self.peek() == b'}':
+            self.position += 1
+            return
+
+        while True:
+            key = self.read_string()
+            self.expect(b':')
+            yield key
+
+            character = self.peek()
+            self.position += 1
+            if character == b'}':
+                return
+            if character != b',':
+                raise ValueError(f'{self.file_path}: expected , or }} at byte {self.position - 1}')
+
+
+    def iter_array(self):
+        """
+        Iterate the array at the current position, the caller must consume each item
+
+        Yields:
+            int: item index
+        """
+        self.expect(b'[')
+        if self.peek() == b']':
+            self.position += 1
+            return
+
+        index = 0
+        while True:
+            yield index
+            index += 1
+
+            character = self.peek()
+            self.position += 1
+            if character == b']':
+                return
+            if character != b',':
+                raise ValueError(f'{self.file_path}: expected , or ] at byte {self.position - 1}')
+
+
+    def iter_points(self, point_regex):
+        """
+        Parse the points array at the current position in chunks
+
+        Args:
+            point_regex (re.Pattern): weight_point_regex or shape_point_regex
+
+        Yields:
+            tuple: (indices, values) arrays of each chunk
+        """
+        self.peek()
+        depth = 0
+        while True:
+            bracket_positions, is_closing_brace, depths = self.scan_depth(depth)
+
+            closing = np.flatnonzero(depths == 0)
+            if len(closing):
+                end = self.position + int(bracket_positions[closing[0]]) + 1
+                yield self.parse_points(self.buffer[self.position:end], point_regex)
+                self.position = end
+                return
+
+            # Parse up to the last complete point and keep the rest for the next chunk
+            closing_braces = np.flatnonzero(is_closing_brace)
+            if len(closing_braces):
+                depth = int(depths[closing_braces[-1]])
+                last_point_end = self.position + int(bracket_positions[closing_braces[-1]])
+                yield self.parse_points(self.buffer[self.position:last_point_end + 1], point_regex)
+                self.position = last_point_end + 1
+
+            if not self.fill_buffer():
+                raise ValueError(f'{self.file_path}: unexpected end of file')
+
+
+    @staticmethod
+    def parse_points(data, point_regex):
+        """
+        Parse the points of a chunk
+
+        Args:
+            data (bytes): chunk with complete points
+            point_regex (re.Pattern): weight_point_regex or shape_point_regex
+
+        Returns:
+            tuple: (indices, values) arrays
+        """
+        point_list = point_regex.findall(data)
+        if not point_list:
+            return np.zeros(0, dtype=np.int64), np.zeros((0,) if point_regex.groups == 2 else (0, 3))
+
+        point_array = np.array(point_list)
+        values = point_array[:, 1] if point_regex.groups == 2 else point_array[:, 1:]
+
+        return point_array[:, 0].astype(np.int64), values.astype(np.float64)
+
+
+    # ---------- Walk methods ----------
+    def walk(self, read_shape_points=False, read_weight_points=True):
+        """
+        Walk the file and yield its sections, the weight points are yielded in chunks before their influence
+
+        Args:
+            read_shape_points (bool, optional): parse the shape positions. Defaults to False.
+            read_weight_points (bool, optional): parse the weights. Defaults to True.
+
+        Yields:
+            tuple: ('headerInfo', dict, None), ('shape', dict, (indices, positions) or None),
+                   ('weights_chunk', dict, (indices, values)), ('weights', dict, None)
+        """
+        with open(self.file_path, 'rb') as self.read_file:
+            self.buffer, self.position, self.end_of_file = b'', 0, False
+
+            for key in self.iter_object():
+                if key != 'deformerWeight':
+                    self.skip_value()
+                    continue
+
+                for section in self.iter_object():
+                    if section == 'shapes':
+                        for _ in self.iter_array():
+                            yield self.read_shape(read_points=read_shape_points)
+
+                    elif section == 'weights':
+                        for _ in self.iter_array():
+                            for weight_section in self.read_weight(read_points=read_weight_points):
+                                yield weight_section
+
+                    else:
+                        yield section, self.read_value(), None
+
+
+    def read_shape(self, read_points=False):
+        """
+        Read the shape object at the current position
+
+        Args:
+            read_points (bool, optional): parse the shape positions. Defaults to False.
+
+        Returns:
+            tuple: ('shape', dict, (indices, positions) or None)
+        """
+        shape_data = dict()
+        points = None
+        for key in self.iter_object():
+            if key == 'points' and read_points:
+                chunk_list = list(self.iter_points(self.shape_point_regex))
+                points = (np.concatenate([x[0] for x in chunk_list]), np.concatenate([x[1] for x in chunk_list]))
+            elif key == 'points':
+                self.skip_value()
+            else:
+                shape_data[key] = self.read_value()
+
+        return 'shape', shape_data, points
+
+
+    def read_weight(self, read_points=True):
+        """
+        Read the weight (influence) object at the current position
+
+        Args:
+            read_points (bool, optional): parse the weights. Defaults to True.
+
+        Yields:
+            tuple: ('weights_chunk', dict, (indices, values)) and finally ('weights', dict, None)
+        """
+        weight_data = dict()
+        pending_list = list()
+        for key in self.iter_object():
+            if key == 'points' and read_points:
+                # The influence data is complete before the points in the files written by Maya
+                for chunk in self.iter_points(self.weight_point_regex):
+                    if 'source' in weight_data:
+                        yield 'weights_chunk', weight_data, chunk
+                    else:
+                        pending_list.append(chunk)
+            elif key == 'points':
+                self.skip_value()
+            else:
+                weight_data[key] = self.read_value()
+
+        for chunk in pending_list:
+            yield 'weights_chunk', weight_data, chunk
+
+        yield 'weights', weight_data, None
+
+
+def write_skin_weights_file(skin_weights, file_path, compression='zlib'):
+    """
+    Write the weights to a json, npz or chunk file depending on the extension, used by the export workers
+
+    Args:
+        skin_weights (SkinWeights): sparse weights
+        file_path (str): full path of the file
+        compression (str, optional): chunk only, 'zlib', 'lzma' or 'none' (mappable). Defaults to 'zlib'.
+
+    Returns:
+        dict: {'file': file path, 'write_time': seconds, 'size': bytes}
+    """
+    start_time = time.perf_counter()
+    if file_path.endswith(f'.{npz_extension}'):
+        skin_weights.save(file_path)
+    elif file_path.endswith(f'.{storage_lib.chunk_extension}'):
+        skin_weights.save_chunks(file_path, compression=compression)
+    else:
+        skin_weights.save_deformer_weights(file_path)
+
+    return {'file': file_path,
+            'write_time': time.perf_counter() - start_time,
+            'size': os.path.getsize(file_path)}
+
+
+def read_npz_header(file_path):
+    """
+    Read the header of a skin weights .npz file, the weight arrays are not loaded
+
+    Args:
+        file_path (str): full path of the npz file
+
+    Returns:
+        dict: {'shape': str, 'deformer': str, 'influences': list, 'point_count': int}
+    """
+    with np.load(file_path, allow_pickle=False) as data:
+        return {'shape': str(data['shape']),
+                'deformer': str(data['deformer']),
+                'influences': data['influences'].tolist(),
+                'point_count': int(data['point_count'])}
+
+
+def read_chunk_header(file_path):
+    """
+    Read the header of a skin weights chunk file, the weight chunks are not loaded
+
+    Args:
+        file_path (str): full path of the chunk file
+
+    Returns:
+        dict: {'shape': str, 'deformer': str, 'influences': list, 'point_count': int}
+    """
+    metadata = storage_lib.ChunkFileReader(file_path).get_metadata()
+
+    return {'shape': metadata['shape'],
+            'deformer': metadata['deformer'],
+            'influences': metadata['influences'],
+            'point_count': metadata['point_count']}
+
+
+def read_deformer_weights_header(file_path):
+    """
+    Read the header of a cmds.deformerWeights JSON file without loading the points
+
+    Args:
+        file_path (str): full path of the json file
+
+    Returns:
+        dict: {'headerInfo': dict, 'shapes': [dict, ...], 'weights': [dict, ...]} with the deformerWeight layout
+    """
+    header_data = {'shapes': list(), 'weights': list()}
+    for section, data, arrays in DeformerWeightsReader(file_path).walk(read_weight_points=False):
+        if section == 'shape':
+            header_data['shapes'].append(data)
+        elif section == 'weights':
+            header_data['weights'].append(data)
+        elif section != 'weights_chunk':
+            header_data[section] = data
+
+    return header_data
+
+
+def iter_deformer_weights(file_path, buffer_size=4 << 20):
+    """
+    Iterate the weights of a cmds.deformerWeights JSON file as sparse chunks, an influence can be split in several
+    chunks. The memory used is bounded by the buffer size
+
+    Args:
+        file_path (str): full path of the json file
+        buffer_size (int, optional): bytes read per chunk. Defaults to 4 << 20.
+
+    Yields:
+        tuple: (influence_index, influence_name, point_indices, values)
+    """
+    influence_index = 0
+    for section, data, arrays in DeformerWeightsReader(file_path, buffer_size).walk():
+        if section == 'weights_chunk':
+            yield influence_index, data['source'], arrays[0], arrays[1]
+        elif section == 'weights':
+            influence_index += 1
+
+
+def get_polygon_edges(polygon_counts, polygon_vertices):
+    """
+    Get the edges of polygons given as vertex counts and a flat vertex list, like MFnMesh.getVertices returns.
+    Shared edges are repeated, get_edge_adjacency merges them
+
+    Args:
+        polygon_counts (list): vertex count of each polygon
+        polygon_vertices (list): vertices of all the polygons
+
+    Returns:
+        np.ndarray: (edge_count, 2) vertex indices
+    """
+    polygon_counts = np.asarray(polygon_counts, dtype=np.int64)
+    polygon_vertices = np.asarray(polygon_vertices, dtype=np.int64)
+
+    # Each vertex connects with the next one of its polygon, the last one with the first one
+    polygon_starts = np.cumsum(polygon_counts) - polygon_counts
+    next_positions = np.arange(len(polygon_vertices)) + 1
+    next_positions[polygon_starts + polygon_counts - 1] = polygon_starts
+
+    return np.stack([polygon_vertices, polygon_vertices[next_positions]], axis=1)
+
+
+def get_edge_adjacency(edges, point_count):
+    """
+    Get the point neighbours from a list of edges as CSR arrays, point i neighbours are
+    indices[indptr[i]:indptr[i + 1]]
+
+    Args:
+        edges (np.ndarray): (edge_count, 2) point indices, repeated edges and both directions are merged
+        point_count (int): number of points
+
+    Returns:
+        tuple: (indptr, indices)
+    """
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    columns = np.concatenate([edges[:, 1], edges[:, 0]])
+    key = np.unique(rows * point_count + columns)
+    rows, columns = key // point_count, key % point_count
+
+    indptr = np.zeros(point_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=point_count), out=indptr[1:])
+
+    return indptr, columns
+
+
+def get_manifest_path(file_path):
+    """
+    Get the delta manifest sidecar of a skin weights npz file
+
+    Args:
+        file_path (str): full path of the base npz file
+
+    Returns:
+        str: manifest path
+    """
+    return f'{os.path.splitext(file_path)[0]}.{manifest_extension}'
+
+
+def is_patch_file(file_path):
+    """
+    Check if the file is a delta patch file
+
+    Args:
+        file_path (str): file path
+
+    Returns:
+        bool: True if it is a patch file
+    """
+    return re.search(rf'\.{patch_tag}\d+\.{npz_extension}$', file_path) is not None
+
+
+def read_manifest(file_path):
+    """
+    Read the delta manifest of a skin weights npz file
+
+    Args:
+        file_path (str): full path of the base npz file
+
+    Returns:
+        dict: manifest, None if the file has no manifest
+    """
+    manifest_path = get_manifest_path(file_path)
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path, 'r') as read_file:
+        return json.load(read_file)
+
+
+def write_manifest(file_path, manifest):
+    """
+    Write the delta manifest of a skin weights npz file, the file is replaced once it is complete
+
+    Args:
+        file_path (str): full path of the base npz file
+        manifest (dict): manifest data
+    """
+    manifest_path = get_manifest_path(file_path)
+    with open(f'{manifest_path}.tmp', 'w') as write_file:
+        json.dump(manifest, write_file, indent=4)
+    os.replace(f'{manifest_path}.tmp', manifest_path)
+
+
+def remove_skin_weights_delta(file_path):
+    """
+    Remove the delta manifest of a skin weights npz file and its patch files
+
+    Args:
+        file_path (str): full path of the base npz file
+
+    Returns:
+        int: number of patch files removed
+    """
+    manifest = read_manifest(file_path)
+    if manifest is None:
+        return 0
+
+    # The manifest goes first, a base without manifest is loaded as it is
+    os.remove(get_manifest_path(file_path))
+    removed_count = 0
+    for patch_file in manifest['patches']:
+        patch_path = os.path.join(os.path.dirname(file_path), patch_file)
+        if os.path.exists(patch_path):
+            os.remove(patch_path)
+            removed_count += 1
+
+    return removed_count
+
+
+def save_patch(skin_weights, point_indices, file_path):
+    """
+    Save the weights of some points to a patch npz file
+
+    Args:
+        skin_weights (SkinWeights): weights of the points
+        point_indices (np.ndarray): point index in the base weights of each point
+        file_path (str): full path of the patch file
+
+    Returns:
+        str: file path
+    """
+    with open(file_path, 'wb') as write_file:
+        np.savez_compressed(write_file,
+                            version=np.array(npz_version, dtype=np.int32),
+                            point_indices=np.asarray(point_indices, dtype=np.int64),
+                            indptr=skin_weights.indptr,
+                            indices=skin_weights.indices,
+                            values=skin_weights.values,
+                            influences=np.array(skin_weights.influences, dtype=np.str_))
+
+    return file_path
+
+
+def load_patch(file_path):
+    """
+    Load a patch npz file
+
+    Args:
+        file_path (str): full path of the patch file
+
+    Returns:
+        tuple: (point_indices, SkinWeights)
+    """
+    with np.load(file_path, allow_pickle=False) as data:
+        return data['point_indices'], SkinWeights(indptr=data['indptr'],
+                                                  indices=data['indices'],
+                                                  values=data['values'],
+                                                  influences=data['influences'].tolist())
+
+
+def write_skin_weights_delta(skin_weights, file_path, block_size=delta_block_size):
+    """
+    Write the weights as a delta of the previous export. The points are hashed in blocks against the manifest
+    sidecar and only the changed blocks are written to a new patch file. A new base file is written when there is no
+    previous export, the point count, the point positions or the triangles changed, or influences were removed or
+    reordered, the patches only store weights
+
+    Args:
+        skin_weights (SkinWeights): sparse weights
+        file_path (str): full path of the base npz file
+        block_size (int, optional): points per block, only used for new base files. Defaults to delta_block_size.
+
+    Returns:
+        dict: {'file': base path, 'patch': patch path or None, 'changed_blocks': int, 'block_count': int,
+               'write_time': seconds, 'size': bytes written}
+    """
+    start_time = time.perf_counter()
+    manifest = read_manifest(file_path)
+    geometry_hash = skin_weights.get_geometry_hash()
+
+    if manifest and os.path.exists(file_path) and manifest['point_count'] == skin_weights.get_point_count() \
+            and manifest.get('geometry_hash') == geometry_hash \
+            and skin_weights.influences[:len(manifest['influences'])] == manifest['influences']:
+        block_size = manifest['block_size']
+    else:
+        manifest = None
+
+    hash_list = skin_weights.get_block_hashes(block_size)
+
+    # New base file, save removes the patch chain
+    if manifest is None:
+        skin_weights.save(file_path)
+        write_manifest(file_path, {'version': npz_version,
+                                   'block_size': block_size,
+                                   'point_count': skin_weights.get_point_count(),
+                                   'influences': skin_weights.influences,
+                                   'geometry_hash': geometry_hash,
+                                   'hashes': hash_list,
+                                   'patches': list()})
+
+        return {'file': file_path,
+                'patch': None,
+                'changed_blocks': len(hash_list),
+                'block_count': len(hash_list),
+                'write_time': time.perf_counter() - start_time,
+                'size': os.path.getsize(file_path)}
+
+    changed_blocks = [i for i, (new, old) in enumerate(zip(hash_list, manifest['hashes'])) if new != old]
+    patch_path = None
+    size = 0
+    if changed_blocks:
+        point_indices = np.concatenate([np.arange(i * block_size,
+                                                  min((i + 1) * block_size, skin_weights.get_point_count()))
+                                        for i in changed_blocks])
+        patch_path = '{}.{}{:03d}.{}'.format(os.path.splitext(file_path)[0], patch_tag,
+                                             len(manifest['patches']) + 1, npz_extension)
+        save_patch(skin_weights.take_points(point_indices), point_indices, patch_path)
+        size = os.path.getsize(patch_path)
+
+        manifest['influences'] = skin_weights.influences
+        manifest['hashes'] = hash_list
+        manifest['patches'].append(os.path.basename(patch_path))
+        write_manifest(file_path, manifest)
+
+    return {'file': file_path,
+            'patch': patch_path,
+            'changed_blocks': len(changed_blocks),
+            'block_count': len(hash_list),
+            'write_time': time.perf_counter() - start_time,
+            'size': size}
+
+
+def load_skin_weights_delta(file_path):
+    """
+    Load a skin weights npz file applying its patch chain in order, files without manifest are loaded as they are
+
+    Args:
+        file_path (str): full path of the base npz file
+
+    Returns:
+        SkinWeights: sparse weights
+    """
+    skin_weights = SkinWeights.load(file_path)
+
+    manifest = read_manifest(file_path)
+    if manifest:
+        for patch_file in manifest['patches']:
+            point_indices, patch_weights = load_patch(os.path.join(os.path.dirname(file_path), patch_file))
+            skin_weights = skin_weights.replace_points(point_indices, patch_weights)
+
+    return skin_weights
+
+
+def compact_skin_weights_delta(file_path):
+    """
+    Fold the patch chain of a skin weights npz file back into the base file
+
+    Args:
+        file_path (str): full path of the base npz file
+
+    Returns:
+        int: number of patches folded
+    """
+    manifest = read_manifest(file_path)
+    if not manifest or not manifest['patches']:
+        return 0
+
+    # save removes the manifest and the patches, the manifest is written again without them
+    skin_weights = load_skin_weights_delta(file_path)
+    skin_weights.save(file_path)
+
+    patch_count = len(manifest['patches'])
+    manifest['influences'] = skin_weights.influences
+    manifest['patches'] = list()
+    write_manifest(file_path, manifest)
+
+    return patch_count
@@ -0,0 +1,534 @@
+# Imports
+import os
+
+import numpy as np
+
+# Cache of the spatial indices built for the source files, {(path, mtime, size): SpatialIndex}
+spatial_index_cache = dict()
+
+
+class SpatialIndex(object):
+    """
+    Uniform grid over a point cloud, with optional triangles, to query closest points vectorized over all the query
+    points with NumPy only
+
+    The points are sorted by cell id, so the points of any cell are a contiguous slice found with searchsorted.
+    The queries look at rings of cells around the query cell until the k-th best distance is closer than any
+    point in the rings not visited yet.
+
+    Args:
+        points (np.ndarray): (point_count, 3) positions
+        triangles (np.ndarray, optional): (triangle_count, 3) point indices. Defaults to None.
+        points_per_cell (float, optional): average points per cell. Defaults to 2.0.
+        chunk_size (int, optional): query points processed at once, bounds the memory. Defaults to 65536.
+    """
+    max_cells_per_axis = 1 << 20
+
+    def __init__(self, points, triangles=None, points_per_cell=2.0, chunk_size=65536):
+        """
+        Initializes an instance of SpatialIndex
+
+        Args:
+            points (np.ndarray): (point_count, 3) positions
+            triangles (np.ndarray, optional): (triangle_count, 3) point indices. Defaults to None.
+            points_per_cell (float, optional): average points per cell. Defaults to 2.0.
+            chunk_size (int, optional): query points processed at once, bounds the memory. Defaults to 65536.
+        """
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.triangles = None if triangles is None else np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        self.chunk_size = chunk_size
+
+        if not len(self.points):
+            raise ValueError('the spatial index needs at least one point')
+
+        # Cell size from the extent of the axes that are not flat, so planes and curves get sensible cells
+        self.origin = self.points.min(axis=0)
+        extent = self.points.max(axis=0) - self.origin
+        max_extent = extent.max()
+        used_extent = extent[extent > max_extent * 1e-3] if max_extent > 0 else np.ones(1)
+        self.cell_size = float((np.prod(used_extent) * points_per_cell / len(self.points)) ** (1.0 / len(used_extent)))
+        self.cell_size = max(self.cell_size, float(max_extent) / self.max_cells_per_axis, 1e-12)
+        self.dimensions = np.minimum(np.floor(extent / self.cell_size).astype(np.int64) + 1, self.max_cells_per_axis)
+
+        cell_ids = self.get_cell_ids(self.get_cell_coordinates(self.points))
+        self.order = np.argsort(cell_ids, kind='stable')
+        self.sorted_cell_ids = cell_ids[self.order]
+
+        # Start of every cell in the sorted points, only when the grid is not much bigger than the points
+        self.cell_starts = None
+        cell_count = int(np.prod(self.dimensions))
+        if cell_count <= max(8 * len(self.points), 1 << 16):
+            self.cell_starts = np.searchsorted(self.sorted_cell_ids, np.arange(cell_count + 1))
+
+        # Point to triangle adjacency as CSR arrays
+        self.triangle_indptr = None
+        self.triangle_indices = None
+        if self.triangles is not None:
+            vertex_list = self.triangles.ravel()
+            vertex_order = np.argsort(vertex_list, kind='stable')
+            self.triangle_indices = vertex_order // 3
+            self.triangle_indptr = np.zeros(len(self.points) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(vertex_list, minlength=len(self.points)), out=self.triangle_indptr[1:])
+
+
+    # ---------- Grid methods ----------
+    def get_cell_coordinates(self, points):
+        """
+        Get the cell of each point, points outside of the grid are clamped to the border cells
+
+        Args:
+            points (np.ndarray): (n, 3) positions
+
+        Returns:
+            np.ndarray: (n, 3) int64 cell coordinates
+        """
+        coordinates = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+
+        return np.clip(coordinates, 0, self.dimensions - 1)
+
+
+    def get_cell_ids(self, coordinates):
+        """
+        Get the linear id of the cell coordinates
+
+        Args:
+            coordinates (np.ndarray): (n, 3) cell coordinates
+
+        Returns:
+            np.ndarray: (n,) cell ids
+        """
+        return (coordinates[:, 0] * self.dimensions[1] + coordinates[:, 1]) * self.dimensions[2] + coordinates[:, 2]
+
+
+    def get_ring_offsets(self, ring):
+        """
+        Get the cell offsets at a Chebyshev distance of ring cells, the offsets longer than the grid are skipped
+
+        Args:
+            ring (int): ring distance
+
+        Returns:
+            np.ndarray: (offset_count, 3) offsets
+        """
+        axis_ranges = [np.arange(-min(ring, x - 1), min(ring, x - 1) + 1) for x in self.dimensions]
+        offsets = np.stack(np.meshgrid(*axis_ranges, indexing='ij'), axis=-1).reshape(-1, 3)
+
+        return offsets[np.abs(offsets).max(axis=1) == ring]
+
+
+    @staticmethod
+    def expand_slices(starts, counts):
+        """
+        Concatenate the ranges start:start + count
+
+        Args:
+            starts (np.ndarray): range starts
+            counts (np.ndarray): range lengths
+
+        Returns:
+            np.ndarray: concatenated ranges
+        """
+        total = counts.sum()
+        offsets = np.repeat(np.cumsum(counts) - counts, counts)
+
+        return np.repeat(starts, counts) + np.arange(total) - offsets
+
+
+    @staticmethod
+    def get_group_columns(group_ids, group_count):
+        """
+        Get the column of each entry when the entries of each group are laid out in one row of a matrix
+
+        Args:
+            group_ids (np.ndarray): sorted group of each entry
+            group_count (int): number of groups
+
+        Returns:
+            tuple: (columns, matrix width)
+        """
+        group_sizes = np.bincount(group_ids, minlength=group_count)
+        columns = np.arange(len(group_ids)) - np.repeat(np.cumsum(group_sizes) - group_sizes, group_sizes)
+
+        return columns, int(group_sizes.max(initial=0))
+
+
+    # ---------- Query methods ----------
+    def query(self, query_points, k=1):
+        """
+        Get the k closest points of each query point
+
+        Args:
+            query_points (np.ndarray): (m, 3) positions
+            k (int, optional): closest points per query point. Defaults to 1.
+
+        Returns:
+            tuple: (distances (m, k), point indices (m, k)), sorted from the closest
+        """
+        query_points = np.asarray(query_points, dtype=np.float64).reshape(-1, 3)
+        k = min(k, len(self.points))
+
+        distances = np.empty((len(query_points), k), dtype=np.float64)
+        indices = np.empty((len(query_points), k), dtype=np.int64)
+        for start in range(0, len(query_points), self.chunk_size):
+            end = start + self.chunk_size
+            distances[start:end], indices[start:end] = self.query_chunk(query_points[start:end], k)
+
+        return distances, indices
+
+
+    def query_chunk(self, query_points, k):
+        """
+        Get the k closest points of a chunk of query points
+
+        Args:
+            query_points (np.ndarray): (m, 3) positions
+            k (int): closest points per query point
+
+        Returns:
+            tuple: (distances (m, k), point indices (m, k))
+        """
+        query_count = len(query_points)
+        best_distances = np.full((query_count, k), np.inf)
+        best_indices = np.full((query_count, k), -1, dtype=np.int64)
+        query_cells = self.get_cell_coordinates(query_points)
+        # Distance of the query points outside of the grid, every point is at least this far
+        outside_distances = np.linalg.norm(np.maximum(self.origin - query_points, 0) +
+                                           np.maximum(query_points - (self.origin + self.dimensions * self.cell_size),
+                                                      0), axis=1)
+
+        active = np.arange(query_count)
+        for ring in range(int(self.dimensions.max()) + 1):
+            offsets = self.get_ring_offsets(ring)
+            cells = query_cells[active][:, None, :] + offsets[None, :, :]
+            valid = np.all((cells >= 0) & (cells < self.dimensions), axis=2)
+            local_ids, offset_ids = np.nonzero(valid)
+
+            cell_ids = self.get_cell_ids(cells[local_ids, offset_ids])
+            if self.cell_starts is None:
+                starts = np.searchsorted(self.sorted_cell_ids, cell_ids, side='left')
+                counts = np.searchsorted(self.sorted_cell_ids, cell_ids, side='right') - starts
+            else:
+                starts = self.cell_starts[cell_ids]
+                counts = self.cell_starts[cell_ids + 1] - starts
+
+            candidate_groups = np.repeat(local_ids, counts)
+            candidate_indices = self.order[self.expand_slices(starts, counts)]
+            candidate_distances = np.linalg.norm(query_points[active[candidate_groups]] -
+                                                 self.points[candidate_indices], axis=1)
+
+            # Merge the candidates with the current best points, one row per query point padded with inf
+            columns, width = self.get_group_columns(candidate_groups, len(active))
+            distance_matrix = np.full((len(active), k + width), np.inf)
+            index_matrix = np.full((len(active), k + width), -1, dtype=np.int64)
+            distance_matrix[:, :k] = best_distances[active]
+            index_matrix[:, :k] = best_indices[active]
+            distance_matrix[candidate_groups, columns + k] = candidate_distances
+            index_matrix[candidate_groups, columns + k] = candidate_indices
+
+            if width:
+                best_columns = np.argpartition(distance_matrix, k - 1, axis=1)[:, :k]
+                best_order = np.argsort(np.take_along_axis(distance_matrix, best_columns, axis=1), axis=1)
+                best_columns = np.take_along_axis(best_columns, best_order, axis=1)
+                best_distances[active] = np.take_along_axis(distance_matrix, best_columns, axis=1)
+                best_indices[active] = np.take_along_axis(index_matrix, best_columns, axis=1)
+
+            # Unvisited cells are at least ring * cell_size away inside the grid
+            bound = np.hypot(outside_distances[active], ring * self.cell_size)
+            active = active[best_distances[active, -1] > bound]
+            if not len(active):
+                break
+
+        return best_distances, best_indices
+
+
+    def get_nearest_weights(self, query_points):
+        """
+        Interpolation weights of the closest point
+
+        Args:
+            query_points (np.ndarray): (m, 3) positions
+
+        Returns:
+            tuple: (point indices (m, 1), coefficients (m, 1))
+        """
+        distances, indices = self.query(query_points, k=1)
+
+        return indices, np.ones(indices.shape, dtype=np.float64)
+
+
+    def get_inverse_distance_weights(self, query_points, k=4, power=2.0, tolerance=1e-9):
+        """
+        Interpolation weights of the k closest points by inverse distance, query points on top of a point only
+        take that point
+
+        Args:
+            query_points (np.ndarray): (m, 3) positions
+            k (int, optional): closest points per query point. Defaults to 4.
+            power (float, optional): distance power. Defaults to 2.0.
+            tolerance (float, optional): distances lower than this are taken as a match. Defaults to 1e-9.
+
+        Returns:
+            tuple: (point indices (m, k), coefficients (m, k))
+        """
+        distances, indices = self.query(query_points, k=k)
+
+        with np.errstate(divide='ignore'):
+            coefficients = 1.0 / np.maximum(distances, tolerance) ** power
+        exact = distances[:, 0] < tolerance
+        coefficients[exact] = 0.0
+        coefficients[exact, 0] = 1.0
+
+        return indices, coefficients / coefficients.sum(axis=1, keepdims=True)
+
+
+    def get_rbf_weights(self, query_points, k=8, smoothing=1e-6):
+        """
+        Interpolation weights of a local radial basis function on the k closest points. The kernel is multiquadric,
+        shaped by the median distance to the closest points, with a constant term, so constant values are kept
+
+        Args:
+            query_points (np.ndarray): (m, 3) positions
+            k (int, optional): closest points per query point. Defaults to 8.
+            smoothing (float, optional): regularization relative to the kernel shape, keeps the systems of
+                                         overlapping points solvable. Defaults to 1e-6.
+
+        Returns:
+            tuple: (point indices (m, k), coefficients (m, k))
+        """
+        query_points = np.asarray(query_points, dtype=np.float64).reshape(-1, 3)
+        k = min(k, len(self.points))
+
+        indices = np.empty((len(query_points), k), dtype=np.int64)
+        coefficients = np.empty((len(query_points), k), dtype=np.float64)
+        for start in range(0, len(query_points), self.chunk_size):
+            end = start + self.chunk_size
+            indices[start:end], coefficients[start:end] = self.get_rbf_weights_chunk(query_points[start:end], k,
+                                                                                    smoothing)
+
+        return indices, coefficients
+
+
+    def get_rbf_weights_chunk(self, query_points, k, smoothing):
+        """
+        Interpolation weights of a local radial basis function for a chunk of query points
+
+        Args:
+            query_points (np.ndarray): (m, 3) positions
+            k (int): closest points per query point
+            smoothing (float): regularization relative to the kernel shape
+
+        Returns:
+            tuple: (point indices (m, k), coefficients (m, k))
+        """
+        distances, indices = self.query(query_points, k=k)
+        neighbour_points = self.points[indices]
+        shapes = np.maximum(np.median(distances, axis=1), 1e-9)[:, None]
+
+        # [[kernel, 1], [1, 0]] systems, one per query point
+        pair_distances = np.linalg.norm(neighbour_points[:, :, None] - neighbour_points[:, None], axis=3)
+        systems = np.zeros((len(query_points), k + 1, k + 1), dtype=np.float64)
+        systems[:, :k, :k] = np.sqrt(pair_distances ** 2 + shapes[:, :, None] ** 2) + \
+            np.eye(k) * smoothing * shapes[:, :, None]
+        systems[:, :k, k] = 1.0
+        systems[:, k, :k] = 1.0
+
+        values = np.ones((len(query_points), k + 1), dtype=np.float64)
+        values[:, :k] = np.sqrt(distances ** 2 + shapes ** 2)
+
+        return indices, np.linalg.solve(systems, values[:, :, None])[:, :k, 0]
+
+
+    def get_barycentric_weights(self, query_points, candidate_count=4):
+        """
+        Interpolation weights of the closest point on the triangles, the triangles searched are the ones around
+        the candidate_count closest points
+
+        Args:
+            query_points (np.ndarray): (m, 3) positions
+            candidate_count (int, optional): closest points whose triangles are searched. Defaults to 4.
+
+        Returns:
+            tuple: (point indices (m, 3), barycentric coefficients (m, 3))
+        """
+        if self.triangles is None:
+            raise ValueError('the spatial index has no triangles')
+
+        query_points = np.asarray(query_points, dtype=np.float64).reshape(-1, 3)
+        indices = np.empty((len(query_points), 3), dtype=np.int64)
+        coefficients = np.empty((len(query_points), 3), dtype=np.float64)
+        for start in range(0, len(query_points), self.chunk_size):
+            end = start + self.chunk_size
+            indices[start:end], coefficients[start:end] = self.get_barycentric_weights_chunk(query_points[start:end],
+                                                                                            candidate_count)
+
+        return indices, coefficients
+
+
+    def get_barycentric_weights_chunk(self, query_points, candidate_count):
+        """
+        Interpolation weights of the closest point on the triangles for a chunk of query points
+
+        Args:
+            query_points (np.ndarray): (m, 3) positions
+            candidate_count (int): closest points whose triangles are searched
+
+        Returns:
+            tuple: (point indices (m, 3), barycentric coefficients (m, 3))
+        """
+        distances, point_indices = self.query(query_points, k=candidate_count)
+
+        # Triangles around the candidate points, repeated triangles are harmless
+        point_list = point_indices.ravel()
+        starts = self.triangle_indptr[point_list]
+        counts = self.triangle_indptr[point_list + 1] - starts
+        query_ids = np.repeat(np.repeat(np.arange(len(query_points)), point_indices.shape[1]), counts)
+        triangle_ids = self.triangle_indices[self.expand_slices(starts, counts)]
+
+        triangle_points = self.points[self.triangles[triangle_ids]]
+        closest_points, barycentric = get_closest_points_on_triangles(query_points[query_ids],
+                                                                      triangle_points[:, 0],
+                                                                      triangle_points[:, 1],
+                                                                      triangle_points[:, 2])
+        triangle_distances = np.linalg.norm(query_points[query_ids] - closest_points, axis=1)
+
+        # Points without triangles keep the closest point
+        indices = np.repeat(point_indices[:, :1], 3, axis=1)
+        coefficients = np.zeros((len(query_points), 3), dtype=np.float64)
+        coefficients[:, 0] = 1.0
+
+        columns, width = self.get_group_columns(query_ids, len(query_points))
+        distance_matrix = np.full((len(query_points), width), np.inf)
+        distance_matrix[query_ids, columns] = triangle_distances
+        position_matrix = np.full((len(query_points), width), -1, dtype=np.int64)
+        position_matrix[query_ids, columns] = np.arange(len(query_ids))
+
+        keep = position_matrix[np.arange(len(query_points)), np.argmin(distance_matrix, axis=1)] if width else []
+        keep = np.asarray(keep, dtype=np.int64)
+        keep = keep[keep >= 0]
+        indices[query_ids[keep]] = self.triangles[triangle_ids[keep]]
+        coefficients[query_ids[keep]] = barycentric[keep]
+
+        return indices, coefficients
+
+
+def get_closest_points_on_triangles(points, a, b, c):
+    """
+    Closest point on each triangle to each point, vectorized version of the region tests of
+    Ericson, Real-Time Collision Detection 5.1.5
+
+    Args:
+        points (np.ndarray): (n, 3) positions
+        a (np.ndarray): (n, 3) first triangle points
+        b (np.ndarray): (n, 3) second triangle points
+        c (np.ndarray): (n, 3) third triangle points
+
+    Returns:
+        tuple: (closest points (n, 3), barycentric coordinates (n, 3))
+    """
+    def dot(x, y):
+        return np.einsum('ij,ij->i', x, y)
+
+    ab = b - a
+    ac = c - a
+    ap = points - a
+    bp = points - b
+    cp = points - c
+    d1, d2 = dot(ab, ap), dot(ac, ap)
+    d3, d4 = dot(ab, bp), dot(ac, bp)
+    d5, d6 = dot(ab, cp), dot(ac, cp)
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    def divide(x, y):
+        return np.divide(x, y, out=np.zeros_like(x), where=y != 0)
+
+    # Inside the face, the regions are applied from the last test to the first so the first one wins
+    denominator = va + vb + vc
+    v = divide(vb, denominator)
+    w = divide(vc, denominator)
+    barycentric = np.stack([1.0 - v - w, v, w], axis=1)
+
+    region_list = [((va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0), 'bc', divide(d4 - d3, (d4 - d3) + (d5 - d6))),
+                   ((vb <= 0) & (d2 >= 0) & (d6 <= 0), 'ac', divide(d2, d2 - d6)),
+                   ((d6 >= 0) & (d5 <= d6), 'c', None),
+                   ((vc <= 0) & (d1 >= 0) & (d3 <= 0), 'ab', divide(d1, d1 - d3)),
+                   ((d3 >= 0) & (d4 <= d3), 'b', None),
+                   ((d1 <= 0) & (d2 <= 0), 'a', None)]
+    for mask, region, t in region_list:
+        if region == 'bc':
+            region_barycentric = np.stack([np.zeros_like(t), 1.0 - t, t], axis=1)
+        elif region == 'ac':
+            region_barycentric = np.stack([1.0 - t, np.zeros_like(t), t], axis=1)
+        elif region == 'ab':
+            region_barycentric = np.stack([1.0 - t, t, np.zeros_like(t)], axis=1)
+        else:
+            region_barycentric = np.zeros_like(barycentric)
+            region_barycentric[:, 'abc'.index(region)] = 1.0
+        barycentric[mask] = region_barycentric[mask]
+
+    closest_points = barycentric[:, :1] * a + barycentric[:, 1:2] * b + barycentric[:, 2:] * c
+
+    return closest_points, barycentric
+
+
+def get_closest_segments(points, starts, ends, chunk_size=65536):
+    """
+    Closest segment to each point, the segments with the same start and end are points
+
+    Args:
+        points (np.ndarray): (n, 3) positions
+        starts (np.ndarray): (segment_count, 3) segment starts
+        ends (np.ndarray): (segment_count, 3) segment ends
+        chunk_size (int, optional): points processed at once, bounds the memory. Defaults to 65536.
+
+    Returns:
+        tuple: (distances (n,), segment indices (n,))
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 3)
+    directions = np.asarray(ends, dtype=np.float64).reshape(-1, 3) - starts
+    lengths = np.einsum('ij,ij->i', directions, directions)
+    distances = np.empty(len(points), dtype=np.float64)
+    indices = np.empty(len(points), dtype=np.int64)
+    for start in range(0, len(points), chunk_size):
+        end = start + chunk_size
+        offsets = points[start:end, None, :] - starts[None, :, :]
+        t = np.divide(np.einsum('ijk,jk->ij', offsets, directions), lengths, out=np.zeros(offsets.shape[:2]),
+                      where=lengths != 0)
+        offsets -= np.clip(t, 0.0, 1.0)[:, :, None] * directions[None, :, :]
+        squared_distances = np.einsum('ijk,ijk->ij', offsets, offsets)
+        indices[start:end] = np.argmin(squared_distances, axis=1)
+        distances[start:end] = np.sqrt(squared_distances[np.arange(len(offsets)), indices[start:end]])
+
+    return distances, indices
+
+
+def get_cached_spatial_index(file_path, points, triangles=None):
+    """
+    Get the spatial index of the points of a file, the index is built once per file version and reused
+
+    Args:
+        file_path (str): source file of the points
+        points (np.ndarray): (point_count, 3) positions
+        triangles (np.ndarray, optional): (triangle_count, 3) point indices. Defaults to None.
+
+    Returns:
+        SpatialIndex: spatial index
+    """
+    file_stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), file_stat.st_mtime_ns, file_stat.st_size)
+    if key not in spatial_index_cache:
+        # Older versions of the same file are dropped
+        for old_key in [x for x in spatial_index_cache if x[0] == key[0]]:
+            del spatial_index_cache[old_key]
+        spatial_index_cache[key] = SpatialIndex(points=points, triangles=triangles)
+
+    return spatial_index_cache[key]
+
+
+def clear_spatial_index_cache():
+    """
+    Remove all the cached spatial indices
+    """
+    spatial_index_cache.clear()
@@ -0,0 +1,324 @@
+# Imports
+import io
+import json
+import lzma
+import zlib
+import struct
+
+import numpy as np
+
+# File format
+chunk_extension = 'chunk'
+chunk_version = 1
+chunk_magic = b'HSCHUNK\x00'
+compressions = ['zlib', 'lzma', 'none']
+# Uncompressed payloads start at multiples of this, so array chunks can be mapped with np.memmap
+chunk_alignment = 64
+
+# Chunk payload encodings
+json_encoding = 'json'
+npz_encoding = 'npz'
+array_encoding = 'array'
+
+# Arrays nested in the data are stored in their own chunks and replaced by {array_reference: chunk name}
+array_reference = '__array__'
+
+
+def compress(data, compression='zlib', level=None):
+    """
+    Compress bytes with a stdlib codec
+
+    Args:
+        data (bytes): raw bytes
+        compression (str, optional): 'zlib', 'lzma' or 'none'. Defaults to 'zlib'.
+        level (int, optional): compression level, None == codec default. Defaults to None.
+
+    Returns:
+        bytes: compressed bytes
+    """
+    if compression == 'zlib':
+        return zlib.compress(data, 6 if level is None else level)
+    elif compression == 'lzma':
+        return lzma.compress(data, preset=level)
+    elif compression == 'none':
+        return data
+
+    raise ValueError(f'{compression} is not a valid compression, {compressions}')
+
+
+def decompress(data, compression='zlib'):
+    """
+    Decompress bytes with a stdlib codec
+
+    Args:
+        data (bytes): compressed bytes
+        compression (str, optional): 'zlib', 'lzma' or 'none'. Defaults to 'zlib'.
+
+    Returns:
+        bytes: raw bytes
+    """
+    if compression == 'zlib':
+        return zlib.decompress(data)
+    elif compression == 'lzma':
+        return lzma.decompress(data)
+    elif compression == 'none':
+        return data
+
+    raise ValueError(f'{compression} is not a valid compression, {compressions}')
+
+
+def encode_chunk(data):
+    """
+    Encode chunk data to bytes, arrays as raw C ordered bytes, dictionaries of arrays as npz and everything else
+    as json
+
+    Args:
+        data (object): json serializable data, np.ndarray or dict of np.ndarray
+
+    Returns:
+        tuple: (bytes, encoding)
+    """
+    if isinstance(data, np.ndarray):
+        return np.ascontiguousarray(data).tobytes(), array_encoding
+
+    if isinstance(data, dict) and data and all(isinstance(x, np.ndarray) for x in data.values()):
+        buffer = io.BytesIO()
+        np.savez(buffer, **data)
+        return buffer.getvalue(), npz_encoding
+
+    return json.dumps(data, separators=(',', ':')).encode('utf-8'), json_encoding
+
+
+def decode_chunk(data, encoding, dtype=None, shape=None):
+    """
+    Decode chunk bytes
+
+    Args:
+        data (bytes): raw bytes
+        encoding (str): 'json', 'npz' or 'array'
+        dtype (str, optional): array only, numpy dtype string. Defaults to None.
+        shape (list, optional): array only, array shape. Defaults to None.
+
+    Returns:
+        object: chunk data
+    """
+    if encoding == array_encoding:
+        return np.frombuffer(data, dtype=np.dtype(dtype)).reshape(shape).copy()
+
+    if encoding == npz_encoding:
+        with np.load(io.BytesIO(data), allow_pickle=False) as npz_data:
+            return {key: npz_data[key] for key in npz_data.files}
+
+    return json.loads(data.decode('utf-8'))
+
+
+def is_chunk_file(file_path):
+    """
+    Check if the file is a chunk file
+
+    Args:
+        file_path (str): file path
+
+    Returns:
+        bool: True == chunk file
+    """
+    try:
+        with open(file_path, 'rb') as read_file:
+            return read_file.read(len(chunk_magic)) == chunk_magic
+    except OSError:
+        return False
+
+
+def pack_arrays(data, name, chunk_dict):
+    """
+    Move the arrays nested in dictionaries and lists to their own chunks, the arrays are replaced by references
+
+    Args:
+        data (object): data with np.ndarray values
+        name (str): chunk name of the data, the array chunks are named {name}/{key}/{key}...
+        chunk_dict (dict): {chunk name: data}, the array chunks are added to it
+
+    Returns:
+        object: data with the arrays replaced by {array_reference: chunk name}
+    """
+    if isinstance(data, np.ndarray):
+        chunk_dict[name] = data
+        return {array_reference: name}
+    if isinstance(data, dict):
+        return {key: pack_arrays(value, f'{name}/{key}', chunk_dict) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [pack_arrays(value, f'{name}/{i}', chunk_dict) for i, value in enumerate(data)]
+
+    return data
+
+
+def unpack_arrays(data, chunk_reader):
+    """
+    Replace the array references of the data with the array chunks
+
+    Args:
+        data (object): data read from a chunk
+        chunk_reader (ChunkFileReader): reader of the file, maps the arrays if it was opened with a mmap_mode
+
+    Returns:
+        object: data with np.ndarray values
+    """
+    if isinstance(data, dict):
+        if len(data) == 1 and array_reference in data:
+            return chunk_reader.read_chunk(data[array_reference])
+        return {key: unpack_arrays(value, chunk_reader) for key, value in data.items()}
+    if isinstance(data, list):
+        return [unpack_arrays(value, chunk_reader) for value in data]
+
+    return data
+
+
+def write_chunk_file(file_path, chunk_dict, metadata=None, compression='zlib', level=None):
+    """
+    Write a chunk file. The file is the magic bytes, the header size, a small json header with the metadata and
+    the offset of each chunk, and the compressed chunks, so each chunk can be read without reading the rest.
+    Uncompressed files have their payloads aligned, so the array chunks can be mapped with np.memmap
+
+    Args:
+        file_path (str): full path of the file
+        chunk_dict (dict): {chunk name: json serializable data, np.ndarray or dict of np.ndarray}
+        metadata (dict, optional): json serializable data stored in the header. Defaults to None.
+        compression (str, optional): 'zlib', 'lzma' or 'none'. Defaults to 'zlib'.
+        level (int, optional): compression level, None == codec default. Defaults to None.
+
+    Returns:
+        str: file path
+    """
+    chunk_header_dict = dict()
+    payload_list = list()
+    offset = 0
+    for name, data in chunk_dict.items():
+        raw_data, encoding = encode_chunk(data)
+        payload = compress(raw_data, compression=compression, level=level)
+        chunk_header_dict[name] = {'offset': offset, 'size': len(payload), 'raw_size': len(raw_data),
+                                   'encoding': encoding}
+        if encoding == array_encoding:
+            chunk_header_dict[name].update({'dtype': data.dtype.str, 'shape': list(data.shape)})
+        payload_list.append(payload)
+        offset += len(payload)
+
+        padding = -offset % chunk_alignment if compression == 'none' else 0
+        payload_list.append(b'\0' * padding)
+        offset += padding
+
+    header = json.dumps({'version': chunk_version,
+                         'compression': compression,
+                         'metadata': metadata if metadata else dict(),
+                         'chunks': chunk_header_dict}, separators=(',', ':')).encode('utf-8')
+    # The payloads start aligned
+    header += b' ' * (-(len(chunk_magic) + 4 + len(header)) % chunk_alignment)
+
+    with open(file_path, 'wb') as write_file:
+        write_file.write(chunk_magic)
+        write_file.write(struct.pack('<I', len(header)))
+        write_file.write(header)
+        for payload in payload_list:
+            write_file.write(payload)
+
+    return file_path
+
+
+class ChunkFileReader(object):
+    """
+    Random access reader of chunk files, only the header is read when the file is opened.
+    With a mmap_mode the array chunks of uncompressed files are returned as np.memmap, so only the slices used are
+    read from disk
+
+    Args:
+        file_path (str): full path of the file
+        mmap_mode (str, optional): np.memmap mode, 'r', 'r+' or 'c', None == read the arrays. Defaults to None.
+    """
+    def __init__(self, file_path, mmap_mode=None):
+        """
+        Initializes an instance of ChunkFileReader
+
+        Args:
+            file_path (str): full path of the file
+            mmap_mode (str, optional): np.memmap mode, 'r', 'r+' or 'c', None == read the arrays. Defaults to None.
+        """
+        self.file_path = file_path
+        self.mmap_mode = mmap_mode
+
+        with open(file_path, 'rb') as read_file:
+            if read_file.read(len(chunk_magic)) != chunk_magic:
+                raise ValueError(f'{file_path} is not a chunk file')
+            header_size = struct.unpack('<I', read_file.read(4))[0]
+            self.header = json.loads(read_file.read(header_size).decode('utf-8'))
+        self.data_offset = len(chunk_magic) + 4 + header_size
+
+
+    def get_metadata(self):
+        """
+        Get the header metadata
+
+        Returns:
+            dict: metadata
+        """
+        return self.header['metadata']
+
+
+    def is_mappable(self):
+        """
+        Check if the array chunks can be mapped
+
+        Returns:
+            bool: True == uncompressed file
+        """
+        return self.header['compression'] == 'none'
+
+
+    def get_chunk_names(self):
+        """
+        Get the chunk names in file order
+
+        Returns:
+            list: chunk names
+        """
+        return list(self.header['chunks'])
+
+
+    def read_chunk(self, name):
+        """
+        Read and decode one chunk
+
+        Args:
+            name (str): chunk name
+
+        Returns:
+            object: chunk data
+        """
+        if name not in self.header['chunks']:
+            raise KeyError(f'{name} is not a chunk of {self.file_path}')
+
+        chunk_header = self.header['chunks'][name]
+        if chunk_header['encoding'] == array_encoding and self.mmap_mode and self.is_mappable() \
+                and chunk_header['size']:
+            return np.memmap(self.file_path, dtype=np.dtype(chunk_header['dtype']), mode=self.mmap_mode,
+                             offset=self.data_offset + chunk_header['offset'], shape=tuple(chunk_header['shape']))
+
+        with open(self.file_path, 'rb') as read_file:
+            read_file.seek(self.data_offset + chunk_header['offset'])
+            payload = read_file.read(chunk_header['size'])
+
+        return decode_chunk(decompress(payload, compression=self.header['compression']), chunk_header['encoding'],
+                            dtype=chunk_header.get('dtype'), shape=chunk_header.get('shape'))
+
+
+    def read_chunks(self, name_list=None):
+        """
+        Read and decode several chunks
+
+        Args:
+            name_list (list, optional): chunk names, None == all the chunks. Defaults to None.
+
+        Returns:
+            dict: {chunk name: chunk data}
+        """
+        name_list = self.get_chunk_names() if name_list is None else name_list
+
+        return {name: self.read_chunk(name) for name in name_list}
@@ -0,0 +1,249 @@
+# Imports
+import os
+import hashlib
+import logging
+from collections import deque
+
+import numpy as np
+
+# Project imports
+from hiddenStrings.libs import spatial_lib
+
+logging = logging.getLogger(__name__)
+
+# Symmetry methods
+positional = 'positional'
+topological = 'topological'
+symmetry_methods = [positional, topological]
+
+symmetry_extension = 'npz'
+axis_list = ['x', 'y', 'z']
+# Positional maps are cached by the point positions rounded to these decimals too
+points_hash_decimals = 4
+
+# {(dimensions, mirror dimension): symmetry map} of the point grids
+grid_symmetry_map_cache = dict()
+
+
+def get_topology_hash(polygon_counts, polygon_vertices):
+    """
+    Hash the topology of a mesh, meshes with the same polygons and vertex order get the same hash
+
+    Args:
+        polygon_counts (list): vertex count of each polygon
+        polygon_vertices (list): vertices of all the polygons
+
+    Returns:
+        str: hex digest
+    """
+    topology_hash = hashlib.blake2b(digest_size=16)
+    topology_hash.update(np.asarray(polygon_counts, dtype=np.int64).tobytes())
+    topology_hash.update(np.asarray(polygon_vertices, dtype=np.int64).tobytes())
+
+    return topology_hash.hexdigest()
+
+
+def get_points_hash(points, decimals=points_hash_decimals):
+    """
+    Hash the rounded positions of a point cloud, the positional symmetry maps depend on the shape and not only on
+    the topology
+
+    Args:
+        points (np.ndarray): (point_count, 3) positions
+        decimals (int, optional): decimals kept before hashing. Defaults to points_hash_decimals.
+
+    Returns:
+        str: hex digest
+    """
+    # Adding 0.0 turns -0.0 into 0.0, so both round to the same bytes
+    rounded_points = np.round(np.asarray(points, dtype=np.float64).reshape(-1, 3), decimals) + 0.0
+
+    return hashlib.blake2b(rounded_points.tobytes(), digest_size=16).hexdigest()
+
+
+def get_positional_symmetry_map(points, axis='x', tolerance=1e-3):
+    """
+    Get the symmetry map of a point cloud, each point is matched with the closest point to its mirrored position
+
+    Args:
+        points (np.ndarray): (point_count, 3) positions
+        axis (str, optional): mirror axis, 'x', 'y' or 'z'. Defaults to 'x'.
+        tolerance (float, optional): matches further than this are logged as asymmetric. Defaults to 1e-3.
+
+    Returns:
+        np.ndarray: (point_count,) opposite point of each point
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    mirrored_points = points.copy()
+    mirrored_points[:, axis_list.index(axis)] *= -1
+
+    distances, indices = spatial_lib.SpatialIndex(points).query(mirrored_points, k=1)
+    asymmetric_count = int(np.count_nonzero(distances[:, 0] > tolerance))
+    if asymmetric_count:
+        logging.warning(f'{asymmetric_count} points have no symmetric point closer than {tolerance}, '
+                        f'the closest one is used')
+
+    return indices[:, 0]
+
+
+def get_topological_symmetry_map(polygon_counts, polygon_vertices, seed_edge):
+    """
+    Get the symmetry map of a mesh walking the polygons from an edge on the symmetry plane. The faces at both
+    sides of each mirrored edge pair are matched with opposite winding
+
+    Args:
+        polygon_counts (list): vertex count of each polygon
+        polygon_vertices (list): vertices of all the polygons
+        seed_edge (tuple): (vertex, vertex) of an edge on the symmetry plane
+
+    Returns:
+        np.ndarray: (point_count,) opposite point of each point, -1 for points that were not reached
+    """
+    polygon_counts = np.asarray(polygon_counts, dtype=np.int64)
+    polygon_vertices = np.asarray(polygon_vertices, dtype=np.int64)
+    polygon_starts = np.cumsum(polygon_counts) - polygon_counts
+    polygon_list = [polygon_vertices[start:start + count].tolist()
+                    for start, count in zip(polygon_starts.tolist(), polygon_counts.tolist())]
+
+    # Half edge (from, to) -> (polygon, position of from)
+    half_edge_dict = dict()
+    for polygon_index, polygon in enumerate(polygon_list):
+        for position, vertex in enumerate(polygon):
+            half_edge_dict[(vertex, polygon[(position + 1) % len(polygon)])] = (polygon_index, position)
+
+    symmetry_map = np.full(polygon_vertices.max(initial=-1) + 1, -1, dtype=np.int64)
+    vertex_a, vertex_b = seed_edge
+    if (vertex_a, vertex_b) not in half_edge_dict or (vertex_b, vertex_a) not in half_edge_dict:
+        raise ValueError(f'{seed_edge} is not an edge between two polygons')
+    symmetry_map[vertex_a] = vertex_a
+    symmetry_map[vertex_b] = vertex_b
+
+    # Each item is a polygon pair with a matched half edge, the right half edge is the mirror of the left one
+    queue = deque([((vertex_a, vertex_b), (vertex_b, vertex_a))])
+    visited_set = set()
+    while queue:
+        left_half_edge, right_half_edge = queue.popleft()
+        left_polygon, left_position = half_edge_dict[left_half_edge]
+        right_polygon, right_position = half_edge_dict[right_half_edge]
+        if left_polygon in visited_set or right_polygon in visited_set:
+            continue
+        visited_set.update([left_polygon, right_polygon])
+
+        left_vertices = polygon_list[left_polygon]
+        right_vertices = polygon_list[right_polygon]
+        if len(left_vertices) != len(right_vertices):
+            raise ValueError(f'polygons {left_polygon} and {right_polygon} are not symmetric')
+
+        # Left forward from the half edge start, right backward from the half edge end
+        count = len(left_vertices)
+        left_loop = [left_vertices[(left_position + i) % count] for i in range(count)]
+        right_loop = [right_vertices[(right_position + 1 - i) % count] for i in range(count)]
+        for left_vertex, right_vertex in zip(left_loop, right_loop):
+            symmetry_map[left_vertex] = right_vertex
+            symmetry_map[right_vertex] = left_vertex
+
+        # Neighbour polygons across every edge
+        for i in range(count):
+            left_edge = (left_loop[(i + 1) % count], left_loop[i])
+            right_edge = (right_loop[i], right_loop[(i + 1) % count])
+            if left_edge in half_edge_dict and right_edge in half_edge_dict:
+                queue.append((left_edge, right_edge))
+
+    unmatched_count = int(np.count_nonzero(symmetry_map < 0))
+    if unmatched_count:
+        logging.warning(f'{unmatched_count} points were not reached from the seed edge')
+
+    return symmetry_map
+
+
+def get_grid_symmetry_map(dimensions, mirror_dimension=0):
+    """
+    Get the symmetry map of a grid of points, the cvs of curves and surfaces or the points of lattices. Each point is
+    matched with the point at the opposite index along the mirror dimension, the maps are cached by grid
+
+    Args:
+        dimensions (tuple): point count along each dimension
+        mirror_dimension (int, optional): dimension reversed by the mirror. Defaults to 0.
+
+    Returns:
+        np.ndarray: (point_count,) opposite point of each point, flat C order indices
+    """
+    key = (tuple(int(x) for x in dimensions), int(mirror_dimension))
+    if key not in grid_symmetry_map_cache:
+        grid = np.arange(int(np.prod(key[0]))).reshape(key[0])
+        grid_symmetry_map_cache[key] = np.flip(grid, axis=key[1]).ravel()
+
+    return grid_symmetry_map_cache[key]
+
+
+def get_symmetry_map_path(cache_path, topology_hash, method=positional, axis='x', points_hash=None,
+                          seed_vertices=None):
+    """
+    Get the cache file of a symmetry map
+
+    Args:
+        cache_path (str): cache folder
+        topology_hash (str): mesh topology hash
+        method (str, optional): 'positional' or 'topological'. Defaults to 'positional'.
+        axis (str, optional): mirror axis. Defaults to 'x'.
+        points_hash (str, optional): point positions hash, see get_points_hash, positional maps of re-sculpted
+                                     meshes get a new file. Defaults to None.
+        seed_vertices (tuple, optional): vertices of the seed edge, topological maps walked from another edge get
+                                         a new file. Defaults to None.
+
+    Returns:
+        str: file path
+    """
+    key = f'{topology_hash}_{points_hash}' if points_hash else topology_hash
+    if seed_vertices is not None:
+        key = f'{key}_{seed_vertices[0]}-{seed_vertices[1]}'
+
+    return os.path.join(cache_path, f'{key}_{method}_{axis}.{symmetry_extension}')
+
+
+def save_symmetry_map(file_path, symmetry_map, topology_hash, method=positional, axis='x'):
+    """
+    Save a symmetry map to the cache
+
+    Args:
+        file_path (str): full path of the file
+        symmetry_map (np.ndarray): opposite point of each point
+        topology_hash (str): mesh topology hash
+        method (str, optional): 'positional' or 'topological'. Defaults to 'positional'.
+        axis (str, optional): mirror axis. Defaults to 'x'.
+
+    Returns:
+        str: file path
+    """
+    if not os.path.exists(os.path.dirname(file_path)):
+        os.makedirs(os.path.dirname(file_path))
+
+    with open(file_path, 'wb') as write_file:
+        np.savez_compressed(write_file,
+                            symmetry_map=np.asarray(symmetry_map, dtype=np.int64),
+                            topology_hash=np.array(topology_hash, dtype=np.str_),
+                            method=np.array(method, dtype=np.str_),
+                            axis=np.array(axis, dtype=np.str_))
+
+    return file_path
+
+
+def load_symmetry_map(file_path, topology_hash=None):
+    """
+    Load a symmetry map from the cache
+
+    Args:
+        file_path (str): full path of the file
+        topology_hash (str, optional): expected topology hash, None == no check. Defaults to None.
+
+    Returns:
+        np.ndarray: opposite point of each point, None if the file does not exist or the topology does not match
+    """
+    if not os.path.exists(file_path):
+        return None
+
+    with np.load(file_path, allow_pickle=False) as data:
+        if topology_hash and str(data['topology_hash']) != topology_hash:
+            return None
+
+        return data['symmetry_map']
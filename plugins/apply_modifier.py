@@ -0,0 +1,124 @@
+# ----------------------------------------------------------------------------------------------------------------------
+# apply_modifier.py - maya command plug-in - PYTHON script
+#
+#
+# DESCRIPTION:
+# Run the MDGModifier/MDagModifier given to modifier_lib.apply_modifier as an undoable command, so the changes
+# batched in one modifier are undone and redone in one step. Any object with doIt and undoIt methods can be given,
+# like skin_lib.SkinWeightsModifier
+#
+#
+# REQUIRES:
+# Load the plug-in from the plug-in manager
+#
+#
+# USAGE:
+# modifier_lib.apply_modifier(modifier)
+#
+# please... do not delete the text above
+# ----------------------------------------------------------------------------------------------------------------------
+
+# Imports
+import sys
+
+
+# Maya imports
+from maya import cmds
+from maya.api import OpenMaya
+
+# Project imports
+from hiddenStrings.libs import modifier_lib
+
+
+command_name = modifier_lib.command_name
+
+
+class PluginCommand(OpenMaya.MPxCommand):
+    """
+    ApplyModifier pluginCommand class
+
+    Run the modifier pending in modifier_lib, the command keeps it to undo and redo the changes
+    """
+    def __init__(self):
+        OpenMaya.MPxCommand.__init__(self)
+
+        self.modifier = None
+
+
+    def doIt(self, *args):
+        """
+        Command script
+        """
+        self.modifier = modifier_lib.pop_modifier()
+        if self.modifier is None:
+            cmds.error(f'{command_name} has no modifier, use modifier_lib.apply_modifier')
+
+        self.modifier.doIt()
+
+
+    def redoIt(self):
+        """
+        Re-do the command
+
+        press "G" in maya
+        """
+        self.modifier.doIt()
+
+
+    def undoIt(self):
+        """
+        Un-do the command
+
+        press "Ctrl+Z" in maya
+        """
+        self.modifier.undoIt()
+
+
+    def isUndoable(self):
+        """
+        Without this, the above redoIt and undoIt will not be called
+        """
+        return True
+
+
+def command_creator():
+    """
+    Create the command
+    """
+    return PluginCommand()
+
+
+def maya_useNewAPI():
+    """
+    The presence of this function tells Maya that the plugin produces, and
+    expects to be passed, objects created using the Maya Python API 2.0.
+    """
+    pass
+
+
+def initializePlugin(plugin):
+    """
+    Try to load the plug-in, with:
+    command_name: name of the command, E.G. cmds.applyModifier()
+    command_creator: class that the command will call
+    """
+    author = 'Ivan Cuenca'
+    version = '1.0.0'
+
+    m_plugin = OpenMaya.MFnPlugin(plugin, author, version)
+
+    try:
+        m_plugin.registerCommand(command_name, command_creator)
+    except:  # noqa: E722
+        sys.stderr.write(f'Failed to register command: {command_name}')
+
+
+def uninitializePlugin(plugin):
+    """
+    Unload the plugin
+    """
+    m_plugin = OpenMaya.MFnPlugin(plugin)
+    try:
+        m_plugin.deregisterCommand(command_name)
+    except:  # noqa: E722
+        sys.stderr.write(f'Failed to de-register command: {command_name}')
@@ -0,0 +1,21 @@
+# Imports
+import os
+import sys
+import types
+
+# The repo root is the hiddenStrings package, its __init__ runs the Maya start-up. The package is registered
+# without it before pytest imports the root __init__, under its own name and under the checkout folder name that
+# pytest uses for the root package
+package_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if 'hiddenStrings' not in sys.modules:
+    hidden_strings_package = types.ModuleType('hiddenStrings')
+    hidden_strings_package.__path__ = [package_path]
+    hidden_strings_package.__file__ = os.path.join(package_path, '__init__.py')
+    sys.modules['hiddenStrings'] = hidden_strings_package
+sys.modules.setdefault(os.path.basename(package_path), sys.modules['hiddenStrings'])
+
+# Project imports
+from hiddenStrings.tests import maya_standin  # noqa: E402
+
+# The stand-in has to be installed before the libs import maya
+maya_standin.install()
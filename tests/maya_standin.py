@@ -0,0 +1,240 @@
+# Imports
+import sys
+import types
+import logging
+
+logging = logging.getLogger(__name__)
+
+
+class StandInModule(types.ModuleType):
+    """
+    Placeholder of a Maya module. Missing attributes are nested placeholders, so the libs that read Maya constants
+    when they are imported (OpenMaya.MSpace.kObject...) can be imported, and calling them raises NotImplementedError
+    """
+    def __getattr__(self, name):
+        """
+        Get a nested placeholder, created on first access
+
+        Args:
+            name (str): attribute name
+
+        Returns:
+            StandInModule: placeholder
+        """
+        if name.startswith('__'):
+            raise AttributeError(name)
+
+        placeholder = StandInModule(f'{self.__name__}.{name}')
+        setattr(self, name, placeholder)
+
+        return placeholder
+
+
+    def __call__(self, *args, **kwargs):
+        """
+        Placeholders are not callable outside of Maya
+        """
+        raise NotImplementedError(f'{self.__name__} is not available in the maya stand-in')
+
+
+class StandInCmds(StandInModule):
+    """
+    In-memory stand-in of maya.cmds for the data side benchmarks. It keeps a flat scene of named nodes with a type
+    and a parent, enough for the existence, type and hierarchy queries of the import and export paths
+    """
+    def __init__(self, name='maya.cmds'):
+        """
+        Initializes an instance of StandInCmds
+
+        Args:
+            name (str, optional): module name. Defaults to 'maya.cmds'.
+        """
+        super(StandInCmds, self).__init__(name)
+        self.node_dict = dict()
+
+
+    def createNode(self, node_type, name=None, parent=None, **kwargs):
+        """
+        Create a node, names are made unique with a number like Maya does
+
+        Args:
+            node_type (str): node type
+            name (str, optional): node name, None == node type. Defaults to None.
+            parent (str, optional): parent node. Defaults to None.
+
+        Returns:
+            str: node name
+        """
+        name = name if name else f'{node_type}1'
+        base_name = name.rstrip('0123456789') or name
+        index = 1
+        while name in self.node_dict:
+            name = f'{base_name}{index}'
+            index += 1
+        self.node_dict[name] = {'type': node_type, 'parent': parent}
+
+        return name
+
+
+    def objExists(self, node):
+        """
+        Check if the node exists
+
+        Args:
+            node (str): node name, the attribute of node.attribute is ignored
+
+        Returns:
+            bool: True == the node exists
+        """
+        return node.split('.')[0] in self.node_dict
+
+
+    def objectType(self, node, **kwargs):
+        """
+        Get the node type
+
+        Args:
+            node (str): node name
+
+        Returns:
+            str: node type
+        """
+        return self.node_dict[node]['type']
+
+
+    def ls(self, *args, type=None, **kwargs):
+        """
+        List the nodes given, or all the nodes if none is given, selection flags list nothing
+
+        Args:
+            type (str, optional): node type filter. Defaults to None.
+
+        Returns:
+            list: node names
+        """
+        if kwargs.get('selection') or kwargs.get('sl'):
+            return list()
+
+        node_list = list()
+        for node in args:
+            node_list.extend(node if isinstance(node, (list, tuple)) else [node])
+        node_list = [x for x in node_list if x in self.node_dict] if args else list(self.node_dict)
+
+        return [x for x in node_list if type is None or self.node_dict[x]['type'] == type]
+
+
+    def listRelatives(self, node, parent=False, **kwargs):
+        """
+        List the parent or the children of a node
+
+        Args:
+            node (str): node name
+            parent (bool, optional): True == parent, False == children. Defaults to False.
+
+        Returns:
+            list: node names, None if there is none like Maya
+        """
+        if parent:
+            node_list = [self.node_dict[node]['parent']] if self.node_dict[node]['parent'] else list()
+        else:
+            node_list = [name for name, data in self.node_dict.items() if data['parent'] == node]
+
+        return node_list if node_list else None
+
+
+    def delete(self, *args, **kwargs):
+        """
+        Delete the nodes given and their children
+        """
+        node_list = list()
+        for node in args:
+            node_list.extend(node if isinstance(node, (list, tuple)) else [node])
+        while node_list:
+            node = node_list.pop()
+            if node in self.node_dict:
+                del self.node_dict[node]
+                node_list.extend(name for name, data in self.node_dict.items() if data['parent'] == node)
+
+
+    def file(self, *args, **kwargs):
+        """
+        The stand-in scene is never saved
+
+        Returns:
+            str: empty scene name
+        """
+        return ''
+
+
+    @staticmethod
+    def error(message):
+        """
+        Raise the error like cmds.error
+
+        Args:
+            message (str): error message
+        """
+        raise RuntimeError(message)
+
+
+    @staticmethod
+    def warning(message):
+        """
+        Log the warning
+
+        Args:
+            message (str): warning message
+        """
+        logging.warning(message)
+
+
+def install():
+    """
+    Install the stand-in maya modules when Maya is not available, inside Maya nothing is done
+
+    Returns:
+        bool: True == the stand-in was installed
+    """
+    try:
+        from maya import cmds
+        if not isinstance(cmds, StandInModule):
+            return False
+    except ImportError:
+        pass
+
+    if isinstance(sys.modules.get('maya.cmds'), StandInCmds):
+        return True
+
+    maya_module = StandInModule('maya')
+    maya_module.__path__ = list()
+    api_module = StandInModule('maya.api')
+    api_module.__path__ = list()
+
+    module_dict = {'maya': maya_module,
+                   'maya.cmds': StandInCmds(),
+                   'maya.mel': StandInModule('maya.mel'),
+                   'maya.OpenMayaUI': StandInModule('maya.OpenMayaUI'),
+                   'maya.api': api_module,
+                   'maya.api.OpenMaya': StandInModule('maya.api.OpenMaya'),
+                   'maya.api.OpenMayaAnim': StandInModule('maya.api.OpenMayaAnim')}
+    for name, module in module_dict.items():
+        sys.modules[name] = module
+        parent_name, _, attribute = name.rpartition('.')
+        if parent_name:
+            setattr(module_dict[parent_name], attribute, module)
+
+    logging.info('Maya is not available, the in-memory stand-in is used.')
+
+    return True
+
+
+def get_cmds():
+    """
+    Get the installed maya.cmds stand-in
+
+    Returns:
+        StandInCmds: stand-in, None if Maya is available
+    """
+    cmds = sys.modules.get('maya.cmds')
+
+    return cmds if isinstance(cmds, StandInCmds) else None
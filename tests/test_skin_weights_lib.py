@@ -0,0 +1,348 @@
+# Imports
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+# Project imports
+from hiddenStrings.libs import skin_weights_lib
+
+
+def create_random_weights(point_count=200, influence_count=12, nonzero_count=6, seed=0):
+    """
+    Create normalized dense weights with nonzero_count random influences per point
+
+    Args:
+        point_count (int, optional): number of points. Defaults to 200.
+        influence_count (int, optional): number of influences. Defaults to 12.
+        nonzero_count (int, optional): influences with weight per point. Defaults to 6.
+        seed (int, optional): random seed. Defaults to 0.
+
+    Returns:
+        tuple: (dense weights, influence names)
+    """
+    random = np.random.default_rng(seed)
+    weights = np.zeros((point_count, influence_count), dtype=np.float64)
+    for point in range(point_count):
+        columns = random.choice(influence_count, nonzero_count, replace=False)
+        weights[point, columns] = random.random(nonzero_count) + 0.01
+    weights /= weights.sum(axis=1, keepdims=True)
+
+    return weights, [f'joint{i}' for i in range(influence_count)]
+
+
+class SkinWeightsTest(unittest.TestCase):
+    """
+    Headless tests of the SkinWeights container
+    """
+    def setUp(self):
+        """
+        Create the test weights and a temporary folder for the files
+        """
+        self.weights, self.influences = create_random_weights()
+        self.skin_weights = skin_weights_lib.SkinWeights.from_dense(self.weights, self.influences,
+                                                                    shape='bodyShape', deformer='skinCluster1')
+        self.temp_folder = tempfile.mkdtemp()
+
+
+    def tearDown(self):
+        """
+        Delete the temporary folder
+        """
+        shutil.rmtree(self.temp_folder, ignore_errors=True)
+
+
+    def test_from_dense(self):
+        """
+        The dense matrix is stored with its nonzero weights only
+        """
+        skin_weights = self.skin_weights
+        self.assertEqual(skin_weights.get_point_count(), 200)
+        self.assertEqual(skin_weights.get_influence_count(), 12)
+        self.assertEqual(len(skin_weights.values), np.count_nonzero(self.weights))
+        np.testing.assert_array_equal(np.diff(skin_weights.indptr), np.count_nonzero(self.weights, axis=1))
+        np.testing.assert_allclose(skin_weights.to_dense(), self.weights, atol=1e-6)
+
+
+    def test_from_dense_tolerance(self):
+        """
+        The weights lower or equal than the tolerance are dropped
+        """
+        skin_weights = skin_weights_lib.SkinWeights.from_dense(self.weights, self.influences, tolerance=0.1)
+        self.assertTrue(np.all(skin_weights.values > 0.1))
+        np.testing.assert_allclose(skin_weights.to_dense(), np.where(self.weights > 0.1, self.weights, 0.0),
+                                   atol=1e-6)
+
+
+    def test_from_coo(self):
+        """
+        The triplets are sorted by point and influence, and the duplicated ones are summed
+        """
+        rows = np.array([2, 0, 0, 2, 1, 2])
+        columns = np.array([1, 2, 0, 1, 1, 0])
+        values = np.array([0.25, 0.5, 0.5, 0.25, 1.0, 0.5])
+        skin_weights = skin_weights_lib.SkinWeights.from_coo(rows, columns, values, point_count=4,
+                                                             influences=['a', 'b', 'c'])
+
+        # Sorted by point and influence, the duplicated (2, 1) entries are summed
+        np.testing.assert_array_equal(skin_weights.indptr, [0, 2, 3, 5, 5])
+        np.testing.assert_array_equal(skin_weights.indices, [0, 2, 1, 0, 1])
+        np.testing.assert_allclose(skin_weights.values, [0.5, 0.5, 1.0, 0.5, 0.5])
+        np.testing.assert_allclose(skin_weights.to_dense(), [[0.5, 0.0, 0.5],
+                                                             [0.0, 1.0, 0.0],
+                                                             [0.5, 0.5, 0.0],
+                                                             [0.0, 0.0, 0.0]])
+
+
+    def test_from_coo_matches_from_dense(self):
+        """
+        Shuffled triplets give the same arrays as the dense matrix
+        """
+        rows, columns = np.nonzero(self.weights)
+        order = np.random.default_rng(1).permutation(len(rows))
+        skin_weights = skin_weights_lib.SkinWeights.from_coo(rows[order], columns[order],
+                                                             self.weights[rows, columns][order],
+                                                             point_count=len(self.weights),
+                                                             influences=self.influences)
+
+        np.testing.assert_array_equal(skin_weights.indptr, self.skin_weights.indptr)
+        np.testing.assert_array_equal(skin_weights.indices, self.skin_weights.indices)
+        np.testing.assert_allclose(skin_weights.values, self.skin_weights.values)
+
+
+    def test_prune_max_influences(self):
+        """
+        Each point keeps its biggest max_influences weights, normalized
+        """
+        pruned = self.skin_weights.prune(max_influences=4)
+        self.assertTrue(np.all(np.diff(pruned.indptr) <= 4))
+        np.testing.assert_allclose(pruned.get_row_sums(), 1.0, atol=1e-6)
+
+        # The biggest weights are the ones kept
+        dense = pruned.to_dense()
+        for point in range(len(self.weights)):
+            expected_columns = np.sort(np.argsort(-self.weights[point], kind='stable')[:4])
+            np.testing.assert_array_equal(np.flatnonzero(dense[point]), expected_columns)
+
+
+    def test_prune_without_normalize(self):
+        """
+        The kept weights keep their values when they are not normalized
+        """
+        pruned = self.skin_weights.prune(max_influences=2, normalize=False)
+        self.assertTrue(np.all(pruned.get_row_sums() < 1.0 + 1e-6))
+        np.testing.assert_allclose(pruned.values, self.skin_weights.to_dense()[pruned.get_rows(), pruned.indices])
+
+
+    def test_prune_tolerance(self):
+        """
+        The weights lower or equal than the tolerance are dropped and the rest normalized
+        """
+        pruned = self.skin_weights.prune(tolerance=0.15)
+        self.assertTrue(np.all(pruned.values > 0.0))
+        expected = np.where(self.weights > 0.15, self.weights, 0.0)
+        expected /= np.maximum(expected.sum(axis=1, keepdims=True), 1e-12)
+        np.testing.assert_allclose(pruned.to_dense(), expected, atol=1e-6)
+
+
+    def test_normalize(self):
+        """
+        The weights of each point add up 1 and the sparsity is kept
+        """
+        values = self.skin_weights.values * np.linspace(0.5, 2.0, len(self.skin_weights.values))
+        scaled = self.skin_weights.copy(values=values.astype(np.float32))
+        normalized = scaled.normalize()
+        np.testing.assert_allclose(normalized.get_row_sums(), 1.0, atol=1e-6)
+        np.testing.assert_array_equal(normalized.indices, scaled.indices)
+
+
+    def test_normalize_keeps_empty_points(self):
+        """
+        The points without weights are kept empty
+        """
+        weights = self.weights.copy()
+        weights[[3, 7]] = 0.0
+        normalized = skin_weights_lib.SkinWeights.from_dense(weights, self.influences).normalize()
+        row_sums = normalized.get_row_sums()
+        np.testing.assert_allclose(row_sums[[3, 7]], 0.0)
+        np.testing.assert_allclose(np.delete(row_sums, [3, 7]), 1.0, atol=1e-6)
+
+
+    def test_quantize_round_trip(self):
+        """
+        The uint16 values are within half a quantization step of the float values
+        """
+        file_path = os.path.join(self.temp_folder, f'weights.{skin_weights_lib.npz_extension}')
+        self.skin_weights.save(file_path, quantize=True)
+        loaded = skin_weights_lib.SkinWeights.load(file_path)
+
+        max_error = np.abs(loaded.values - self.skin_weights.values).max()
+        self.assertLessEqual(max_error, 0.5 / skin_weights_lib.quantize_scale + 1e-7)
+        np.testing.assert_array_equal(loaded.indptr, self.skin_weights.indptr)
+        np.testing.assert_array_equal(loaded.indices, self.skin_weights.indices)
+        self.assertEqual(loaded.influences, self.influences)
+
+
+    def test_npz_round_trip(self):
+        """
+        The float values and the names are read back as they were saved
+        """
+        file_path = os.path.join(self.temp_folder, f'weights.{skin_weights_lib.npz_extension}')
+        self.skin_weights.save(file_path)
+        loaded = skin_weights_lib.SkinWeights.load(file_path)
+
+        np.testing.assert_array_equal(loaded.values, self.skin_weights.values)
+        self.assertEqual(loaded.shape, 'bodyShape')
+        self.assertEqual(loaded.deformer, 'skinCluster1')
+
+
+    def test_extract_influence(self):
+        """
+        The weights of one influence, dense and sparse
+        """
+        np.testing.assert_allclose(self.skin_weights.extract_influence('joint3'), self.weights[:, 3], atol=1e-6)
+
+        point_indices, values = self.skin_weights.extract_influence('joint3', dense=False)
+        np.testing.assert_array_equal(point_indices, np.flatnonzero(self.weights[:, 3]))
+        np.testing.assert_allclose(values, self.weights[point_indices, 3], atol=1e-6)
+
+
+    def test_merge_influences(self):
+        """
+        The merged influences add their weights to the target and are removed
+        """
+        merged = self.skin_weights.merge_influences(['joint1', 'joint2', 'joint5'], 'joint2')
+        expected_influences = [x for x in self.influences if x not in ('joint1', 'joint5')]
+        self.assertEqual(merged.influences, expected_influences)
+
+        expected = np.delete(self.weights, [1, 5], axis=1)
+        expected[:, expected_influences.index('joint2')] = self.weights[:, [1, 2, 5]].sum(axis=1)
+        np.testing.assert_allclose(merged.to_dense(), expected, atol=1e-6)
+        np.testing.assert_allclose(merged.get_row_sums(), 1.0, atol=1e-6)
+
+
+    def test_merge_influences_new_target(self):
+        """
+        A target that is not an influence is added at the end
+        """
+        merged = self.skin_weights.merge_influences(['joint0', 'joint11'], 'spine')
+        self.assertEqual(merged.influences[-1], 'spine')
+        self.assertNotIn('joint0', merged.influences)
+        np.testing.assert_allclose(merged.extract_influence('spine'), self.weights[:, [0, 11]].sum(axis=1),
+                                   atol=1e-6)
+
+
+    def test_deformer_weights_round_trip(self):
+        """
+        The deformerWeights json is read back, loaded whole and streamed
+        """
+        points = np.random.default_rng(2).random((len(self.weights), 3))
+        skin_weights = skin_weights_lib.SkinWeights.from_dense(self.weights, self.influences, shape='bodyShape',
+                                                               deformer='skinCluster1', points=points)
+        file_path = os.path.join(self.temp_folder, 'weights.json')
+        skin_weights.save_deformer_weights(file_path)
+
+        with open(file_path, 'r') as read_file:
+            loaded_list = [skin_weights_lib.SkinWeights.from_deformer_weights(json.load(read_file)),
+                           skin_weights_lib.SkinWeights.from_deformer_weights_file(file_path, buffer_size=1024)]
+
+        for loaded in loaded_list:
+            self.assertEqual(loaded.influences, self.influences)
+            self.assertEqual(loaded.shape, 'bodyShape')
+            self.assertEqual(loaded.deformer, 'skinCluster1')
+            np.testing.assert_array_equal(loaded.indptr, skin_weights.indptr)
+            np.testing.assert_array_equal(loaded.indices, skin_weights.indices)
+            np.testing.assert_allclose(loaded.values, skin_weights.values, atol=1e-7)
+            np.testing.assert_allclose(loaded.points, points)
+
+
+
+    def test_smooth(self):
+        """
+        Locked influences and points outside of the mask keep their weights, the rest add up 1
+        """
+        # 20 x 10 quad grid, one point per weight row
+        grid = np.arange(200).reshape(20, 10)
+        quads = np.stack([grid[:-1, :-1], grid[:-1, 1:], grid[1:, 1:], grid[1:, :-1]], axis=-1).reshape(-1, 4)
+        edges = skin_weights_lib.get_polygon_edges(np.full(len(quads), 4), quads.ravel())
+        adjacency = skin_weights_lib.get_edge_adjacency(edges, 200)
+
+        point_mask = np.zeros(200, dtype=bool)
+        point_mask[:120] = True
+        input_mask = point_mask.copy()
+        smoothed = self.skin_weights.smooth(adjacency, locked_influences=['joint4'], point_mask=point_mask,
+                                            chunk_size=5)
+        dense = smoothed.to_dense()
+
+        np.testing.assert_array_equal(point_mask, input_mask)
+        np.testing.assert_allclose(dense[:, 4], self.weights[:, 4], atol=1e-6)
+        np.testing.assert_allclose(dense[120:], self.weights[120:], atol=1e-6)
+        np.testing.assert_allclose(smoothed.get_row_sums(), 1.0, atol=1e-5)
+        self.assertLess(np.abs(np.diff(dense[:100], axis=0)).mean(),
+                        np.abs(np.diff(self.weights[:100], axis=0)).mean())
+
+
+
+    def test_mirror_unmatched_points(self):
+        """
+        The points without an opposite point in the symmetry map keep their weights
+        """
+        skin_weights = skin_weights_lib.SkinWeights.from_dense([[1.0, 0.0], [0.0, 1.0], [0.5, 0.5], [0.2, 0.8]],
+                                                               ['arm_l_skn', 'arm_r_skn'])
+        influence_map = {'arm_l_skn': 'arm_r_skn', 'arm_r_skn': 'arm_l_skn'}
+        mirrored = skin_weights.mirror(symmetry_map=[1, 0, -1, 3], influence_map=influence_map,
+                                       point_indices=[0, 1, 2, 3])
+
+        np.testing.assert_allclose(mirrored.to_dense(), [[1.0, 0.0], [0.0, 1.0], [0.5, 0.5], [0.8, 0.2]],
+                                   atol=1e-6)
+
+
+
+    def test_save_removes_delta_patches(self):
+        """
+        A plain save over a delta export removes its patches, they are not applied on top of the new weights
+        """
+        file_path = os.path.join(self.temp_folder, f'weights.{skin_weights_lib.npz_extension}')
+        skin_weights_lib.write_skin_weights_delta(self.skin_weights, file_path, block_size=10)
+
+        weights = self.weights.copy()
+        weights[:10] = [1.0] + [0.0] * 11
+        patch_data = skin_weights_lib.write_skin_weights_delta(
+            skin_weights_lib.SkinWeights.from_dense(weights, self.influences), file_path)
+        self.assertTrue(os.path.exists(patch_data['patch']))
+
+        weights[:10] = [0.0] * 11 + [1.0]
+        skin_weights_lib.SkinWeights.from_dense(weights, self.influences).save(file_path)
+
+        self.assertIsNone(skin_weights_lib.read_manifest(file_path))
+        self.assertFalse(os.path.exists(patch_data['patch']))
+        np.testing.assert_allclose(skin_weights_lib.load_skin_weights_delta(file_path).to_dense(), weights,
+                                   atol=1e-6)
+
+
+
+    def test_delta_new_base_when_points_change(self):
+        """
+        A delta export of re-sculpted points writes a new base, the patches do not store positions
+        """
+        file_path = os.path.join(self.temp_folder, f'weights.{skin_weights_lib.npz_extension}')
+        points = np.random.default_rng(3).random((len(self.weights), 3))
+        skin_weights = skin_weights_lib.SkinWeights.from_dense(self.weights, self.influences, points=points)
+        skin_weights_lib.write_skin_weights_delta(skin_weights, file_path, block_size=10)
+        self.assertIsNone(skin_weights_lib.write_skin_weights_delta(skin_weights, file_path)['patch'])
+
+        points = points.copy()
+        points[:5] += 1.0
+        skin_weights = skin_weights_lib.SkinWeights.from_dense(self.weights, self.influences, points=points)
+        delta_data = skin_weights_lib.write_skin_weights_delta(skin_weights, file_path)
+
+        self.assertIsNone(delta_data['patch'])
+        self.assertEqual(delta_data['changed_blocks'], delta_data['block_count'])
+        np.testing.assert_allclose(skin_weights_lib.load_skin_weights_delta(file_path).points, points, atol=1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
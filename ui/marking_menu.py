@@ -840,16 +840,18 @@ class MarkingMenu(object):
     @staticmethod
     def transfer_skin(*args):
         """
-        Transfer skinCluster
+        Transfer skinCluster, from the first selected node to the rest. Any number of targets goes through the same
+        SkinTransferPlan, in one undo step
         """
-        if len(cmds.ls(selection=True)) != 2:
-            cmds.error('Select two nodes')
+        selection_list = cmds.ls(selection=True)
+        if len(selection_list) < 2:
+            cmds.error('Select the source and the target nodes')
 
-        skin_lib.transfer_skin(source=cmds.ls(selection=True)[0],
-                               target=cmds.ls(selection=True)[-1],
-                               source_skin_index=1,
-                               target_skin_index=1,
-                               surface_association='closestPoint')
+        skin_lib.transfer_skin_to_targets(source=selection_list[0],
+                                          target_list=selection_list[1:],
+                                          source_skin_index=1,
+                                          target_skin_index=1,
+                                          surface_association='closestPoint')
 
     @staticmethod
     def export_skin_clusters(*args):
@@ -969,10 +971,12 @@ class MarkingMenu(object):
         """
         Mirror blendShape targets
         """
-        target_list = blend_shape_lib.get_targets_from_shape_editor(as_index=False)
-        for target in target_list:
+        target_dict = dict()
+        for target in blend_shape_lib.get_targets_from_shape_editor(as_index=False):
             blend_shape, target = target.split('.')
-            blend_shape_lib.mirror_target(blend_shape=blend_shape, target=target)
+            target_dict.setdefault(blend_shape, list()).append(target)
+        for blend_shape, target_list in target_dict.items():
+            blend_shape_lib.mirror_targets(blend_shape=blend_shape, target_list=target_list)
 
     @staticmethod
     def create_default_angle_reader(*args):
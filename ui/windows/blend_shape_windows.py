@@ -25,7 +25,12 @@ class ExportBlendShapeWindow(window_lib.Helper):
             title (str): title of the window
             size (list): width and height
         """
-        super(ExportBlendShapeWindow, self).__init__(title='Export blendShape Options', size=(450, 130))
+        super(ExportBlendShapeWindow, self).__init__(title='Export blendShape Options', size=(450, 150))
+        self.file_format = cmds.optionMenu(label='File format')
+        cmds.menuItem(self.file_format, label='JSON')
+        cmds.menuItem(self.file_format, label='Chunk')
+        cmds.menuItem(self.file_format, label='Deltas')
+
         export_path = f'{os.path.dirname(cmds.file(query=True, sceneName=True))}/blendShapes'
         self.export_path = cmds.textFieldGrp(label='Path: ', text=export_path)
 
@@ -34,10 +39,12 @@ class ExportBlendShapeWindow(window_lib.Helper):
 
         # --------------------------------------------------------------------------------------------------------------
         cmds.formLayout(self.main_layout, edit=True,
-                        attachForm=[(self.export_path, 'top', 35),
-                                    (self.file_search, 'top', 35)],
+                        attachForm=[(self.file_format, 'top', 35),
+                                    (self.file_format, 'left', 78)],
 
-                        attachControl=[(self.file_search, 'left', 5, self.export_path)])
+                        attachControl=[(self.export_path, 'top', 5, self.file_format),
+                                       (self.file_search, 'top', 5, self.file_format),
+                                       (self.file_search, 'left', 5, self.export_path)])
 
 
     def apply_command(self, *args):
@@ -48,8 +55,10 @@ class ExportBlendShapeWindow(window_lib.Helper):
             cmds.error('Nothing selected')
 
         export_path = cmds.textFieldGrp(self.export_path, query=True, text=True)
+        file_format = cmds.optionMenu(self.file_format, query=True, value=True).lower()
 
-        import_export_lib.export_blend_shapes(node_list=cmds.ls(selection=True), path=export_path)
+        import_export_lib.export_blend_shapes(node_list=cmds.ls(selection=True), path=export_path,
+                                              file_format=file_format)
 
 
     def file_dialog_command(self, *args):
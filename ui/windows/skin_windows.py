@@ -25,13 +25,21 @@ class ExportSkinWindow(window_lib.Helper):
             title (str): title of the window
             size (list): width and height
         """
-        super(ExportSkinWindow, self).__init__(title='Export Skin Options', size=(450, 130))
+        super(ExportSkinWindow, self).__init__(title='Export Skin Options', size=(450, 180))
 
         self.skin_index = cmds.intFieldGrp(label='Skin index: ', value1=1)
         self.all_skin_index = cmds.checkBoxGrp(label='All: ', value1=False,
                                                onCommand=self.set_skin_index_enable,
                                                offCommand=self.set_skin_index_enable)
 
+        self.file_format = cmds.optionMenu(label='File format', changeCommand=self.set_delta_enable)
+        cmds.menuItem(self.file_format, label='JSON')
+        cmds.menuItem(self.file_format, label='NPZ')
+        cmds.menuItem(self.file_format, label='Chunk')
+
+        # Delta exports are npz only, the checkbox is enabled with the NPZ format
+        self.delta = cmds.checkBoxGrp(label='Delta (npz): ', value1=False, enable=False)
+
         export_path = f'{os.path.dirname(cmds.file(query=True, sceneName=True))}/skinClusters'
         self.export_path = cmds.textFieldGrp(label='Path: ', text=export_path)
 
@@ -41,11 +49,14 @@ class ExportSkinWindow(window_lib.Helper):
         # --------------------------------------------------------------------------------------------------------------
         cmds.formLayout(self.main_layout, edit=True,
                         attachForm=[(self.skin_index, 'top', 20),
-                                    (self.all_skin_index, 'top', 24)],
+                                    (self.all_skin_index, 'top', 24),
+                                    (self.file_format, 'left', 78)],
 
                         attachControl=[(self.all_skin_index, 'left', 0, self.skin_index),
-                                       (self.export_path, 'top', 5, self.skin_index),
-                                       (self.file_search, 'top', 5, self.skin_index),
+                                       (self.file_format, 'top', 5, self.skin_index),
+                                       (self.delta, 'top', 5, self.file_format),
+                                       (self.export_path, 'top', 5, self.delta),
+                                       (self.file_search, 'top', 5, self.delta),
                                        (self.file_search, 'left', 5, self.export_path)])
 
 
@@ -56,13 +67,16 @@ class ExportSkinWindow(window_lib.Helper):
         selection_list = cmds.ls(sl=True)
         all_skin_index = cmds.checkBoxGrp(self.all_skin_index, query=True, value1=True)
         export_path = cmds.textFieldGrp(self.export_path, query=True, text=True)
+        file_format = cmds.optionMenu(self.file_format, query=True, value=True).lower()
+        delta = cmds.checkBoxGrp(self.delta, query=True, value1=True) and file_format == 'npz'
         if selection_list:
             if all_skin_index:
-                import_export_lib.export_skin_clusters(node_list=selection_list, path=export_path, skin_index=None)
+                import_export_lib.export_skin_clusters(node_list=selection_list, path=export_path, skin_index=None,
+                                                       file_format=file_format, delta=delta)
             else:
                 skin_index = cmds.intFieldGrp(self.skin_index, query=True, value1=True)
                 import_export_lib.export_skin_clusters(node_list=selection_list, path=export_path,
-                                                       skin_index=skin_index)
+                                                       skin_index=skin_index, file_format=file_format, delta=delta)
 
 
     def file_dialog_command(self, *args):
@@ -84,6 +98,16 @@ class ExportSkinWindow(window_lib.Helper):
             cmds.intFieldGrp(self.skin_index, edit=True, enable=True)
 
 
+    def set_delta_enable(self, *args):
+        """
+        Change delta enable, only the NPZ format has delta exports
+        """
+        npz_format = cmds.optionMenu(self.file_format, query=True, value=True) == 'NPZ'
+        cmds.checkBoxGrp(self.delta, edit=True, enable=npz_format)
+        if not npz_format:
+            cmds.checkBoxGrp(self.delta, edit=True, value1=False)
+
+
     def bottom_layout(self):
         """
         Create the bottom layout
@@ -108,7 +132,7 @@ class ImportSkinWindow(window_lib.Helper):
             title (str): title of the window
             size (list): width and height
         """
-        super(ImportSkinWindow, self).__init__(title='Import Skin Options', size=(450, 225))
+        super(ImportSkinWindow, self).__init__(title='Import Skin Options', size=(450, 250))
 
         self.skin_index = cmds.intFieldGrp(label='Skin index: ', value1=1)
         self.import_folder = cmds.checkBoxGrp(label='Import folder: ', value1=False,
@@ -118,6 +142,10 @@ class ImportSkinWindow(window_lib.Helper):
         self.import_method = cmds.optionMenu(label='Import method')
         cmds.menuItem(self.import_method, label='Index')
         cmds.menuItem(self.import_method, label='Nearest')
+        cmds.menuItem(self.import_method, label='Inverse distance')
+        cmds.menuItem(self.import_method, label='Barycentric')
+
+        self.bulk = cmds.checkBoxGrp(label='Bulk (index): ', value1=False)
 
         self.search_for = cmds.textFieldGrp(label='Search for: ')
 
@@ -135,7 +163,8 @@ class ImportSkinWindow(window_lib.Helper):
 
                         attachControl=[(self.skin_index, 'top', 5, self.import_folder),
                                        (self.import_method, 'top', 5, self.skin_index),
-                                       (self.search_for, 'top', 5, self.import_method),
+                                       (self.bulk, 'top', 5, self.import_method),
+                                       (self.search_for, 'top', 5, self.bulk),
                                        (self.replace_with, 'top', 5, self.search_for),
                                        (self.import_path, 'top', 5, self.replace_with),
                                        (self.file_search, 'top', 5, self.replace_with),
@@ -148,7 +177,9 @@ class ImportSkinWindow(window_lib.Helper):
         """
         import_folder = cmds.checkBoxGrp(self.import_folder, query=True, value1=True)
 
-        import_method = cmds.optionMenu(self.import_method, query=True, value=True).lower()
+        import_method = cmds.optionMenu(self.import_method, query=True, value=True).lower().replace(' ', '_')
+
+        bulk = cmds.checkBoxGrp(self.bulk, query=True, value1=True)
 
         search_for = cmds.textFieldGrp(self.search_for, query=True, text=True)
 
@@ -157,13 +188,13 @@ class ImportSkinWindow(window_lib.Helper):
         import_path = cmds.textFieldGrp(self.import_path, query=True, text=True)
 
         if import_folder:
-            import_export_lib.import_skin_clusters(path=import_path, import_method=import_method)
+            import_export_lib.import_skin_clusters(path=import_path, import_method=import_method, bulk=bulk)
         else:
             node = cmds.ls(sl=True)[0]
             skin_index = cmds.intFieldGrp(self.skin_index, query=True, value1=True)
             import_export_lib.import_skin_cluster(node=node, path=import_path,
                                                   skin_index=skin_index, import_method=import_method,
-                                                  search_for=search_for, replace_with=replace_with)
+                                                  search_for=search_for, replace_with=replace_with, bulk=bulk)
 
 
     def file_dialog_command(self, *args):